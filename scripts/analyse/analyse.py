@@ -1,33 +1,142 @@
-# scripts/4_analyse.py
-import json, yaml
+# scripts/analyse/analyse.py
+"""
+Analyse stage: per-test coverage + bug score → CoverageFusion and W$
+- Coverage points come from the ISS trace (logs/iss/<id>.trc, see
+  scripts/analyse/trace_coverage.py), one job per test on a process pool
+  (analyse.workers; 1 runs them in a thread of this process)
+- bug_score comes from the DifferentialChecker mismatches: the most severe
+  mismatch kind (SEVERITY) plus 0.1 per further distinct (kind, field, DUT),
+  capped at 1
+- cycles are the simulator's cycle count from the trace log meta
+- delta_cov = new / (new + cov_half) for the points the test adds to
+  global coverage
+- Analyser.submit() starts a test's job as soon as its result arrives;
+  commit() waits for the batch and merges coverage and W$ updates inside
+  one `with wcache, coverage:` block
+- tests with bugs go to triage (scripts/analyse/triage.py): mismatches are
+  bucketed by signature and only new buckets reach the PropertyGenerator
+"""
+import os
+import sys
+import asyncio
+import yaml
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import List, Optional
+
+# === Add project root ===
+ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT))
+
+from utils.models import Testcase
 from utils.wcache import WeightCache
-from utils.llm import llm_generate_property
-import asyncio
+from utils.tracefile import read_trace
+from scripts.analyse.coverage_fusion import CoverageFusion
+from scripts.analyse.property_generator import PropertyGenerator
+from scripts.analyse.triage import Triage, build_triage
+from scripts.analyse.trace_coverage import analyse_log
+from scripts.execute.checker import DifferentialChecker, Mismatch
 
-CONFIG = yaml.safe_load(Path("../config.yaml").read_text())
-WCACHE = WeightCache(Path("../wcache.json"), CONFIG["wcache"])
-LOGS_DIR = Path("../logs")
+CONFIG = yaml.safe_load((ROOT / "config.yaml").read_text())
+WCACHE = WeightCache(ROOT / "wcache.json", CONFIG["wcache"])
+LOGS_DIR = ROOT / "logs"
 
-async def analyse():
-    for iss_log in LOGS_DIR.glob("iss/*.json"):
-        tc_id = iss_log.stem
-        dut_logs = list((LOGS_DIR / "dut").glob(f"{tc_id}*.json"))
-        if not dut_logs: continue
+SEVERITY = {"pc": 1.0, "insn": 1.0, "csr": 0.8, "reg": 0.6, "freg": 0.6}
+
+def bug_score(mismatches: List[Mismatch]) -> float:
+    if not mismatches:
+        return 0.0
+    distinct = {(m.type, m.field, m.dut_id) for m in mismatches}
+    top = max(SEVERITY.get(m.type, 0.5) for m in mismatches)
+    return min(1.0, top + 0.1 * (len(distinct) - 1))
+
+class Analyser:
+    def __init__(self, wcache: WeightCache, coverage: CoverageFusion,
+                 triage: Optional[Triage] = None, workers: int = 0, cov_half: float = 16.0):
+        self.wcache = wcache
+        self.coverage = coverage
+        self.triage = triage
+        self.cov_half = cov_half
+        self.pool = ProcessPoolExecutor(workers or os.cpu_count()) if workers != 1 else None
+        self._jobs: List[tuple] = []  # (tc, iss log, mismatches, future of analyse_log)
+        self.stats: Counter = Counter()
+
+    def __enter__(self):
+        return self
 
-        # Mock coverage + bug
-        delta_cov = 0.1
-        bug_score = 1 if random.random() > 0.8 else 0
-        cycles = 500
+    def __exit__(self, *exc):
+        self.close()
 
-        # Update W$
-        WCACHE.update(tc_id, delta_cov, bug_score, cycles)
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+
+    def submit(self, tc: Testcase, iss_log: Path, mismatches: List[Mismatch]):
+        """Start the coverage job of one executed test (needs a running event loop)."""
+        fut = asyncio.get_running_loop().run_in_executor(self.pool, analyse_log, iss_log)
+        self._jobs.append((tc, iss_log, mismatches, fut))
+
+    async def commit(self) -> int:
+        """Wait for the submitted jobs and write them in one batch; returns tests scored."""
+        jobs, self._jobs = self._jobs, []
+        results = await asyncio.gather(*(job[-1] for job in jobs), return_exceptions=True)
+        scored = 0
+        with self.wcache, self.coverage:
+            for (tc, iss_log, mismatches, _), res in zip(jobs, results):
+                if isinstance(res, BaseException):
+                    print(f"[ANALYSE] {tc.id[:8]}: no coverage ({type(res).__name__}: {res})")
+                    self.stats["failed"] += 1
+                    continue
+                points, meta = res
+                new = self.coverage.update(points, tc.id)
+                bug = bug_score(mismatches)
+                self.wcache.update(tc, new / (new + self.cov_half), bug, meta.get("cycles") or 1)
+                scored += 1
+                self.stats["tests"] += 1
+                self.stats["points"] += len(points)
+                self.stats["new"] += new
+                if bug > 0:
+                    self.stats["bugs"] += 1
+                    if self.triage is not None:
+                        self.triage.add(tc, mismatches, iss_log)
+        if self.triage is not None:
+            await self.triage.synthesise()
+        return scored
+
+    def report(self) -> str:
+        s = self.stats
+        return (f"{s['tests']} tests, {s['new']} new of {s['points']} points hit, "
+                f"{s['bugs']} with mismatches, {s['failed']} failed; "
+                f"{self.coverage.total_covered()} covered"
+                + (f"; {self.triage.report()}" if self.triage is not None else ""))
+
+def build_analyser(config: dict, wcache: WeightCache, coverage: CoverageFusion,
+                   prop_gen: Optional[PropertyGenerator] = None) -> Analyser:
+    cfg = config.get("analyse", {})
+    return Analyser(wcache, coverage, build_triage(config, ROOT, prop_gen), workers=cfg.get("workers", 0),
+                    cov_half=cfg.get("cov_half", 16.0))
+
+def dut_id(log: Path) -> int:
+    return int(log.stem.rsplit("_dut", 1)[1])
+
+async def analyse():
+    checker = DifferentialChecker(**CONFIG["execution"].get("checker", {}))
+    coverage = CoverageFusion(ROOT / CONFIG["coverage"]["bitmap"])
+    with build_analyser(CONFIG, WCACHE, coverage, PropertyGenerator()) as analyser:
+        for iss_log in sorted(LOGS_DIR.glob("iss/*.trc")):
+            tc_id = iss_log.stem
+            dut_logs = sorted((LOGS_DIR / "dut").glob(f"{tc_id}_dut*.trc"), key=dut_id)
+            if not dut_logs: continue
 
-        # LLM property
-        if bug_score > 0:
-            prop = await llm_generate_property("PC mismatch at cycle 42")
-            print(f"[LLM] → {prop}")
+            mismatches = list(checker.compare(read_trace(iss_log), [read_trace(p) for p in dut_logs],
+                                              [dut_id(p) for p in dut_logs]))
+            src = ROOT / "queue_mutate" / f"{tc_id}.s"
+            code = src.read_text() if src.exists() else ""  # code feeds the novelty index
+            tc = Testcase(id=tc_id, code=code, source="log", path=iss_log)
+            analyser.submit(tc, iss_log, mismatches)
+        await analyser.commit()
+        print(f"[ANALYSE] {analyser.report()}")
 
 if __name__ == "__main__":
-    import random
-    asyncio.run(analyse())
\ No newline at end of file
+    asyncio.run(analyse())
@@ -1,30 +1,195 @@
-# utils/coverage_fusion.py
-from typing import Set, Dict
+# scripts/analyse/coverage_fusion.py
+"""
+Global coverage as a memory-mapped bitset
+- Coverage points (strings) are interned once into a stable integer id space
+  (<bitmap>.points, one name per line, id = line number)
+- Global coverage is a dense uint64 bitset in <bitmap>, mmapped and grown in
+  place; merges are OR + popcount, never a full re-serialisation
+- Per-test coverage (sorted id arrays) is appended to <bitmap>.tests so the
+  corpus can be minimised later
+- `with cov:` batches appends/msync like WeightCache
+"""
+import struct
 from pathlib import Path
-import pickle
+from typing import Dict, Iterable, List, Optional, Set
+import numpy as np
+
+GROW_WORDS = 8192  # grow the bitmap 512 Kbit at a time
+TEST_HEADER = struct.Struct("<HI")  # id length, number of point ids
+
+def popcount(words: np.ndarray) -> int:
+    return int(np.bitwise_count(words).sum())
 
 class CoverageFusion:
     """Bitmap-based global coverage aggregator."""
-    
+
     def __init__(self, bitmap_path: Path):
         self.bitmap_path = bitmap_path
-        self.global_bitmap: Set[str] = self._load()
-
-    def _load(self) -> Set[str]:
-        if self.bitmap_path.exists():
-            return pickle.loads(self.bitmap_path.read_bytes())
-        return set()
-
-    def _save(self):
-        self.bitmap_path.write_bytes(pickle.dumps(self.global_bitmap))
-
-    def update(self, local_coverage: Set[str]) -> float:
-        prev_size = len(self.global_bitmap)
-        self.global_bitmap.update(local_coverage)
-        new_size = len(self.global_bitmap)
-        delta = (new_size - prev_size) / 1000.0  # normalize
-        self._save()
-        return delta
-
-    def get_uncoverpoints(self, total_points: Set[str]) -> Set[str]:
-        return total_points - self.global_bitmap
\ No newline at end of file
+        self.points_path = bitmap_path.with_name(bitmap_path.name + ".points")
+        self.tests_path = bitmap_path.with_name(bitmap_path.name + ".tests")
+
+        self.names: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self.tests: Dict[str, np.ndarray] = {}
+        self._new_names: List[str] = []
+        self._new_tests: List[bytes] = []
+        self._batch_depth = 0
+        self._load()
+
+    # === Persistence ===
+    def _load(self):
+        if self.points_path.exists():
+            self.names = self.points_path.read_text().splitlines()
+            self.ids = {name: i for i, name in enumerate(self.names)}
+        if not self.bitmap_path.exists():
+            self.bitmap_path.write_bytes(b"\0" * 8 * GROW_WORDS)
+        self._map()
+        if self.tests_path.exists():
+            raw = self.tests_path.read_bytes()
+            pos = 0
+            while pos + TEST_HEADER.size <= len(raw):
+                id_len, n = TEST_HEADER.unpack_from(raw, pos)
+                end = pos + TEST_HEADER.size + id_len + 4 * n
+                if end > len(raw):
+                    break  # torn tail from a crash mid-append
+                tc_id = raw[pos + TEST_HEADER.size:pos + TEST_HEADER.size + id_len].decode()
+                self.tests[tc_id] = np.frombuffer(raw, dtype="<u4", count=n,
+                                                  offset=end - 4 * n).copy()
+                pos = end
+
+    def _map(self):
+        self.bitmap = np.memmap(self.bitmap_path, dtype="<u8", mode="r+")
+
+    def _ensure(self, max_id: int):
+        need = max_id // 64 + 1
+        if need <= len(self.bitmap):
+            return
+        words = -(-need // GROW_WORDS) * GROW_WORDS
+        self.bitmap.flush()
+        del self.bitmap
+        with open(self.bitmap_path, "r+b") as f:
+            f.truncate(8 * words)
+        self._map()
+
+    def flush(self):
+        """Append new point names / per-test records, then msync the bitmap."""
+        if self._new_names:
+            with open(self.points_path, "a") as f:
+                f.write("".join(n + "\n" for n in self._new_names))
+            self._new_names.clear()
+        if self._new_tests:
+            with open(self.tests_path, "ab") as f:
+                f.write(b"".join(self._new_tests))
+            self._new_tests.clear()
+        self.bitmap.flush()
+
+    def __enter__(self):
+        self._batch_depth += 1
+        return self
+
+    def __exit__(self, *exc):
+        self._batch_depth -= 1
+        if self._batch_depth == 0:
+            self.flush()
+
+    # === Id space ===
+    def intern(self, points: Iterable[str]) -> np.ndarray:
+        """Point names → sorted unique ids, assigning new ids as needed."""
+        out = []
+        for p in points:
+            i = self.ids.get(p)
+            if i is None:
+                if "\n" in p:
+                    raise ValueError(f"coverage point name contains a newline: {p!r}")
+                i = self.ids[p] = len(self.names)
+                self.names.append(p)
+                self._new_names.append(p)
+            out.append(i)
+        return np.unique(np.array(out, dtype=np.uint32))
+
+    def lookup(self, points: Iterable[str]) -> np.ndarray:
+        """Ids of already-interned points (unknown names are dropped)."""
+        ids = [i for i in map(self.ids.get, points) if i is not None]
+        return np.unique(np.array(ids, dtype=np.uint32))
+
+    def covered(self, ids: np.ndarray) -> np.ndarray:
+        """Boolean mask: which of `ids` are set in the global bitmap."""
+        ids = ids.astype(np.int64)
+        inside = ids < 64 * len(self.bitmap)
+        mask = np.zeros(len(ids), dtype=bool)
+        words = self.bitmap[ids[inside] >> 6]
+        mask[inside] = (words >> (ids[inside] & 63).astype(np.uint64)) & np.uint64(1) != 0
+        return mask
+
+    # === Updates ===
+    def update(self, local_coverage: Iterable[str], tc_id: Optional[str] = None) -> int:
+        """Merge one test's points; returns the exact number of newly covered points."""
+        ids = self.intern(local_coverage)
+        return self.update_ids(ids, tc_id)
+
+    def update_ids(self, ids: np.ndarray, tc_id: Optional[str] = None) -> int:
+        ids = np.unique(np.asarray(ids, dtype=np.uint32))
+        if tc_id is not None:
+            self._record_test(tc_id, ids)
+        if not len(ids):
+            return 0
+        self._ensure(int(ids[-1]))
+        new = ids[~self.covered(ids)]
+        if len(new):
+            wide = new.astype(np.int64)
+            np.bitwise_or.at(self.bitmap, wide >> 6,
+                             np.left_shift(np.uint64(1), (wide & 63).astype(np.uint64)))
+        if self._batch_depth == 0:
+            self.flush()
+        return len(new)
+
+    def merge(self, words: np.ndarray) -> int:
+        """OR another bitset (same id space) into the global one; returns new bits."""
+        words = np.asarray(words, dtype=np.uint64)
+        if len(words) > len(self.bitmap):
+            self._ensure(64 * len(words) - 1)
+        view = self.bitmap[:len(words)]
+        gained = popcount(words & ~view)
+        view |= words
+        if self._batch_depth == 0:
+            self.flush()
+        return gained
+
+    def _record_test(self, tc_id: str, ids: np.ndarray):
+        self.tests[tc_id] = ids
+        key = tc_id.encode()
+        self._new_tests.append(TEST_HEADER.pack(len(key), len(ids)) + key
+                               + ids.astype("<u4").tobytes())
+
+    # === Queries ===
+    def total_covered(self) -> int:
+        return popcount(self.bitmap)
+
+    def test_bitset(self, tc_id: str, nwords: Optional[int] = None) -> np.ndarray:
+        """Per-test coverage as a dense uint64 bitset (for cmin)."""
+        nwords = nwords or -(-len(self.names) // 64)
+        out = np.zeros(nwords, dtype=np.uint64)
+        ids = self.tests.get(tc_id, np.zeros(0, dtype=np.uint32)).astype(np.int64)
+        ids = ids[ids < 64 * nwords]
+        np.bitwise_or.at(out, ids >> 6, np.left_shift(np.uint64(1), (ids & 63).astype(np.uint64)))
+        return out
+
+    def uncovered_ids(self) -> np.ndarray:
+        """Interned ids whose bit is still clear (universe minus global bitmap)."""
+        n = len(self.names)
+        nwords = -(-n // 64)
+        self._ensure(max(n - 1, 0))
+        gaps = ~self.bitmap[:nwords]
+        if n % 64:
+            gaps[-1] &= np.uint64((1 << (n % 64)) - 1)
+        bits = np.unpackbits(gaps.astype("<u8").view(np.uint8), bitorder="little")
+        return np.flatnonzero(bits).astype(np.uint32)
+
+    def get_uncoverpoints(self, total_points: Optional[Iterable[str]] = None) -> Set[str]:
+        """Points of `total_points` (default: every interned point) not yet covered."""
+        if total_points is None:
+            return {self.names[i] for i in self.uncovered_ids()}
+        total_points = set(total_points)
+        ids = self.lookup(total_points)
+        covered = {self.names[i] for i in ids[self.covered(ids)]}
+        return total_points - covered
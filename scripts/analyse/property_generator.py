@@ -32,8 +32,8 @@
 #             return "// Invalid: missing assert/assume"
 #         return prop.strip()
 # scripts/analyse/property_generator.py
-from utils.llm import call
-from typing import List
+from utils.llm import AsyncLLM, async_client
+from typing import List, Optional
 
 SYSTEM_PROMPT = """
 You are a SystemVerilog assertion expert for processor RTL verification.
@@ -42,8 +42,8 @@ Use only observable signals. Include disable iff (reset).
 """
 
 class PropertyGenerator:
-    def __init__(self):
-        pass
+    def __init__(self, llm: Optional[AsyncLLM] = None):
+        self.llm = llm  # the shared async client by default
 
     async def from_mismatch(self, mismatch: str, cycle: int, dut: str = "DUT") -> str:
         user_prompt = f"""
@@ -58,5 +58,7 @@ Requirements:
 - Be synthesizable
 - Add inline comments
 """
-        result, _, _ = call(user_prompt, system_prompt=SYSTEM_PROMPT)
+        # one assertion per mismatch description: a single cached variant is enough
+        llm = self.llm or async_client()
+        result, _, _ = await llm.call(user_prompt, system_prompt=SYSTEM_PROMPT, variants=1)
         return result
\ No newline at end of file
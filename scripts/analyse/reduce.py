@@ -0,0 +1,210 @@
+# scripts/analyse/reduce.py
+"""
+Testcase reducer: ddmin over the instruction lines of a mismatching test
+- units are the lines utils/asm_util.parse_instruction reads as an
+  instruction; labels, directives and comments always stay, so every
+  branch target still resolves
+- a variant is interesting if the ISS and the DUTs named by the target
+  signature reproduce the same triage signature (scripts/analyse/triage.py);
+  only those DUTs are simulated, with a timeout of timeout_factor x the
+  original run
+- every ddmin round submits all of its candidates (subsets and complements)
+  to an ExecScheduler at once and takes the first interesting one in ddmin
+  order, so the result is the one serial ddmin would find
+- outcomes are cached by variant hash (code_hash): ddmin revisits the
+  same variants across granularities, and one Reducer can serve many tests
+- the argument is a .s file or a triage bucket id; a reduced bucket gets
+  its smaller reproducer written back to triage/<bucket>.s
+
+    python scripts/analyse/reduce.py <test.s | bucket id> [--out DIR] [--workers N]
+"""
+
+import sys
+import asyncio
+import argparse
+from collections import Counter
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+# === Add project root ===
+ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT))
+
+import yaml
+from utils.asm_util import parse_instruction
+from utils.lineage import code_hash
+from utils.models import Testcase
+from scripts.execute.checker import DifferentialChecker
+from scripts.execute.filter import LightweightFilter, shared_filter
+from scripts.execute.scheduler import ExecScheduler
+from scripts.analyse.triage import Triage, build_triage, first_divergence, opcode_of, signature, signature_duts
+
+CONFIG = yaml.safe_load((ROOT / "config.yaml").read_text())
+
+# variant, sandbox, DUT ids (None = all), timeout → {"signature", "cycles", "wall"}
+Job = Callable[[Testcase, Path, Optional[List[int]], Optional[float]], Awaitable[dict]]
+
+class ReduceError(Exception):
+    pass
+
+def execute_job(checker: DifferentialChecker, filter: Optional[LightweightFilter] = None) -> Job:
+    """ISS + the given DUTs through the execute stage's simulators → triage signature."""
+    from scripts.execute.execute import EXEC_CONFIG, run_iss, run_dut
+
+    async def job(tc: Testcase, workdir: Path, duts: Optional[List[int]], timeout: Optional[float]) -> dict:
+        if filter is not None and not filter.is_valid(tc):
+            return {"signature": None, "cycles": 0, "wall": 0.0}
+        duts = list(range(EXEC_CONFIG["dut_count"])) if duts is None else duts
+        iss = await run_iss(tc, workdir, timeout)
+        if iss["exit"] == "timeout":
+            return {"signature": None, "cycles": iss["cycles"], "wall": iss["wall"]}
+        results = await asyncio.gather(*(run_dut(tc, i, workdir, timeout=timeout) for i in duts))
+        mismatches = list(checker.compare(iss["trace"], [r["trace"] for r in results], duts))
+        sig = signature(mismatches, opcode_of(iss["trace"], first_divergence(mismatches).cycle)) \
+            if mismatches else None
+        return {"signature": sig, "cycles": iss["cycles"], "wall": max([iss["wall"]] + [r["wall"] for r in results])}
+    return job
+
+def split(items: list, n: int) -> List[list]:
+    k, r = divmod(len(items), n)
+    out, pos = [], 0
+    for i in range(n):
+        step = k + (i < r)
+        out.append(items[pos:pos + step])
+        pos += step
+    return [c for c in out if c]
+
+class Reducer:
+    def __init__(self, job: Job, scratch_root: Path, workers: int = 4, timeout_factor: float = 4.0,
+                 min_timeout: float = 1.0):
+        self.job = job
+        self.scratch_root = scratch_root
+        self.workers = workers
+        self.timeout_factor = timeout_factor
+        self.min_timeout = min_timeout
+        self.cache: Dict[str, dict] = {}  # variant hash → job outcome
+        self.stats: Counter = Counter()
+
+    async def outcomes(self, variants: List[Testcase], duts: Optional[List[int]] = None,
+                       timeout: Optional[float] = None) -> List[dict]:
+        """Job outcome per variant; uncached variants run in parallel sandboxes."""
+        todo = {v.id: v for v in variants if v.id not in self.cache}
+        self.stats["cache_hits"] += len(variants) - len(todo)
+        self.stats["runs"] += len(todo)
+        if todo:
+            scheduler = ExecScheduler(lambda tc, workdir: self.job(tc, workdir, duts, timeout),
+                                      self.scratch_root, self.workers)
+
+            async def on_done(tc: Testcase, result: Optional[dict]):
+                self.cache[tc.id] = result or {"signature": None, "cycles": 0, "wall": 0.0}
+
+            for v in todo.values():
+                await scheduler.submit(v, on_done)
+            await scheduler.drain()
+            self.stats["rounds"] += 1
+        return [self.cache.get(v.id, {"signature": None}) for v in variants]
+
+    async def reduce(self, tc: Testcase, target: Optional[str] = None) -> Tuple[Testcase, dict]:
+        """Smallest variant of `tc` ddmin finds that keeps `target` (default: tc's own signature)."""
+        before = Counter(self.stats)
+        lines = tc.code.splitlines()
+        units = [i for i, line in enumerate(lines) if parse_instruction(line)[0]]
+        units_set = set(units)
+
+        def variant(keep: List[int]) -> Testcase:
+            kept = set(keep)
+            code = "\n".join(l for i, l in enumerate(lines) if i not in units_set or i in kept) + "\n"
+            return Testcase(id=code_hash(code), code=code, source="reduce", path=Path(""),
+                            metadata={"reduced_from": tc.id})
+
+        start = variant(units)
+        first = (await self.outcomes([start], signature_duts(target) if target else None))[0]
+        if first["signature"] is None or (target is not None and first["signature"] != target):
+            raise ReduceError(f"{tc.id}: does not reproduce {target or 'a mismatch'} "
+                              f"(got {first['signature']})")
+        target = first["signature"]
+        duts = signature_duts(target)
+        timeout = max(self.min_timeout, self.timeout_factor * first.get("wall", 0.0))
+
+        keep, n = units, 2
+        while len(keep) >= 2:
+            chunks = split(keep, n)
+            complements = [[u for u in keep if u not in drop] for drop in map(set, chunks)] if n > 2 else []
+            candidates = chunks + complements
+            results = await self.outcomes([variant(c) for c in candidates], duts, timeout)
+            hit = next((k for k, r in enumerate(results) if r["signature"] == target), None)
+            if hit is None:
+                if n >= len(keep):
+                    break
+                n = min(len(keep), 2 * n)
+            elif hit < len(chunks):
+                keep, n = chunks[hit], 2
+            else:
+                keep, n = candidates[hit], max(n - 1, 2)
+
+        reduced = variant(keep)
+        last = self.cache[reduced.id]
+        spent = self.stats - before
+        report = {"signature": target, "insns": (len(units), len(keep)),
+                  "cycles": (first["cycles"], last["cycles"]),
+                  **{k: spent[k] for k in ("runs", "cache_hits", "rounds")}}
+        return reduced, report
+
+def build_reducer(config: dict, root: Path, job: Optional[Job] = None) -> Reducer:
+    cfg = config.get("reduce", {})
+    execution = config["execution"]
+    if job is None:
+        job = execute_job(DifferentialChecker(**execution.get("checker", {})), shared_filter())
+    return Reducer(job, root / execution.get("scratch_dir", "sandbox") / "reduce",
+                   workers=cfg.get("workers", 4), timeout_factor=cfg.get("timeout_factor", 4.0),
+                   min_timeout=cfg.get("min_timeout_sec", 1.0))
+
+def describe(tc: Testcase, reduced: Testcase, report: dict) -> str:
+    (before, after), (c0, c1) = report["insns"], report["cycles"]
+    return (f"{tc.id} → {reduced.id}: {before} → {after} instructions "
+            f"({100 * (1 - after / max(before, 1)):.0f}% smaller), {c0} → {c1} ISS cycles; "
+            f"{report['runs']} variants simulated, {report['cache_hits']} cache hits, "
+            f"{report['rounds']} parallel rounds")
+
+async def reduce_cli(args):
+    triage: Optional[Triage] = None
+    bucket_sig = None
+    if Path(args.test).exists():
+        tc = Testcase.from_file(Path(args.test), source="reduce")
+    else:
+        triage = build_triage(CONFIG, ROOT)
+        bucket_sig = next((s for s, b in triage.buckets.items() if b["id"] == args.test), None)
+        if bucket_sig is None:
+            print(f"[ERROR] {args.test}: no such file or triage bucket")
+            sys.exit(1)
+        tc = Testcase.from_file(triage.out_dir / f"{args.test}.s", source="reduce")
+    reducer = build_reducer(CONFIG, ROOT)
+    if args.workers:
+        reducer.workers = args.workers
+    try:
+        reduced, report = await reducer.reduce(tc, bucket_sig)
+    except ReduceError as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
+    print(f"[REDUCE] {describe(tc, reduced, report)}")
+    if triage is not None:
+        bucket = triage.buckets[bucket_sig]
+        bucket.update(repro=reduced.id, size=report["insns"][1], reduced_from=tc.id)
+        (triage.out_dir / f"{args.test}.s").write_text(reduced.code)
+        triage.save()
+        print(f"[REDUCE] bucket {args.test} ({bucket_sig}) → {triage.out_dir / f'{args.test}.s'}")
+    if args.out:
+        args.out.mkdir(parents=True, exist_ok=True)
+        print(f"[REDUCE] {reduced.id} → {reduced.save(args.out)}")
+    elif triage is None:
+        print(reduced.code)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("test", help="a .s file or a triage bucket id")
+    ap.add_argument("--out", type=Path, help="write <reduced id>.s here")
+    ap.add_argument("--workers", type=int, default=0, help="variants simulated at once (default: reduce.workers)")
+    asyncio.run(reduce_cli(ap.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# scripts/analyse/trace_coverage.py
+"""
+Per-test coverage points read off a columnar ISS trace (utils/trace.py)
+- pc:<addr>                        every retired PC
+- opcode:<mnemonic>                every retired instruction class (rvisa.decode_many;
+                                   the names mutate/mutator/directed.py summarises)
+- branch:<mnemonic>:taken|not_taken, branch:<addr>:taken|not_taken
+                                   conditional branch direction: taken if the next
+                                   retired PC is not pc + size
+- toggle:<reg>:<bit>:rise|fall     register bit toggles between two consecutive
+                                   writes of the same register (x1..x31, f0..f31)
+- toggle:<csr>:<bit>:rise|fall, csr:<name>:write, csr:<mcause|scause>=<value>
+                                   CSR field transitions, CSRs written, trap causes
+- priv:<level>, priv:<a>-><b>      privilege levels visited and transitions
+- analyse_log() is the process-pool job: it reads logs/iss/<id>.trc itself
+  (memory-mapped) and only sends point names and the log meta back
+"""
+from pathlib import Path
+from typing import Set, Tuple
+
+import numpy as np
+
+from utils import rvisa
+from utils.trace import TraceArray, XREGS, FREGS, CSRS
+from utils.tracefile import TraceFile
+
+BRANCHES = ("beq", "bne", "blt", "bge", "bltu", "bgeu", "c.beqz", "c.bnez")
+BRANCH_IDS = np.array([i for i, op in enumerate(rvisa.OPCODES) if op.name in BRANCHES], dtype=np.int32)
+SIZES = np.array([op.size for op in rvisa.OPCODES], dtype=np.uint64)
+TOGGLED = XREGS[1:] + FREGS + [c for c in CSRS if c != "priv"]  # x0 never changes
+CAUSES = ("mcause", "scause")
+
+def _bits(mask: int):
+    return (b for b in range(64) if mask >> b & 1)
+
+def _opcodes(trace: TraceArray) -> np.ndarray:
+    """OPCODES index per row (-1 = illegal / no insn), decoding each distinct word once."""
+    words = trace.column("insn")
+    words = np.where((words & np.uint64(3)) == np.uint64(3), words & np.uint64(0xFFFFFFFF),
+                     words & np.uint64(0xFFFF))
+    uniq, inverse = np.unique(words, return_inverse=True)
+    return rvisa.decode_many(uniq)[inverse]
+
+def _branch_points(pc: np.ndarray, ops: np.ndarray) -> Set[str]:
+    rows = np.flatnonzero(np.isin(ops[:-1], BRANCH_IDS))  # the last row has no successor
+    if not len(rows):
+        return set()
+    taken = (pc[rows + 1] != pc[rows] + SIZES[ops[rows]]).astype(np.int64)
+    label = ("not_taken", "taken")
+    out = {f"branch:{rvisa.OPCODES[k >> 1].name}:{label[k & 1]}"
+           for k in np.unique(ops[rows].astype(np.int64) << 1 | taken).tolist()}
+    for addr, t in set(zip(pc[rows].tolist(), taken.tolist())):
+        out.add(f"branch:0x{addr:x}:{label[t]}")
+    return out
+
+def _toggle_points(trace: TraceArray) -> Set[str]:
+    out = set()
+    for name in TOGGLED:
+        col = trace.index.get(name)
+        if col is None:
+            continue
+        v = trace.values[trace.valid[:, col], col]
+        if len(v) and name in CSRS:
+            out.add(f"csr:{name}:write")
+            if name in CAUSES:
+                out.update(f"csr:{name}=0x{c:x}" for c in np.unique(v).tolist())
+        if len(v) < 2:
+            continue
+        rise = int(np.bitwise_or.reduce(~v[:-1] & v[1:]))
+        fall = int(np.bitwise_or.reduce(v[:-1] & ~v[1:]))
+        out.update(f"toggle:{name}:{b}:rise" for b in _bits(rise))
+        out.update(f"toggle:{name}:{b}:fall" for b in _bits(fall))
+    return out
+
+def _priv_points(trace: TraceArray) -> Set[str]:
+    col = trace.index.get("priv")
+    if col is None:
+        return set()
+    p = trace.values[trace.valid[:, col], col].astype(np.int64)
+    out = {f"priv:{level}" for level in np.unique(p).tolist()}
+    step = np.flatnonzero(p[:-1] != p[1:])
+    out.update(f"priv:{a}->{b}" for a, b in set(zip(p[step].tolist(), p[step + 1].tolist())))
+    return out
+
+def trace_points(trace: TraceArray) -> Set[str]:
+    """Every coverage point one trace hits (see the module docstring for the names)."""
+    if not len(trace):
+        return set()
+    pc = trace.column("pc")
+    ops = _opcodes(trace)
+    points = {f"pc:0x{p:x}" for p in np.unique(pc).tolist()}
+    points.update(f"opcode:{rvisa.OPCODES[i].name}" for i in np.unique(ops).tolist() if i >= 0)
+    points |= _branch_points(pc, ops)
+    points |= _toggle_points(trace)
+    points |= _priv_points(trace)
+    return points
+
+def analyse_log(path: Path) -> Tuple[Set[str], dict]:
+    """Process-pool job: (coverage points, log meta with cycles/exit/trap) of one .trc."""
+    with TraceFile(path) as tf:
+        return trace_points(tf.read()), dict(tf.meta)
@@ -0,0 +1,147 @@
+# scripts/analyse/triage.py
+"""
+Mismatch triage: bucket divergences by signature before any LLM call
+- signature of a mismatching test: kind of its first divergence (earliest
+  ISS row), the opcode the ISS retired there, the field involved (x5, pc,
+  mstatus, ...) and the set of DUTs that disagree, e.g.
+  "reg:mulh:x7:dut1" or "pc:c.jalr:pc:dut0,1,2"
+- every bucket keeps its smallest reproducer (fewest instructions, by
+  utils/asm_util.parse_instruction) in <dir>/<bucket>.s
+- only a new bucket gets a property: one representative (its smallest
+  reproducer of the batch) per bucket, all generated concurrently through
+  the shared AsyncLLM; a failed call (empty result) is not stored and the
+  bucket is retried by the next synthesise(), also after a restart
+- the bucket index is a small JSON file written with tmp + rename (like
+  mopt.json), so buckets, and the properties already paid for, survive
+  restarts
+"""
+import json
+import asyncio
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from utils import rvisa
+from utils.asm_util import parse_instruction
+from utils.lineage import code_hash
+from utils.models import Testcase
+from utils.trace import TraceArray
+from utils.tracefile import TraceFile
+from scripts.execute.checker import Mismatch
+from scripts.analyse.property_generator import PropertyGenerator
+
+def first_divergence(mismatches: List[Mismatch]) -> Mismatch:
+    return min(mismatches, key=lambda m: (m.cycle, m.dut_id))
+
+def opcode_of(trace: TraceArray, row: int) -> str:
+    """Mnemonic the ISS retired at `row` of an in-memory trace ("?" if it has no such row)."""
+    if not 0 <= row < len(trace) or "insn" not in trace.index:
+        return "?"
+    insn = rvisa.decode(int(trace.column("insn")[row]))
+    return insn.name if insn is not None else "illegal"
+
+def opcode_at(iss_log: Optional[Path], row: int) -> str:
+    """Same, read from a .trc log (only the chunk holding `row`)."""
+    if iss_log is None or not iss_log.exists():
+        return "?"
+    with TraceFile(iss_log) as tf:
+        if not 0 <= row < len(tf):
+            return "?"
+        return opcode_of(tf.read(row, row + 1), 0)
+
+def signature(mismatches: List[Mismatch], opcode: str) -> str:
+    m = first_divergence(mismatches)
+    duts = ",".join(str(d) for d in sorted({x.dut_id for x in mismatches}))
+    return f"{m.type}:{opcode}:{m.field or m.type}:dut{duts}"
+
+def signature_duts(sig: str) -> List[int]:
+    """DUT ids named by a signature ("...:dut0,2" → [0, 2])."""
+    return [int(d) for d in sig.rsplit(":dut", 1)[1].split(",") if d]
+
+def size(code: str) -> int:
+    """Instructions in a program (labels, directives and comments do not count)."""
+    return sum(1 for line in code.splitlines() if parse_instruction(line)[0])
+
+def describe(m: Mismatch, opcode: str) -> str:
+    fmt = lambda v: f"0x{v:x}" if isinstance(v, int) else str(v)
+    return (f"{m.type} mismatch on {m.field or m.type} after {opcode}: "
+            f"expected {fmt(m.expected)}, got {fmt(m.actual)}")
+
+class Triage:
+    def __init__(self, state_path: Optional[Path] = None, out_dir: Optional[Path] = None,
+                 prop_gen: Optional[PropertyGenerator] = None):
+        self.state_path = state_path
+        self.out_dir = out_dir
+        self.prop_gen = prop_gen
+        self.buckets: Dict[str, dict] = {}
+        self._fresh: Dict[str, None] = {}  # new buckets awaiting a property, in order
+        self.stats: Counter = Counter()
+        self._load()
+
+    # === Persistence ===
+    def _load(self):
+        if self.state_path is not None and self.state_path.exists():
+            self.buckets = json.loads(self.state_path.read_text())
+        self._fresh = {sig: None for sig, b in self.buckets.items() if not b.get("property")}
+
+    def save(self):
+        if self.state_path is None:
+            return
+        tmp = self.state_path.with_name(self.state_path.name + ".tmp")
+        tmp.write_text(json.dumps(self.buckets, indent=1))
+        tmp.replace(self.state_path)
+
+    # === Bucketing ===
+    def add(self, tc: Testcase, mismatches: List[Mismatch], iss_log: Optional[Path] = None) -> Tuple[str, bool]:
+        """File one mismatching test; returns (signature, whether the bucket is new)."""
+        m = first_divergence(mismatches)
+        opcode = opcode_at(iss_log, m.cycle)
+        sig = signature(mismatches, opcode)
+        n = size(tc.code)
+        self.stats["tests"] += 1
+        bucket = self.buckets.get(sig)
+        new = bucket is None
+        if new:
+            bucket = self.buckets[sig] = {"id": code_hash(sig), "count": 0, "first": tc.id,
+                                          "repro": None, "size": None, "property": None}
+            self._fresh[sig] = None
+            self.stats["new"] += 1
+        bucket["count"] += 1
+        if bucket["size"] is None or n < bucket["size"]:
+            bucket.update(repro=tc.id, size=n, mismatch=describe(m, opcode), cycle=m.cycle, dut=m.dut_id)
+            if self.out_dir is not None and tc.code:
+                self.out_dir.mkdir(parents=True, exist_ok=True)
+                (self.out_dir / f"{bucket['id']}.s").write_text(tc.code)
+        return sig, new
+
+    # === Properties ===
+    async def _property(self, sig: str):
+        bucket = self.buckets[sig]
+        prop = await self.prop_gen.from_mismatch(bucket["mismatch"], bucket["cycle"], dut=f"DUT{bucket['dut']}")
+        if not prop:  # failed LLM call: keep the bucket queued
+            self._fresh[sig] = None
+            self.stats["failed"] += 1
+            print(f"[TRIAGE] {bucket['id']} {sig}: no property, retried next batch")
+            return
+        bucket["property"] = prop
+        self.stats["properties"] += 1
+        print(f"[TRIAGE] {bucket['id']} {sig} ({bucket['repro']}, {bucket['size']} insns) → {prop}")
+
+    async def synthesise(self):
+        """One property per bucket opened since the last call, concurrently."""
+        fresh, self._fresh = list(self._fresh), {}
+        if self.prop_gen is not None and fresh:
+            await asyncio.gather(*(self._property(sig) for sig in fresh))
+        self.save()
+
+    def report(self) -> str:
+        """Totals since start, not per batch."""
+        s = self.stats
+        return (f"triage total: {s['tests']} mismatching tests → {len(self.buckets)} buckets "
+                f"({s['new']} new, {s['properties']} properties, {s['failed']} failed calls, "
+                f"{len(self._fresh)} awaiting a property)")
+
+def build_triage(config: dict, root: Path, prop_gen: Optional[PropertyGenerator] = None) -> Triage:
+    cfg = config.get("triage", {})
+    return Triage(root / cfg.get("state", "triage.json"), root / cfg.get("dir", "triage"),
+                  prop_gen if cfg.get("properties", True) else None)
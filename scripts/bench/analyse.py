@@ -0,0 +1,114 @@
+# scripts/bench/analyse.py
+"""
+Benchmark: the analyse stage on synthetic ISS traces
+- --tests traces of --rows retired instructions each: legal RV64GC words
+  (rvisa), branches taken at random, register/CSR writes and a few
+  privilege switches, written as .trc like the execute stage does
+- serial:  one test at a time, coverage + W$ flushed per test (the
+  pre-batch write pattern)
+- thread:  Analyser(workers=1), jobs in a thread, one batched write
+- pool:    Analyser(workers=--workers), jobs on a process pool, one batched write
+
+    python scripts/bench/analyse.py [--tests 64 --rows 20000 --workers 0]
+"""
+
+import io
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import contextlib
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils import rvisa
+from utils.models import Testcase
+from utils.trace import TraceArray
+from utils.tracefile import write_trace
+from utils.wcache import WeightCache
+from scripts.analyse.analyse import Analyser, bug_score, CONFIG
+from scripts.analyse.coverage_fusion import CoverageFusion
+from scripts.analyse.trace_coverage import analyse_log
+
+def legal_words(rng: random.Random, n: int) -> list:
+    out = []
+    while len(out) < n:
+        op = rng.choice(rvisa.OPCODES)
+        word = op.match | (rng.getrandbits(8 * op.size) & ~op.mask)
+        insn = rvisa.decode(word)
+        if insn is not None:
+            out.append((insn.word, insn.size, insn.name in ("beq", "bne", "blt", "bge", "c.beqz")))
+    return out
+
+def make_trace(rng: random.Random, words: list, rows: int) -> TraceArray:
+    pick = [words[rng.randrange(len(words))] for _ in range(rows)]
+    pc, pcs = 0x80000000, []
+    for _, size, branch in pick:
+        pcs.append(pc)
+        pc += rng.choice((-64, 32)) if branch and rng.random() < 0.5 else size
+    records = []
+    for i, (word, _, _) in enumerate(pick):
+        rec = {"pc": pcs[i], "insn": word, "priv": 3 if i % 5000 < 4900 else 1}
+        rec[f"x{rng.randrange(1, 32)}"] = rng.getrandbits(64)
+        if rng.random() < 0.01:
+            rec["mstatus"] = rng.getrandbits(64) & 0x1888
+        records.append(rec)
+    return TraceArray.from_records(records)
+
+def fresh(tmp: Path, name: str):
+    wcache = WeightCache(tmp / f"{name}.wcache.json", CONFIG["wcache"])
+    return wcache, CoverageFusion(tmp / f"{name}.bitmap")
+
+def serial(tests: list, tmp: Path) -> int:
+    wcache, coverage = fresh(tmp, "serial")
+    for tc, log in tests:
+        points, meta = analyse_log(log)
+        new = coverage.update(points, tc.id)  # flushed per test
+        wcache.update(tc, new / (new + 16.0), bug_score([]), meta["cycles"])
+        wcache.flush()
+    return coverage.total_covered()
+
+async def batched(tests: list, tmp: Path, name: str, workers: int) -> int:
+    wcache, coverage = fresh(tmp, name)
+    with Analyser(wcache, coverage, workers=workers) as analyser:
+        for tc, log in tests:
+            analyser.submit(tc, log, [])
+        await analyser.commit()
+    return coverage.total_covered()
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--tests", type=int, default=64)
+    ap.add_argument("--rows", type=int, default=20000, help="retired instructions per trace")
+    ap.add_argument("--workers", type=int, default=0, help="pool size (0 → cpu_count)")
+    args = ap.parse_args()
+    rng = random.Random(0)
+    words = legal_words(rng, 2048)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        tests = []
+        for k in range(args.tests):
+            log = tmp / f"t{k:04d}.trc"
+            write_trace(log, make_trace(rng, words, args.rows), meta={"cycles": args.rows, "exit": 0, "trap": None})
+            tests.append((Testcase(id=f"t{k:04d}", code="", source="bench", path=log), log))
+        rows = args.tests * args.rows
+        timings = {}
+        for name, run in (("serial", lambda: serial(tests, tmp)),
+                          ("thread", lambda: asyncio.run(batched(tests, tmp, "thread", 1))),
+                          ("pool", lambda: asyncio.run(batched(tests, tmp, "pool", args.workers)))):
+            t0 = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):  # W$ prints one line per test
+                covered = run()
+            timings[name] = time.perf_counter() - t0
+            print(f"{name:>7}: {timings[name]:7.2f}s  {args.tests / timings[name]:7.1f} tests/s  "
+                  f"{rows / timings[name] / 1e6:6.2f} M rows/s  ({covered} points covered)")
+    print(f"pool vs serial: {timings['serial'] / timings['pool']:.1f}x "
+          f"({args.workers or os.cpu_count()} workers, {os.cpu_count()} cpus)")
+
+if __name__ == "__main__":
+    main()
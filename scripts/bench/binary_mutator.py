@@ -0,0 +1,90 @@
+# scripts/bench/binary_mutator.py
+"""
+Benchmark: valid-mutant yield per second, BinaryMutator on assembled words
+vs the original text-bytes mutator
+"Valid" = LightweightFilter passes and every emitted word is a legal
+encoding (legacy text mutants: every line still parses as a known
+instruction, directive or label). Seeds are assembled in-process (utils.rvisa).
+
+    python scripts/bench/binary_mutator.py --seconds 3
+"""
+
+import sys
+import time
+import random
+import hashlib
+import argparse
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.models import Testcase
+from utils.asm_util import is_valid_instruction
+from scripts.execute.filter import LightweightFilter
+from scripts.mutate.mutator.binary import BinaryMutator, parse_words, is_legal
+
+SEEDS = PROJECT_ROOT / "corpus" / "initial_seeds"
+
+def legacy_mutate(tc: Testcase, n: int, filter: LightweightFilter) -> list:
+    """The mutator as it was: text bytes reinterpreted as 32-bit words (field ops ≈ one bit flip)."""
+    mutants = []
+    code_bytes = tc.code.encode("utf-8", errors="ignore")
+    if len(code_bytes) % 4 != 0:
+        return mutants
+    instrs = [int.from_bytes(code_bytes[i:i + 4], "little") for i in range(0, len(code_bytes), 4)]
+    for _ in range(n):
+        mutated = list(instrs)
+        idx = random.randrange(len(mutated))
+        mutated[idx] ^= 1 << random.randrange(32)
+        try:
+            code = b"".join(i.to_bytes(4, "little") for i in mutated).decode()
+        except UnicodeDecodeError:
+            continue
+        mutant = Testcase(id="", code=code, source="binary_isa", path=tc.path)
+        if filter.is_valid(mutant):
+            mutant.id = hashlib.sha256(code.encode()).hexdigest()[:12]
+            mutants.append(mutant)
+    return mutants
+
+def valid(mutant: Testcase) -> bool:
+    words = parse_words(mutant.code)
+    if words is not None:
+        return all(is_legal(s, w) for s, w in words)
+    # legacy text mutant: every line must still be a directive/label or a known instruction
+    lines = [l.strip() for l in mutant.code.splitlines() if l.strip()]
+    return all(l.startswith(".") or l.endswith(":") or l == "ebreak" or is_valid_instruction(l)
+               for l in lines)
+
+def run(name, fn, seeds, seconds):
+    produced = ok = calls = 0
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < seconds:
+        for tc in seeds:
+            out = fn(tc)
+            calls += 1
+            produced += len(out)
+            ok += sum(map(valid, out))
+    dt = time.perf_counter() - t0
+    print(f"{name:>8}: {calls / dt:9.0f} seeds/s, {produced / dt:9.0f} mutants/s, "
+          f"{ok / dt:9.0f} valid/s ({ok / max(produced, 1):.0%} of mutants)")
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--seconds", type=float, default=3.0)
+    ap.add_argument("-n", type=int, default=3, help="mutations per seed")
+    args = ap.parse_args()
+
+    text_seeds = [Testcase.from_file(f, source="bench") for f in sorted(SEEDS.glob("*.S"))]
+    mutator = BinaryMutator(mutations_per_seed=args.n)
+    word_seeds = [tc for tc in text_seeds if mutator.text_words(tc)]
+
+    filter = LightweightFilter()
+    # legacy bails out unless len(text) % 4 == 0; pad so it gets to mutate at all
+    padded = [Testcase(id=tc.id, code=tc.code + "\n" * (-len(tc.code.encode()) % 4), source="bench",
+                       path=tc.path) for tc in text_seeds]
+    run("legacy", lambda tc: legacy_mutate(tc, args.n, filter), padded, args.seconds)
+    run("words", mutator.mutate, word_seeds, args.seconds)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# scripts/bench/cfg.py
+"""
+Benchmark: execute stage with the string-rule filter vs the static CFG stage
+(scripts/execute/cfg.py) on a batch of mutants
+- --tests programs: mostly short straight-line code or small counted loops,
+  some counted loops of 2-8 x 10^4 iterations (expensive but bounded), and
+  some endless loops the string rules miss (a spin on a known-true register,
+  a back jump to an ordinary label, beq x0, x0)
+- a stand-in simulator sleeps --overhead plus --insn-us per dynamic
+  instruction, capped at --timeout; endless programs always burn the timeout
+- string rules: every passing program runs in arrival order
+- cfg stage:    no_exit programs are rejected, programs bounded above
+  --defer-insns are deferred and run last, cheapest first
+- reports wall time, timeouts burned and the time until the cheap programs
+  (bounded at or below --defer-insns) have all finished
+
+    python scripts/bench/cfg.py [--tests 200 --workers 4 --timeout 1.0]
+"""
+
+import sys
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.models import Testcase
+from scripts.execute.filter import LightweightFilter
+from scripts.execute.scheduler import Deferred, ExecScheduler
+
+FILLER = ["addi x{a}, x{b}, {i}", "add x{a}, x{b}, x{c}", "xor x{a}, x{b}, x{c}", "slli x{a}, x{b}, 3",
+          "sub x{a}, x{b}, x{c}", "mul x{a}, x{b}, x{c}", "sltu x{a}, x{b}, x{c}"]
+
+def filler(rng: random.Random, n: int) -> list:
+    return [f"    {rng.choice(FILLER).format(a=rng.randrange(10, 28), b=rng.randrange(1, 31), c=rng.randrange(1, 31), i=rng.randrange(-500, 500))}"
+            for _ in range(n)]
+
+def program(rng: random.Random, kind: str) -> tuple:
+    """(assembly, dynamic instructions it really runs; None: endless)."""
+    pre, post = filler(rng, rng.randrange(5, 30)), filler(rng, rng.randrange(5, 30))
+    body = filler(rng, rng.randrange(2, 8))
+    if kind == "straight":
+        mid, insns = [], 0
+    elif kind in ("loop", "long"):
+        trips = rng.randrange(4, 64) if kind == "loop" else rng.randrange(20_000, 80_000)
+        mid = [f"    li x5, {trips}", "body:"] + body + ["    addi x5, x5, -1", "    bnez x5, body"]
+        insns = (1 if trips < 2048 else 2) + trips * (len(body) + 2)
+    else:
+        mid = {"spin": ["    li x6, 1", "spin:"] + body + ["    bnez x6, spin"],
+               "back": ["again:"] + body + ["    j again"],
+               "beq0": ["retry:"] + body + ["    beq x0, x0, retry"]}[kind]
+        insns = None
+    lines = [".global _start", "_start:"] + pre + mid + post + ["    ebreak"]
+    return "\n".join(lines) + "\n", insns if insns is None else len(pre) + insns + len(post) + 1
+
+def make_tests(n: int, rng: random.Random) -> list:
+    kinds = ["straight"] * 40 + ["loop"] * 35 + ["long"] * 10 + ["spin", "back", "beq0"] * 5
+    tests = []
+    for k in range(n):
+        code, insns = program(rng, rng.choice(kinds))
+        tests.append((Testcase(id=f"t{k:04d}", code=code, source="bench", path=Path("")), insns))
+    return tests
+
+async def run(tests: list, filter: LightweightFilter, args, defer: bool) -> dict:
+    truth = {tc.id: insns for tc, insns in tests}
+    cap = int(args.timeout / (args.insn_us * 1e-6))
+    cheap = {tc.id for tc, insns in tests if insns is not None and insns <= args.defer_insns}
+    out = {"timeouts": 0, "ran": 0, "rejected": 0, "deferred": 0}
+    finished = {}
+    t0 = time.perf_counter()
+
+    async def simulate(tc: Testcase, workdir: Path) -> dict:
+        insns = truth[tc.id]
+        out["ran"] += 1
+        out["timeouts"] += insns is None or insns > cap
+        await asyncio.sleep(args.overhead + args.insn_us * 1e-6 * min(cap, insns if insns is not None else cap))
+        finished[tc.id] = time.perf_counter() - t0
+        return {"cycles": insns}
+
+    async def job(tc: Testcase, workdir: Path):
+        rule, bound = filter.assess(tc)
+        if rule is not None:
+            out["rejected"] += 1
+            return None
+        if defer and bound is not None and bound > args.defer_insns:
+            out["deferred"] += 1
+            return Deferred(lambda wd: simulate(tc, wd), priority=bound)
+        return await simulate(tc, workdir)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        scheduler = ExecScheduler(job, Path(tmp), args.workers)
+        for tc, _ in tests:
+            await scheduler.submit(tc)
+        await scheduler.drain()
+    out["wall"] = time.perf_counter() - t0
+    out["cheap_done"] = max((finished[k] for k in cheap if k in finished), default=0.0)
+    return out
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--tests", type=int, default=200)
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--timeout", type=float, default=1.0, help="stand-in simulator timeout (s)")
+    ap.add_argument("--overhead", type=float, default=0.02, help="stand-in simulator start-up (s)")
+    ap.add_argument("--insn-us", type=float, default=2.0, help="stand-in time per dynamic instruction (µs)")
+    ap.add_argument("--defer-insns", type=int, default=200_000)
+    args = ap.parse_args()
+    tests = make_tests(args.tests, random.Random(0))
+
+    cfg = LightweightFilter(cfg=True)
+    t0 = time.perf_counter()
+    verdicts = [cfg.assess(tc) for tc, _ in tests]
+    t_analyse = time.perf_counter() - t0
+    unsound = sum(1 for (tc, insns), (_, bound) in zip(tests, verdicts)
+                  if bound is not None and (insns is None or bound < insns))
+    endless = sum(1 for _, insns in tests if insns is None)
+    caught = sum(1 for (_, insns), (rule, _) in zip(tests, verdicts) if insns is None and rule == "no_exit")
+    bounded = sum(1 for _, bound in verdicts if bound is not None)
+    print(f"cfg stage: {1e3 * t_analyse / len(tests):.2f} ms/program; {caught}/{endless} endless loops "
+          f"rejected; {bounded}/{len(tests) - endless} bounded; {unsound} bounds below the real count")
+
+    runs = {"string rules": asyncio.run(run(tests, LightweightFilter(), args, defer=False)),
+            "cfg stage": asyncio.run(run(tests, cfg, args, defer=True))}
+    for name, r in runs.items():
+        print(f"{name:>13}: {r['wall']:6.2f}s wall, {r['ran']} simulated, {r['timeouts']} timeouts, "
+              f"{r['rejected']} rejected, {r['deferred']} deferred; cheap tests done after {r['cheap_done']:.2f}s")
+    a, b = runs["string rules"], runs["cfg stage"]
+    print(f"{a['wall'] / b['wall']:.1f}x less wall time, cheap results {a['cheap_done'] / max(b['cheap_done'], 1e-9):.1f}x sooner")
+
+if __name__ == "__main__":
+    main()
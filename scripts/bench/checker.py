@@ -0,0 +1,74 @@
+# scripts/bench/checker.py
+"""
+Benchmark: columnar DifferentialChecker vs the original per-cycle dict loop
+Scenario: ISS + 3 DUTs, DUT1 slips its PC early (the worst case for the
+old checker, which emits one Mismatch per differing field per cycle).
+
+    python scripts/bench/checker.py --cycles 1000000
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from scripts.execute.checker import DifferentialChecker, Mismatch
+from utils.trace import TraceArray
+
+def legacy_compare(iss_trace, dut_traces, dut_ids):
+    """The checker as it was: Python loop over cycles, DUTs and x0..x3."""
+    mismatches = []
+    min_len = min(len(iss_trace), min(len(d) for d in dut_traces))
+    for cycle in range(min_len):
+        iss_state = iss_trace[cycle]
+        for dut_id, dut_trace in zip(dut_ids, dut_traces):
+            dut_state = dut_trace[cycle]
+            if iss_state.get("pc") != dut_state.get("pc"):
+                mismatches.append(Mismatch(cycle=cycle, type="pc", expected=iss_state.get("pc"),
+                                           actual=dut_state.get("pc"), dut_id=dut_id))
+            for reg in ["x0", "x1", "x2", "x3"]:
+                if iss_state.get(reg) != dut_state.get(reg):
+                    mismatches.append(Mismatch(cycle=cycle, type="reg", expected=iss_state.get(reg),
+                                               actual=dut_state.get(reg), dut_id=dut_id))
+    return mismatches
+
+def make_traces(cycles: int, slip_at: int):
+    iss = [{"pc": 0x80000000 + 4 * i, "x1": i, "x2": i + 1, "x3": i + 2} for i in range(cycles)]
+    slipped = iss[:slip_at] + [{**r, "pc": r["pc"] + 4} for r in iss[slip_at:]]
+    return iss, [iss, slipped, iss]
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - start
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--cycles", type=int, default=1_000_000)
+    ap.add_argument("--slip-at", type=int, default=40)
+    args = ap.parse_args()
+
+    iss, duts = make_traces(args.cycles, args.slip_at)
+    ids = [0, 1, 2]
+    print(f"[BENCH] {args.cycles} cycles x {len(duts)} DUTs, DUT1 slips at cycle {args.slip_at}")
+
+    legacy, t_legacy = timed(legacy_compare, iss, duts, ids)
+    print(f"  legacy loop        : {t_legacy:8.3f}s  {len(legacy)} mismatches")
+
+    (iss_arr, dut_arrs), t_conv = timed(
+        lambda: (TraceArray.from_records(iss), [TraceArray.from_records(d) for d in duts]))
+    print(f"  records → columns  : {t_conv:8.3f}s  (one-off; binary logs skip this)")
+
+    for label, checker in [
+        ("columnar first-only", DifferentialChecker(first_only=True)),
+        ("columnar all fields", DifferentialChecker(first_only=False)),
+    ]:
+        found, t = timed(checker.compare, iss_arr, dut_arrs, ids)
+        print(f"  {label:19s}: {t:8.3f}s  {len(found)} mismatches "
+              f"({t_legacy / max(t, 1e-9):.0f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+# scripts/bench/directed.py
+"""
+Benchmark: coverage gained per token, LLMMutator (undirected) vs
+DirectedLLMMutator (uncovered points summarised into the prompt)
+- Both modes replay the same seed batches against the same stand-in model
+  and start from the coverage of corpus/initial_seeds
+- Coverage is the opcode class coverage the directed summary uses
+  ("opcode:<mnemonic>"), read off each accepted mutant with rvisa
+- The stand-in model writes --insns instructions per mutant: with
+  probability --compliance one of the opcodes named in the prompt,
+  otherwise, with probability --explore, any RV64GC opcode, else one of
+  the handful of instructions real models fall back to
+- Tokens are counted as in bench/llm.py (prompt / completion chars / 4)
+
+    python scripts/bench/directed.py [--batch 8 --rounds 6 --compliance 0.5]
+"""
+
+import re
+import sys
+import random
+import argparse
+import tempfile
+from collections import Counter
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import utils.llm as llm
+from utils import rvisa
+from utils.models import Testcase
+from scripts.analyse.coverage_fusion import CoverageFusion
+from scripts.mutate.mutator.gen import LLMMutator
+from scripts.mutate.mutator.directed import DirectedLLMMutator
+
+SEEDS = PROJECT_ROOT / "corpus" / "initial_seeds"
+HABITS = ["addi", "add", "sub", "xor", "or", "and", "slli", "lui", "ld", "sd", "lw", "sw",
+          "beq", "bne", "mul", "fence.i"]
+
+def instruction(name: str, pc: int, rng: random.Random) -> str:
+    """Assembly text of a random legal encoding of `name` at `pc`."""
+    op = rvisa.BY_NAME[name]
+    for _ in range(64):
+        word = op.match | (rng.getrandbits(8 * op.size) & ~op.mask)
+        insn = rvisa.decode(word, pc)
+        if insn is not None and insn.name == name:
+            return insn.text()
+    return "addi x5, x5, 1"
+
+def points(code: str) -> set:
+    return {f"opcode:{rvisa.decode(w).name}" for _, w in rvisa.assemble(code)}
+
+class StandInLLM:
+    """AsyncLLM-shaped: call() → (content, prompt_tokens, completion_tokens)."""
+
+    def __init__(self, compliance: float, explore: float, insns: int, seed: int = 0):
+        self.compliance = compliance
+        self.explore = explore
+        self.insns = insns
+        self.rng = random.Random(seed)
+        self.stats: Counter = Counter()
+
+    def targets(self, prompt: str) -> list:
+        names = []
+        for labels in re.findall(r"^- opcode/\S+ \([^)]*\): (.*)$", prompt, re.MULTILINE):
+            names += [l for l in re.sub(r" \(\+\d+ more\)$", "", labels).split(", ") if l in rvisa.BY_NAME]
+        return names
+
+    def program(self, targets: list) -> str:
+        lines, pc = [], 0
+        for _ in range(self.insns):
+            if targets and self.rng.random() < self.compliance:
+                name = self.rng.choice(targets)
+            elif self.rng.random() < self.explore:
+                name = self.rng.choice(rvisa.OPCODES).name
+            else:
+                name = self.rng.choice(HABITS)
+            lines.append(f"    {instruction(name, pc, self.rng)}")
+            pc += rvisa.BY_NAME[name].size
+        return ".global _start\n_start:\n" + "\n".join(lines) + "\n    ebreak"
+
+    async def call(self, user_prompt: str, system_prompt: str = "", **kw):
+        self.stats["requests"] += 1
+        k = re.search(r"Give (\d+) different", user_prompt)
+        targets = self.targets(user_prompt)
+        blocks = [self.program(targets) for _ in range(int(k.group(1)) if k else 1)]
+        content = "\n\n".join(f"```asm\n{b}\n```" for b in blocks)
+        return content, (len(system_prompt) + len(user_prompt)) // 4, len(content) // 4
+
+def run(mode: str, args, seeds: list, tmp: Path) -> list:
+    """[(tokens, points gained)] after each round."""
+    coverage = CoverageFusion(tmp / f"{mode}.bitmap")
+    for s in seeds:
+        coverage.update(points(s.code), s.id)
+    start = coverage.total_covered()
+    model = StandInLLM(args.compliance, args.explore, args.insns)
+    kw = dict(llm=model, candidates=args.candidates)
+    mutator = (DirectedLLMMutator(coverage, budget_tokens=args.budget, per_group=args.per_group, **kw)
+               if mode == "directed" else LLMMutator(**kw))
+    history, curve = {}, []
+    for r in range(args.rounds):
+        batch = [seeds[(r * args.batch + i) % len(seeds)] for i in range(args.batch)]
+        for m in mutator.batch_mutate(batch):
+            history[m.id] = {"cov_gain": coverage.update(points(m.code), m.id)}
+        if mode == "directed":
+            mutator.credit(coverage, history)
+        curve.append((mutator.stats["tokens"], coverage.total_covered() - start))
+    print(f"{mode:>10}: {mutator.report()}")
+    return curve
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--batch", type=int, default=8, help="seeds per round")
+    ap.add_argument("--rounds", type=int, default=6)
+    ap.add_argument("--candidates", type=int, default=4)
+    ap.add_argument("--insns", type=int, default=8, help="instructions per stand-in mutant")
+    ap.add_argument("--compliance", type=float, default=0.5,
+                    help="chance the stand-in model uses a named target")
+    ap.add_argument("--explore", type=float, default=0.02,
+                    help="chance the stand-in model picks any opcode instead of a habitual one")
+    ap.add_argument("--budget", type=int, default=256, help="summary budget (tokens)")
+    ap.add_argument("--per-group", type=int, default=8)
+    args = ap.parse_args()
+    llm.CACHE = None
+    seeds = [Testcase.from_file(f, source="seed") for f in sorted(SEEDS.glob("*.S"))]
+    with tempfile.TemporaryDirectory() as tmp:
+        curves = {mode: run(mode, args, seeds, Path(tmp)) for mode in ("undirected", "directed")}
+    print(f"{'':5} {'undirected':^23}  {'directed':^23}")
+    print(f"{'round':>5}" + f" {'new':>5} {'tokens':>8} {'new/1k':>8} " * 2)
+    for r, ((ut, ug), (dt, dg)) in enumerate(zip(curves["undirected"], curves["directed"])):
+        print(f"{r:5d} {ug:5d} {ut:8d} {1000 * ug / ut:8.3f}  {dg:5d} {dt:8d} {1000 * dg / dt:8.3f}")
+    (ut, ug), (dt, dg) = curves["undirected"][-1], curves["directed"][-1]
+    print(f"{'gain':>5}: {(dg / dt) / (ug / ut) if ug else float('inf'):.1f}x coverage per token "
+          f"after {args.rounds} rounds")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# scripts/bench/fetch.py
+"""
+Benchmark: per-iteration fetch latency, legacy glob+hash vs SeedStore
+Each size gets a fresh corpus dir of tiny .S files; W$ weights are set on
+1% of them. Legacy is skipped above --legacy-max seeds.
+
+    python scripts/bench/fetch.py --sizes 1000 10000 100000 1000000
+"""
+
+import io
+import sys
+import time
+import contextlib
+import random
+import argparse
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.seedstore import SeedStore
+import scripts.fetch.fetch as fetch_mod
+from scripts.fetch.fetch import load_seeds, select_seeds
+
+class FakeWCache:
+    def __init__(self, weights: dict):
+        self.ranked = sorted(weights.items(), key=lambda kv: -kv[1])
+
+    def top_k(self, k: int):
+        return self.ranked[:k]
+
+def make_corpus(root: Path, n: int) -> Path:
+    src = root / "seeds"
+    src.mkdir()
+    for i in range(n):
+        (src / f"s{i}.S").write_text(f".global _start\n_start:\n  addi x1, x0, {i}\n  ebreak\n")
+    return src
+
+def bench(n: int, batch: int, iters: int, legacy: bool):
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        make_corpus(root, n)
+        store = SeedStore(root / "store")
+
+        t = time.perf_counter()
+        store.scan(["seeds"], root)
+        cold = time.perf_counter() - t
+        ids = store.sample(max(n // 100, 1))
+        weights = {tid: random.random() for tid in ids}
+        store.set_weights(weights.items())
+
+        t = time.perf_counter()
+        for _ in range(iters):
+            store.scan(["seeds"], root)
+            store.select(batch)
+        warm = (time.perf_counter() - t) / iters
+        print(f"{n:>8} seeds | store: cold scan {cold:7.2f}s, per-iter fetch {warm * 1e3:7.2f} ms", end="")
+
+        if legacy:
+            fetch_mod.ROOT = root
+            wc = FakeWCache(weights)
+            t = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                seeds = load_seeds(["seeds"])
+                select_seeds(seeds, wc, batch)
+            print(f" | legacy {(time.perf_counter() - t) * 1e3:9.1f} ms", end="")
+        print()
+        store.close()
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    ap.add_argument("--batch", type=int, default=8)
+    ap.add_argument("--iters", type=int, default=50)
+    ap.add_argument("--legacy-max", type=int, default=100000)
+    args = ap.parse_args()
+    for n in args.sizes:
+        bench(n, args.batch, args.iters, n <= args.legacy_max)
+
+if __name__ == "__main__":
+    main()
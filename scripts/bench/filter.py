@@ -0,0 +1,99 @@
+# scripts/bench/filter.py
+"""
+Benchmark: compiled single-pass LightweightFilter vs the original
+(lower() + splitlines + uncompiled re.search per banned pattern)
+- --programs random RV64GC programs of 20-180 lines (rvisa text), a few
+  with loop labels, self-jumps, ".inf:" labels or fsgnj.s / fsgnj.d
+- every program is filtered twice, as in the pipeline (the mutator, then
+  execute): the original scans it both times, the shared filter answers
+  the second from its verdict cache
+- filter_batch with --processes workers over the same set, uncached
+- disagreements with the original are listed by cause; the only expected
+  ones are fsgnj.s / fsgnj.d and "j .L1", which the original rejected as "j ."
+
+    python scripts/bench/filter.py [--programs 20000 --processes 4]
+"""
+
+import re
+import sys
+import time
+import random
+import argparse
+from collections import Counter
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils import rvisa
+from utils.models import Testcase
+from scripts.execute.filter import LightweightFilter
+
+def legacy_is_valid(tc: Testcase) -> bool:
+    """The filter as it was."""
+    code = tc.code.lower()
+    lines = code.splitlines()
+    if len(lines) > 200:
+        return False
+    if code.count("loop:") > 3:
+        return False
+    if any(re.search(p, code) for p in [r"\.inf:", r"j\s*\.", r"loop:\s*loop"]):
+        return False
+    instr = [l for l in lines if l.strip() and not l.startswith("#")]
+    return len(instr) >= 3
+
+def programs(n: int, rng: random.Random) -> list:
+    texts = []
+    for op in rvisa.OPCODES:
+        for _ in range(8):
+            insn = rvisa.decode(op.match | (rng.getrandbits(8 * op.size) & ~op.mask))
+            if insn is not None:
+                texts.append(insn.text())
+    extras = ["loop:", ".inf:", "j .", "fsgnj.s f1, f2, f3", "fsgnj.d f4, f5, f6", "j .L1", "# comment"]
+    out = []
+    for k in range(n):
+        body = [f"    {rng.choice(texts)}" for _ in range(rng.randrange(20, 180))]
+        for _ in range(rng.choice((0, 0, 0, 1, 2))):
+            body.insert(rng.randrange(len(body)), rng.choice(extras))
+        code = "\n".join([".global _start", "_start:"] + body + ["    ebreak"]) + "\n"
+        out.append(Testcase(id=f"p{k}", code=code, source="bench", path=Path("")))
+    return out
+
+def timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - t0
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--programs", type=int, default=20000)
+    ap.add_argument("--processes", type=int, default=4)
+    args = ap.parse_args()
+    tcs = programs(args.programs, random.Random(0))
+    n = len(tcs)
+
+    legacy, t_legacy = timed(lambda: [legacy_is_valid(tc) for tc in tcs for _ in range(2)][::2])
+    filter = LightweightFilter()
+    new, t_new = timed(lambda: [filter.is_valid(tc) for tc in tcs for _ in range(2)][::2])
+    cold = LightweightFilter()
+    _, t_cold = timed(lambda: [cold.is_valid(tc) for tc in tcs])
+    batch = LightweightFilter(processes=args.processes)
+    _, t_batch = timed(lambda: batch.filter_batch(tcs))
+    batch.close()
+
+    print(f"{'original, 2 scans':>24}: {t_legacy:6.2f}s  {2 * n / t_legacy:9.0f} checks/s")
+    print(f"{'compiled, 1 scan':>24}: {t_cold:6.2f}s  {n / t_cold:9.0f} checks/s  "
+          f"({(t_legacy / 2) / t_cold:.1f}x per scan)")
+    print(f"{'compiled + cache, 2x':>24}: {t_new:6.2f}s  {2 * n / t_new:9.0f} checks/s  "
+          f"({t_legacy / t_new:.1f}x)")
+    print(f"{f'filter_batch, {args.processes} procs':>24}: {t_batch:6.2f}s  {n / t_batch:9.0f} checks/s")
+    print(f"  {filter.report()}")
+    diff = Counter()
+    for tc, old, ok in zip(tcs, legacy, new):
+        if old != ok:
+            cause = "fsgnj" if "fsgnj." in tc.code else "j .L1" if "j .L1" in tc.code else "other"
+            diff[cause if ok else f"{cause} ({filter.check(tc)})"] += 1
+    print(f"  disagreements with the original: {dict(diff) or 'none'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+# scripts/bench/llm.py
+"""
+Benchmark: LLM mutation of a fetch batch against a local mock
+OpenAI-compatible server, serial sync call() (the old batch_mutate loop) vs
+LLMMutator.batch_mutate on AsyncLLM, a replay of the first round through
+the response cache, and accepted mutants per 1k tokens at 1 vs
+--candidates mutants per call
+The mock answers /v1/chat/completions with ```asm blocks (some stock,
+unassemblable or too short, as real output) after a
+lognormal delay with a slow tail (--tail of requests take --tail-x longer)
+and returns 429 + Retry-After above --server-limit concurrent requests or
+at random with probability --p429.
+
+    python scripts/bench/llm.py [--batch 32 --rounds 3]
+    python scripts/bench/llm.py --serve 8080   # just run the mock
+"""
+
+import re
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from openai import OpenAI
+import utils.llm as llm
+from utils.llm import AsyncLLM
+from utils.llmcache import LLMCache
+from utils.models import Testcase
+from utils.novelty import NoveltyIndex
+from scripts.mutate.mutator.gen import LLMMutator
+
+class MockLLM(BaseHTTPRequestHandler):
+    latency = 0.2
+    tail = 0.05
+    tail_x = 20.0
+    p429 = 0.02
+    limit = 16
+    inflight = 0
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, body: dict, headers: dict = None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        try:
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):  # hedged duplicate was cancelled
+            pass
+
+    def do_POST(self):
+        req = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        cls = type(self)
+        with cls.lock:
+            busy = cls.inflight >= cls.limit
+            cls.inflight += not busy
+        if busy or random.random() < cls.p429:
+            if not busy:
+                with cls.lock:
+                    cls.inflight -= 1
+            self._send(429, {"error": {"message": "rate limited", "type": "rate_limit"}},
+                       {"Retry-After": "0.5"})
+            return
+        try:
+            delay = random.lognormvariate(0, 0.3) * cls.latency
+            if random.random() < cls.tail:
+                delay *= cls.tail_x
+            time.sleep(delay)
+            prompt = req["messages"][-1]["content"]
+            k = re.search(r"Give (\d+) different", prompt)
+            blocks = [mock_candidate() for _ in range(int(k.group(1)) if k else 1)]
+            content = "\n\n".join(f"Variant {i}:\n```asm\n{b}\n```" for i, b in enumerate(blocks))
+            p_tokens, c_tokens = len(prompt) // 4 + 60, 40 * len(blocks)
+            self._send(200, {
+                "id": "mock", "object": "chat.completion", "created": int(time.time()), "model": req["model"],
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": content}}],
+                "usage": {"prompt_tokens": p_tokens, "completion_tokens": c_tokens,
+                          "total_tokens": p_tokens + c_tokens},
+            })
+        finally:
+            with cls.lock:
+                cls.inflight -= 1
+
+def mock_candidate() -> str:
+    """Like real output: mostly fine, some stock answers, unassemblable or too short."""
+    r = random.random()
+    head = ".global _start\n_start:\n"
+    if r < 0.15:
+        return head + "    addi x5, x0, 1\n    fence.i\n    ebreak"  # the stock answer
+    if r < 0.30:
+        return head + f"    vadd.vv v1, v2, v3\n    addi x5, x0, {random.randrange(2048)}\n    ebreak"
+    if r < 0.40:
+        return head + "    ebreak"
+    regs = random.sample(range(5, 31), 3)
+    body = [f"    addi x{regs[0]}, x0, {random.randrange(2048)}",
+            f"    {random.choice(['add', 'sub', 'xor', 'mul', 'divu'])} x{regs[1]}, x{regs[0]}, x{regs[0]}",
+            f"    sd x{regs[1]}, {8 * random.randrange(64)}(x2)",
+            f"    ld x{regs[2]}, {8 * random.randrange(64)}(x2)",
+            "    fence.i",
+            "    ebreak"]
+    return head + "\n".join(body)
+
+def serve(port: int) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", port), MockLLM)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def seeds(n: int, salt: int):
+    return [Testcase(id=f"s{salt}_{i}", code=f".global _start\n_start:\n    addi x1, x0, {i + salt * n}\n    ebreak\n",
+                     source="bench", path=Path("")) for i in range(n)]
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--batch", type=int, default=32, help="seeds per fetch batch")
+    ap.add_argument("--rounds", type=int, default=3)
+    ap.add_argument("--latency", type=float, default=0.2, help="median response time (s)")
+    ap.add_argument("--tail", type=float, default=0.05)
+    ap.add_argument("--tail-x", type=float, default=20.0)
+    ap.add_argument("--p429", type=float, default=0.02)
+    ap.add_argument("--server-limit", type=int, default=16)
+    ap.add_argument("--concurrency", type=int, default=12)
+    ap.add_argument("--candidates", type=int, default=4, help="mutants asked for per call")
+    ap.add_argument("--serve", type=int, help="only run the mock server on this port")
+    args = ap.parse_args()
+    MockLLM.latency, MockLLM.tail, MockLLM.tail_x = args.latency, args.tail, args.tail_x
+    MockLLM.p429, MockLLM.limit = args.p429, args.server_limit
+    logging.getLogger("llm").setLevel(logging.CRITICAL)
+
+    if args.serve:
+        serve(args.serve)
+        print(f"[MOCK] http://127.0.0.1:{args.serve}/v1")
+        threading.Event().wait()
+    server = serve(0)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+    # legacy: one blocking call per seed; a 429 is an empty answer
+    llm.client = OpenAI(api_key="mock", base_url=base_url, max_retries=0)
+    llm.CACHE = None
+    mutator = LLMMutator(candidates=1)
+    t = time.perf_counter()
+    got = sum(len(mutator.mutate(s)) for r in range(args.rounds) for s in seeds(args.batch, r))
+    serial = time.perf_counter() - t
+    print(f"  serial: {serial:6.2f}s for {args.rounds}×{args.batch} seeds, {got} mutants")
+
+    tmp = tempfile.TemporaryDirectory()
+    cache = LLMCache(Path(tmp.name) / "llm_cache.sqlite", variants=1)
+    client = AsyncLLM({"api_key": "mock", "base_url": base_url, "concurrency": args.concurrency,
+                       "requests_per_min": 6000, "backoff_base_sec": 0.1, "hedge_min_sec": 0.0}, cache=cache)
+    mutator = LLMMutator(llm=client, candidates=1)
+    t = time.perf_counter()
+    got = 0
+    for r in range(args.rounds):
+        t_round = time.perf_counter()
+        got += len(mutator.batch_mutate(seeds(args.batch, r)))
+        print(f"   round {r}: {time.perf_counter() - t_round:6.2f}s")
+    fanned = time.perf_counter() - t
+    stats = ", ".join(f"{k} {v}" for k, v in sorted(client.stats.items()))
+    print(f"   async: {fanned:6.2f}s for {args.rounds}×{args.batch} seeds, {got} mutants "
+          f"({serial / fanned:.1f}x) [{stats}]")
+
+    t = time.perf_counter()
+    got = len(LLMMutator(llm=client, candidates=1).batch_mutate(seeds(args.batch, 0)))
+    totals = ", ".join(f"{k} {v}" for k, v in sorted(cache.totals().items()))
+    print(f"  replay: {time.perf_counter() - t:6.2f}s for round 0 again, {got} mutants [cache: {totals}]")
+
+    # candidates per call: validated, deduplicated mutants per 1k tokens
+    for n in sorted({1, args.candidates}):
+        client = AsyncLLM({"api_key": "mock", "base_url": base_url, "concurrency": args.concurrency,
+                           "requests_per_min": 6000, "backoff_base_sec": 0.1, "hedge_quantile": 0}, cache=None)
+        novelty = NoveltyIndex(Path(tmp.name) / f"novelty{n}")
+        mutator = LLMMutator(llm=client, candidates=n, novelty=novelty)
+        for r in range(args.rounds):
+            mutator.batch_mutate(seeds(args.batch, 100 + r))
+        print(f"  n={n}: {mutator.report()}")
+    server.shutdown()
+    cache.close()
+    tmp.cleanup()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# scripts/bench/reduce.py
+"""
+Benchmark: ddmin reducer (scripts/analyse/reduce.py), serial vs parallel
+- the test is --insns random RV64 instruction lines with a three-line
+  trigger (a mulh feeding a div, after an csrw) spread through it
+- a stand-in job plays ISS + DUT: the signature reproduces iff all three
+  trigger lines survive, in order; every simulated variant costs --latency
+  seconds, plus latency per retired instruction for the ISS cycles
+- serial:   workers=1, the classic one-variant-at-a-time ddmin
+- parallel: workers=--workers, each ddmin round's candidates at once
+- both report simulated variants and hits in the per-variant-hash cache
+
+    python scripts/bench/reduce.py [--insns 400 --workers 8 --latency 0.05]
+"""
+
+import sys
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.asm_util import parse_instruction
+from utils.lineage import code_hash
+from utils.models import Testcase
+from scripts.analyse.reduce import Reducer, describe
+
+TRIGGER = ["    csrw mscratch, x5", "    mulh x7, x5, x6", "    div x9, x7, x8"]
+FILLER = ["addi x{a}, x{b}, {i}", "add x{a}, x{b}, x{c}", "xor x{a}, x{b}, x{c}", "slli x{a}, x{b}, 3",
+          "sd x{a}, 8(x2)", "ld x{a}, 16(x2)", "lui x{a}, {i}", "sub x{a}, x{b}, x{c}"]
+SIGNATURE = "reg:div:x9:dut1"
+
+def make_test(rng: random.Random, insns: int) -> Testcase:
+    body = [f"    {rng.choice(FILLER).format(a=rng.randrange(10, 31), b=rng.randrange(1, 31), c=rng.randrange(1, 31), i=rng.randrange(1, 500))}"
+            for _ in range(insns - len(TRIGGER))]
+    spots = sorted(rng.sample(range(len(body)), len(TRIGGER)))
+    for k, line in reversed(list(zip(spots, TRIGGER))):
+        body.insert(k, line)
+    code = "\n".join([".global _start", "_start:"] + body + ["    ebreak"]) + "\n"
+    return Testcase(id=code_hash(code), code=code, source="bench", path=Path(""))
+
+def stand_in(latency: float):
+    async def job(tc: Testcase, workdir: Path, duts, timeout) -> dict:
+        lines = [l for l in tc.code.splitlines() if parse_instruction(l)[0]]
+        pos = [lines.index(t) if t in lines else -1 for t in TRIGGER]
+        hit = all(p >= 0 for p in pos) and pos == sorted(pos)
+        await asyncio.sleep(latency * (1 + len(lines) / 100))
+        return {"signature": SIGNATURE if hit else None, "cycles": len(lines), "wall": latency}
+    return job
+
+async def run(tc: Testcase, workers: int, latency: float, tmp: Path):
+    reducer = Reducer(stand_in(latency), tmp, workers=workers)
+    t0 = time.perf_counter()
+    reduced, report = await reducer.reduce(tc)
+    return reduced, report, time.perf_counter() - t0
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--insns", type=int, default=400)
+    ap.add_argument("--workers", type=int, default=8)
+    ap.add_argument("--latency", type=float, default=0.05, help="stand-in simulation time per variant (s)")
+    args = ap.parse_args()
+    tc = make_test(random.Random(0), args.insns)
+    with tempfile.TemporaryDirectory() as tmp:
+        runs = {name: asyncio.run(run(tc, w, args.latency, Path(tmp)))
+                for name, w in (("serial", 1), ("parallel", args.workers))}
+    for name, (reduced, report, wall) in runs.items():
+        print(f"{name:>9}: {wall:6.2f}s  {describe(tc, reduced, report)}")
+    print(f"same reproducer: {runs['serial'][0].id == runs['parallel'][0].id}; "
+          f"parallel {runs['serial'][2] / runs['parallel'][2]:.1f}x faster")
+    print(runs["parallel"][0].code)
+
+if __name__ == "__main__":
+    main()
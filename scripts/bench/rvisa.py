@@ -0,0 +1,100 @@
+# scripts/bench/rvisa.py
+"""
+Benchmark: in-process RV64GC encode/decode vs forking an assembler
+- decode:   rvisa.decode / rvisa.legal per word (random legal words, RVC
+            and 32-bit)
+- batch:    rvisa.legal_mask over one NumPy array
+- encode:   rvisa.encode of the decoded text
+- assemble: whole seed programs, rvisa.assemble vs one assembler process per
+            seed (riscv64-unknown-elf-as + objcopy when installed, otherwise
+            `python -m ziglang cc` as a stand-in for the fork cost)
+
+    python scripts/bench/rvisa.py [--words 200000]
+"""
+
+import sys
+import time
+import random
+import shutil
+import argparse
+import subprocess
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils import rvisa
+
+SEEDS = PROJECT_ROOT / "corpus" / "initial_seeds"
+
+def legal_words(n: int, rng: random.Random) -> list:
+    out = []
+    while len(out) < n:
+        w = rng.getrandbits(16) if rng.random() < 1 / 3 else rng.getrandbits(32) | 3
+        if rvisa.decode(w) is not None:
+            out.append(w)
+    return out
+
+def rate(name: str, n: int, fn):
+    t = time.perf_counter()
+    fn()
+    dt = time.perf_counter() - t
+    print(f"{name:>22}: {n / dt:12.0f} /s")
+    return n / dt
+
+def fork_assembler():
+    """Callable assembling one .S file in a subprocess, or None."""
+    if shutil.which("riscv64-unknown-elf-as"):
+        def run(src: Path, out: Path):
+            subprocess.run(["riscv64-unknown-elf-as", "-march=rv64gc", str(src), "-o", str(out)], check=True)
+            subprocess.run(["riscv64-unknown-elf-objcopy", "-O", "binary", "-j", ".text", str(out), str(out)],
+                           check=True)
+        return "binutils as+objcopy", run
+    try:
+        import ziglang  # noqa: F401
+    except ImportError:
+        return None, None
+    def run(src: Path, out: Path):
+        subprocess.run([sys.executable, "-m", "ziglang", "cc", "--target=riscv64-linux-musl",
+                        "-mcpu=baseline_rv64", "-c", str(src), "-o", str(out)], check=True)
+    return "zig cc (stand-in)", run
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--words", type=int, default=200000)
+    ap.add_argument("--forks", type=int, default=20)
+    args = ap.parse_args()
+
+    rng = random.Random(0)
+    words = legal_words(args.words, rng)
+    texts = [rvisa.decode(w).text() for w in words[:args.words // 4]]
+    print(f"{len(words)} legal words, {sum(w & 3 != 3 for w in words)} RVC")
+
+    rate("decode", len(words), lambda: [rvisa.decode(w) for w in words])
+    rate("legal", len(words), lambda: [rvisa.legal(w) for w in words])
+    arr = np.array(words + [rng.getrandbits(32) for _ in range(len(words))], dtype=np.uint64)
+    rate("legal_mask (numpy)", len(arr), lambda: rvisa.legal_mask(arr))
+    rate("encode", len(texts), lambda: [rvisa.encode(t) for t in texts])
+
+    programs = [f.read_text() for f in sorted(SEEDS.glob("*.S"))]
+    n = 2000
+    in_proc = rate("assemble seed (rvisa)", n, lambda: [rvisa.assemble(programs[i % len(programs)])
+                                                         for i in range(n)])
+    label, fork = fork_assembler()
+    if fork is None:
+        print(f"{'assemble seed (fork)':>22}: unavailable (no riscv toolchain / ziglang)")
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        src, out = Path(tmp) / "seed.S", Path(tmp) / "seed.o"
+        def forked():
+            for i in range(args.forks):
+                src.write_text(programs[i % len(programs)])
+                fork(src, out)
+        forked_rate = rate(f"assemble seed ({label.split()[0]})", args.forks, forked)
+    print(f"{'speedup':>22}: {in_proc / forked_rate:12.0f}x  [{label}]")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# scripts/bench/scheduler.py
+"""
+Offline replay benchmark for the fetch-stage seed schedulers
+Each policy spends the same simulated ISS-cycle budget; every mutation round
+it schedules replays the next recorded mutant outcome of that seed (cycles,
+coverage points, bug). Score = distinct coverage points reached per budget.
+
+Histories come from a run's W$ (history records carry "parent") plus its
+coverage bitmap for exact per-mutant points; without --wcache a synthetic
+corpus is generated: a few early "winners" with high W$ weight that saturate
+quickly, and many unweighted seeds, some of which reach rare points.
+
+    python scripts/bench/scheduler.py [--budget 2e6] [--runs 5]
+    python scripts/bench/scheduler.py --wcache wcache.json --coverage coverage.bitmap
+"""
+
+import sys
+import json
+import random
+import argparse
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from scripts.fetch.scheduler import SCHEDULERS, build_seed_scheduler
+
+Outcome = Tuple[int, frozenset, float]  # cycles, coverage point ids, bug_score
+
+def synthetic(n_seeds: int, per_seed: int, rng: random.Random):
+    outcomes: Dict[str, List[Outcome]] = {}
+    weights: Dict[str, float] = {}
+    next_point = 0
+    for i in range(n_seeds):
+        sid = f"seed{i:04d}"
+        winner = i < n_seeds // 20
+        region = range(next_point, next_point + (40 if winner else rng.randint(20, 400)))
+        next_point = region.stop
+        rare = rng.random() < 0.2
+        base_cycles = rng.randint(200, 5000)
+        outs = []
+        for _ in range(per_seed):
+            pts = set(rng.sample(region, min(len(region), rng.randint(5, 30))))
+            if rare and rng.random() < 0.3:
+                pts.add(1_000_000 + rng.randrange(2000))
+            outs.append((int(base_cycles * rng.lognormvariate(0, 0.3)), frozenset(pts),
+                         1.0 if rng.random() < 0.002 else 0.0))
+        outcomes[sid] = outs
+        weights[sid] = rng.uniform(0.6, 0.9) if winner else 0.0
+    return outcomes, weights
+
+def from_run(wcache_path: Path, coverage_path: Path):
+    from scripts.analyse.coverage_fusion import CoverageFusion
+    data = json.loads(wcache_path.read_text())
+    cov = CoverageFusion(coverage_path) if coverage_path else None
+    outcomes: Dict[str, List[Outcome]] = {}
+    for tid, h in data.get("history", {}).items():
+        if not h.get("parent"):
+            continue
+        pts = frozenset(cov.tests[tid].tolist()) if cov and tid in cov.tests else \
+            frozenset((tid, k) for k in range(int(h.get("cov_gain", 0))))
+        outcomes.setdefault(h["parent"], []).append((h.get("cycles", 1), pts, h.get("bug_score", 0.0)))
+    weights = {sid: data.get("entries", {}).get(sid, 0.0) for sid in outcomes}
+    return outcomes, weights
+
+def replay(policy: str, outcomes, weights, budget: float, batch: int, rng: random.Random):
+    sched = build_seed_scheduler(policy, rng=rng)
+    weights = dict(weights)
+    cursor = {sid: rng.randrange(len(o)) for sid, o in outcomes.items()}
+    covered, spent, bugs, curve = set(), 0, 0.0, []
+    while spent < budget:
+        plan = sched.plan(weights, batch)
+        if not plan:
+            break
+        for sid in plan:
+            outs = outcomes[sid]
+            cycles, pts, bug = outs[cursor[sid] % len(outs)]
+            cursor[sid] += 1
+            gain = len(pts - covered)
+            covered |= pts
+            spent += cycles
+            bugs += bug
+            sched.observe(sid, {"cov_gain": gain, "bug_score": bug, "cycles": cycles})
+            # W$ promotes productive seeds; decays the ones that stopped paying off
+            weights[sid] = 0.7 * weights[sid] + 0.3 * min(gain / 10, 1.0)
+            if spent >= budget:
+                break
+        curve.append((spent, len(covered)))
+    return len(covered), bugs, curve
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--wcache", type=Path)
+    ap.add_argument("--coverage", type=Path)
+    ap.add_argument("--budget", type=float, default=2e6, help="simulated ISS cycles per run")
+    ap.add_argument("--batch", type=int, default=8)
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--seeds", type=int, default=400)
+    args = ap.parse_args()
+
+    if args.wcache:
+        outcomes, weights = from_run(args.wcache, args.coverage)
+        print(f"replaying {sum(map(len, outcomes.values()))} recorded mutants of {len(outcomes)} seeds")
+    else:
+        outcomes, weights = synthetic(args.seeds, 50, random.Random(7))
+        print(f"synthetic corpus: {len(outcomes)} seeds × 50 recorded mutants")
+    if not outcomes:
+        print("no history records with a parent; nothing to replay")
+        return
+
+    print(f"{'policy':>9} | {'points @25%':>11} | {'@50%':>6} | {'@100%':>6} | bugs")
+    for policy in SCHEDULERS:
+        finals, q25, q50, bugs = [], [], [], []
+        for r in range(args.runs):
+            final, b, curve = replay(policy, outcomes, weights, args.budget, args.batch, random.Random(r))
+            at = lambda frac: next((c for s, c in curve if s >= frac * args.budget), final)
+            finals.append(final); q25.append(at(0.25)); q50.append(at(0.5)); bugs.append(b)
+        mean = lambda xs: sum(xs) / len(xs)
+        print(f"{policy:>9} | {mean(q25):11.0f} | {mean(q50):6.0f} | {mean(finals):6.0f} | {mean(bugs):.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# scripts/bench/triage.py
+"""
+Benchmark: LLM property calls per noisy run, one per mismatching test (as
+analyse did) vs one per new triage bucket (scripts/analyse/triage.py)
+- --bugs root causes, each a fixed (kind, opcode, field, DUTs) divergence;
+  --tests mismatching tests pick a root cause with Zipf-like frequency, so
+  a few bugs account for most mismatches, like a real campaign
+- every test gets a short ISS .trc whose divergent row holds the bug's
+  opcode, and a program of random length (the bucket keeps the smallest)
+- the stand-in model answers after --latency seconds; the old path awaited
+  a blocking call per test, triage gathers one async call per new bucket
+
+    python scripts/bench/triage.py [--tests 500 --bugs 6 --latency 0.02]
+"""
+
+import sys
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils import rvisa
+from utils.models import Testcase
+from utils.trace import TraceArray
+from utils.tracefile import write_trace
+from scripts.execute.checker import Mismatch
+from scripts.analyse.property_generator import PropertyGenerator
+from scripts.analyse.triage import Triage
+
+BUGS = [("reg", "mulh", "x7", (1,)), ("pc", "c.jalr", "pc", (0, 1, 2)), ("csr", "csrrw", "mstatus", (2,)),
+        ("freg", "fmadd.d", "f3", (0,)), ("reg", "amoadd.w", "x12", (1, 2)), ("insn", "fence.i", "insn", (0,)),
+        ("reg", "div", "x9", (0,)), ("csr", "ecall", "mcause", (1,))]
+
+class StandInLLM:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    async def call(self, user_prompt: str, system_prompt: str = "", **kw):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return "assert property (@(posedge clk) disable iff (!reset_n) 1);", len(user_prompt) // 4, 16
+
+def word_of(name: str, rng: random.Random) -> int:
+    """A legal encoding of `name` (the bare match bits are not always one, e.g. c.jalr x0)."""
+    op = rvisa.BY_NAME[name]
+    while True:
+        word = op.match | (rng.getrandbits(8 * op.size) & ~op.mask)
+        insn = rvisa.decode(word)
+        if insn is not None and insn.name == name:
+            return word
+
+def make_tests(args, tmp: Path) -> list:
+    rng = random.Random(0)
+    bugs = BUGS[:args.bugs]
+    freq = [1 / (k + 1) for k in range(len(bugs))]
+    tests = []
+    for t in range(args.tests):
+        kind, opcode, field, duts = rng.choices(bugs, freq)[0]
+        row = rng.randrange(1, 32)
+        words = [rvisa.BY_NAME["addi"].match] * 32
+        words[row] = word_of(opcode, rng)
+        log = tmp / f"t{t:04d}.trc"
+        write_trace(log, TraceArray.from_records([{"pc": 0x80000000 + 4 * i, "insn": w} for i, w in enumerate(words)]))
+        mismatches = [Mismatch(cycle=row, type=kind, expected=1, actual=2, dut_id=d, field=field) for d in duts]
+        code = "\n".join(["_start:"] + ["    addi x1, x1, 1"] * rng.randrange(8, 200))
+        tests.append((Testcase(id=f"t{t:04d}", code=code, source="bench", path=log), mismatches, log))
+    return tests
+
+async def legacy(tests: list, latency: float) -> int:
+    calls = 0
+    for tc, mismatches, _ in tests:  # one blocking call per buggy test
+        calls += 1
+        time.sleep(latency)
+    return calls
+
+async def triaged(tests: list, model: StandInLLM, tmp: Path) -> Triage:
+    triage = Triage(tmp / "triage.json", tmp / "triage", PropertyGenerator(llm=model))
+    for tc, mismatches, log in tests:
+        triage.add(tc, mismatches, log)
+    await triage.synthesise()
+    return triage
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--tests", type=int, default=500, help="mismatching tests in the run")
+    ap.add_argument("--bugs", type=int, default=6, help="distinct root causes (max 8)")
+    ap.add_argument("--latency", type=float, default=0.02, help="stand-in model latency (s)")
+    args = ap.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        tests = make_tests(args, tmp)
+        t0 = time.perf_counter()
+        calls = asyncio.run(legacy(tests, args.latency))
+        t_legacy = time.perf_counter() - t0
+        model = StandInLLM(args.latency)
+        t0 = time.perf_counter()
+        triage = asyncio.run(triaged(tests, model, tmp))
+        t_triage = time.perf_counter() - t0
+    print(f"per test: {calls:5d} LLM calls, {t_legacy:6.2f}s")
+    print(f"  triage: {model.calls:5d} LLM calls, {t_triage:6.2f}s  ({triage.report()})")
+    for sig, b in sorted(triage.buckets.items(), key=lambda kv: -kv[1]["count"]):
+        print(f"    {b['count']:4d}  {sig:32s} smallest reproducer {b['repro']} ({b['size']} insns)")
+    print(f"{calls / max(model.calls, 1):.0f}x fewer calls, {t_legacy / t_triage:.0f}x less wall time")
+
+if __name__ == "__main__":
+    main()
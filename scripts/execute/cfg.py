@@ -0,0 +1,464 @@
+# scripts/execute/cfg.py
+"""
+Static control-flow analysis of a testcase: the optional last stage of the filter
+- The program is assembled in-process (utils/rvisa.assemble, .text at BASE)
+  and split into basic blocks; programs outside rvisa's subset are not
+  analysed (CfgReport.error)
+- Constant propagation over the x registers folds branches whose operands
+  are known, so `li t0, 1` + `spin: bnez t0, spin` is as endless as `j .`
+- no_exit: a reachable loop (SCC of the feasible CFG) with no feasible edge
+  out and nothing inside that can leave it: no ebreak/ecall/xret, no
+  indirect jump, no instruction that may trap (memory, CSR, FP, system,
+  illegal words). Interrupts are not modelled; the harness raises none
+- text_stores: stores whose address is a known constant inside .text
+  (self-modifying code); with one present no loop is claimed to be endless
+- max_insns: upper bound on dynamic instructions, the longest path through
+  the CFG with every loop condensed. A loop is bounded when a branch in it
+  exits on an induction register (one addi per iteration) compared with a
+  value constant propagation knows at the branch; nested loops multiply. A trap ends the run.
+  None: no bound could be proven (unbounded loop, indirect jump)
+
+    python scripts/execute/cfg.py <test.s>...
+"""
+
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+# === Add project root ===
+ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT))
+
+from utils import rvisa
+
+BASE = 0x80000000  # where the harness loads .text (spike / stub_sim reset PC)
+MASK = (1 << 64) - 1
+
+# Compressed → base instruction, and which operands the two-address forms reuse
+RVC = {"c.addi": "addi", "c.addiw": "addiw", "c.li": "addi", "c.lui": "lui", "c.addi16sp": "addi",
+       "c.addi4spn": "addi", "c.srli": "srli", "c.srai": "srai", "c.andi": "andi", "c.sub": "sub",
+       "c.xor": "xor", "c.or": "or", "c.and": "and", "c.subw": "subw", "c.addw": "addw",
+       "c.slli": "slli", "c.mv": "add", "c.add": "add", "c.nop": "addi", "c.j": "jal",
+       "c.beqz": "beq", "c.bnez": "bne", "c.jr": "jalr", "c.jalr": "jalr", "c.ebreak": "ebreak",
+       "c.lw": "lw", "c.ld": "ld", "c.lwsp": "lw", "c.ldsp": "ld", "c.fld": "fld", "c.fldsp": "fld",
+       "c.sw": "sw", "c.sd": "sd", "c.swsp": "sw", "c.sdsp": "sd", "c.fsd": "fsd", "c.fsdsp": "fsd"}
+TWO_ADDRESS = {"c.addi", "c.addiw", "c.srli", "c.srai", "c.andi", "c.sub", "c.xor", "c.or", "c.and",
+               "c.subw", "c.addw", "c.slli", "c.add"}
+RD, RS1, RS2 = {"rd", "crd", "crd'"}, {"rs1", "(rs1)", "crs1'", "(crs1')", "(sp)"}, {"rs2", "crs2", "crs2'"}
+
+BRANCHES = {"beq", "bne", "blt", "bge", "bltu", "bgeu"}
+STORE_WIDTH = {"sb": 1, "sh": 2, "sw": 4, "sd": 8, "fsw": 4, "fsd": 8}
+ENDS = {"ebreak", "ecall"}            # the run is over
+LEAVES = {"mret", "sret"}             # control goes somewhere we do not model
+MAY_TRAP_EXT = {"A", "F", "D", "Zicsr"}
+MAY_TRAP = {"lb", "lh", "lw", "ld", "lbu", "lhu", "lwu", "flw", "fld", "sfence.vma", "wfi"} | set(STORE_WIDTH)
+
+@dataclass
+class Insn:
+    pc: int
+    size: int
+    name: str                 # base mnemonic (RVC expanded); "illegal" for undecodable words
+    rd: int = 0
+    rs1: int = 0
+    rs2: int = 0
+    imm: int = 0
+    ext: str = ""
+
+    @property
+    def target(self) -> int:
+        return (self.pc + self.imm) & MASK
+
+    def may_trap(self) -> bool:
+        return self.name in MAY_TRAP or self.ext in MAY_TRAP_EXT or self.name == "illegal"
+
+def lift(insn: Optional[rvisa.Insn], pc: int, size: int) -> Insn:
+    """Decoded instruction → Insn with plain register numbers and one immediate."""
+    if insn is None:
+        return Insn(pc, size, "illegal")
+    out = Insn(pc, size, RVC.get(insn.name, insn.name), ext=insn.op.ext)
+    for arg, v in zip(insn.op.args, insn.values):
+        kind = rvisa.KINDS[arg]
+        reg = kind.literal if kind.style == "lit" else v + 8 if kind.style == "x'" else v
+        if arg in RD:
+            out.rd = reg
+        elif arg in RS1 or arg == "sp":
+            out.rs1 = reg
+            if arg == "sp" and insn.name == "c.addi16sp":
+                out.rd = reg
+        elif arg in RS2:
+            out.rs2 = reg
+        elif kind.style in ("dec", "hex20", "pcrel"):
+            out.imm = v
+    if insn.name in TWO_ADDRESS:
+        out.rs1 = out.rd
+    elif insn.name in ("c.srli", "c.srai", "c.andi", "c.sub", "c.xor", "c.or", "c.and", "c.subw", "c.addw"):
+        out.rd = out.rs1
+    if insn.name in ("c.jr", "c.jalr"):
+        out.rd, out.rs1 = int(insn.name == "c.jalr"), out.rd
+    return out
+
+# === Constant propagation ===
+def _s64(v: int) -> int:
+    return v - (1 << 64) if v >> 63 else v
+
+def _s32(v: int) -> int:
+    v &= 0xFFFFFFFF
+    return (v - (1 << 32) if v >> 31 else v) & MASK
+
+def evaluate(i: Insn, regs: list) -> Optional[int]:
+    """Value `i` writes to rd given the known `regs` (None: unknown)."""
+    n, a, b = i.name, regs[i.rs1], regs[i.rs2]
+    if n == "lui":
+        return i.imm & MASK
+    if n == "auipc":
+        return (i.pc + i.imm) & MASK
+    if n in ("jal", "jalr"):
+        return (i.pc + i.size) & MASK
+    if a is None:
+        return None
+    imm = i.imm & MASK
+    if n == "addi":
+        return (a + imm) & MASK
+    if n == "addiw":
+        return _s32(a + imm)
+    if n in ("xori", "ori", "andi"):
+        return {"xori": a ^ imm, "ori": a | imm, "andi": a & imm}[n]
+    if n in ("slti", "sltiu"):
+        return int(_s64(a) < _s64(imm)) if n == "slti" else int(a < imm)
+    if n in ("slli", "srli", "srai"):
+        return {"slli": (a << i.imm) & MASK, "srli": a >> i.imm, "srai": (_s64(a) >> i.imm) & MASK}[n]
+    if b is None:
+        return None
+    if n in ("add", "sub", "xor", "or", "and", "mul"):
+        return {"add": a + b, "sub": a - b, "xor": a ^ b, "or": a | b, "and": a & b, "mul": a * b}[n] & MASK
+    if n in ("addw", "subw"):
+        return _s32(a + b if n == "addw" else a - b)
+    if n in ("sll", "srl", "sra"):
+        s = b & 63
+        return {"sll": (a << s) & MASK, "srl": a >> s, "sra": (_s64(a) >> s) & MASK}[n]
+    if n in ("slt", "sltu"):
+        return int(_s64(a) < _s64(b)) if n == "slt" else int(a < b)
+    return None
+
+def taken(i: Insn, regs: list) -> Optional[bool]:
+    """Outcome of branch `i`, if both operands are known."""
+    a, b = regs[i.rs1], regs[i.rs2]
+    if a is None or b is None:
+        return None
+    return {"beq": a == b, "bne": a != b, "blt": _s64(a) < _s64(b), "bge": _s64(a) >= _s64(b),
+            "bltu": a < b, "bgeu": a >= b}[i.name]
+
+def step(i: Insn, regs: list):
+    if i.rd:  # lift() only fills rd for x-register destinations
+        regs[i.rd] = evaluate(i, regs)
+
+def store_width(i: Insn) -> int:
+    if i.name.startswith(("amo", "sc.")):
+        return 8 if ".d" in i.name else 4
+    return STORE_WIDTH.get(i.name, 0)
+
+def meet(a: Optional[tuple], b: tuple) -> tuple:
+    return b if a is None else tuple(x if x == y else None for x, y in zip(a, b))
+
+# === CFG ===
+@dataclass
+class Block:
+    start: int                                      # index of the first insn
+    insns: List[Insn]
+    succs: List[int] = field(default_factory=list)  # block ids; taken target first for branches
+    leaves: bool = False                            # run may end / escape here (end, trap, indirect jump)
+    escapes: bool = False                           # control goes somewhere unknown: no bound
+
+    @property
+    def last(self) -> Insn:
+        return self.insns[-1]
+
+@dataclass
+class CfgReport:
+    blocks: int = 0
+    loops: int = 0
+    no_exit: List[int] = field(default_factory=list)      # header pc of every endless loop
+    text_stores: List[int] = field(default_factory=list)  # pc of every store into .text
+    max_insns: Optional[int] = None
+    error: Optional[str] = None
+
+def build_blocks(insns: List[Insn]) -> List[Block]:
+    by_pc = {i.pc: k for k, i in enumerate(insns)}
+    leaders = {0}
+    for k, i in enumerate(insns):
+        if i.name in BRANCHES or i.name in ("jal", "jalr") or i.name in ENDS | LEAVES:
+            leaders.add(k + 1)
+            if i.name in BRANCHES or i.name == "jal":
+                if i.target in by_pc:
+                    leaders.add(by_pc[i.target])
+    starts = sorted(s for s in leaders if s < len(insns))
+    blocks = [Block(s, insns[s:e]) for s, e in zip(starts, starts[1:] + [len(insns)])]
+    block_at = {b.start: n for n, b in enumerate(blocks)}
+    for b in blocks:
+        i = b.last
+        b.leaves = any(x.may_trap() or x.name in ENDS for x in b.insns)
+        after = block_at.get(b.start + len(b.insns))
+        targets = []
+        if i.name in BRANCHES or i.name == "jal":
+            t = by_pc.get(i.target)
+            if t is None:
+                b.leaves = b.escapes = True
+            else:
+                targets.append(block_at[t])
+        if i.name in ENDS:
+            continue
+        if i.name == "jalr" or i.name in LEAVES:
+            b.leaves = b.escapes = True
+            continue
+        if i.name != "jal":
+            if after is None:  # falls off the end of .text: traps on whatever follows
+                b.leaves = True
+            else:
+                targets.append(after)
+        b.succs = targets
+    return blocks
+
+def sccs(nodes: Set[int], succ: Dict[int, List[int]]) -> List[List[int]]:
+    """Tarjan, iteratively; components come out in reverse topological order."""
+    index: Dict[int, int] = {}
+    low: Dict[int, int] = {}
+    stack: List[int] = []
+    on: Set[int] = set()
+    out: List[List[int]] = []
+    for root in sorted(nodes):
+        if root in index:
+            continue
+        work = [(root, iter(succ.get(root, ())))]
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on.add(root)
+        while work:
+            v, it = work[-1]
+            for w in it:
+                if w not in nodes:
+                    continue
+                if w not in index:
+                    index[w] = low[w] = len(index)
+                    stack.append(w)
+                    on.add(w)
+                    work.append((w, iter(succ.get(w, ()))))
+                    break
+                if w in on:
+                    low[v] = min(low[v], index[w])
+            else:
+                work.pop()
+                if work:
+                    low[work[-1][0]] = min(low[work[-1][0]], low[v])
+                if low[v] == index[v]:
+                    comp = []
+                    while True:
+                        w = stack.pop()
+                        on.discard(w)
+                        comp.append(w)
+                        if w == v:
+                            break
+                    out.append(comp)
+    return out
+
+class Analysis:
+    def __init__(self, insns: List[Insn]):
+        self.insns = insns
+        self.text = (BASE, BASE + sum(i.size for i in insns))
+        self.blocks = build_blocks(insns)
+        self.entry: Dict[int, tuple] = {}          # block → register state on entry
+        self.edges: Dict[int, List[int]] = {}      # feasible successors
+        self.propagate()
+
+    def run(self, n: int, regs: tuple) -> list:
+        regs = list(regs)
+        for i in self.blocks[n].insns:
+            step(i, regs)
+            regs[0] = 0
+        return regs
+
+    def feasible(self, n: int, regs: list) -> List[int]:
+        b = self.blocks[n]
+        if b.last.name in BRANCHES and len(b.succs) == 2:
+            t = taken(b.last, regs)
+            if t is not None:
+                return [b.succs[0] if t else b.succs[1]]
+        return b.succs
+
+    def propagate(self):
+        self.entry[0] = (0,) + (None,) * 31
+        work = [0]
+        while work:
+            n = work.pop()
+            regs = self.run(n, self.entry[n])
+            self.edges[n] = self.feasible(n, regs)
+            for s in self.edges[n]:
+                new = meet(self.entry.get(s), tuple(regs))
+                if new != self.entry.get(s):
+                    self.entry[s] = new
+                    work.append(s)
+
+    def text_stores(self) -> List[int]:
+        pcs = []
+        for n, regs in self.entry.items():
+            regs = list(regs)
+            for i in self.blocks[n].insns:
+                width = store_width(i)
+                if width and regs[i.rs1] is not None:
+                    addr = (regs[i.rs1] + i.imm) & MASK
+                    if addr < self.text[1] and addr + width > self.text[0]:
+                        pcs.append(i.pc)
+                step(i, regs)
+                regs[0] = 0
+        return sorted(pcs)
+
+    # === Bounds ===
+    def writes(self, nodes) -> Dict[int, List[Insn]]:
+        """Register → the instructions in `nodes` that write it."""
+        out: Dict[int, List[Insn]] = {}
+        for n in nodes:
+            for i in self.blocks[n].insns:
+                if i.rd:
+                    out.setdefault(i.rd, []).append(i)
+        return out
+
+    def longest(self, nodes: Set[int], succ: Dict[int, List[int]]) -> Optional[int]:
+        """Most instructions on any path through `nodes`, each cycle bounded by loop_cost."""
+        comps = sccs(nodes, succ)
+        comp_of = {v: c for c, comp in enumerate(comps) for v in comp}
+        best: List[int] = []
+        for c, comp in enumerate(comps):  # successors come first
+            cyclic = len(comp) > 1 or comp[0] in succ.get(comp[0], ())
+            cost = self.loop_cost(set(comp)) if cyclic else len(self.blocks[comp[0]].insns)
+            if cost is None or any(self.blocks[v].escapes for v in comp):
+                return None
+            nxt = {comp_of[w] for v in comp for w in succ.get(v, ()) if w in nodes and comp_of[w] != c}
+            best.append(cost + max((best[k] for k in nxt), default=0))
+        return max(best, default=0)
+
+    def loop_cost(self, loop: Set[int]) -> Optional[int]:
+        writes = self.writes(loop)
+        for h in sorted(loop):
+            trips = self.trips(h, loop, writes)
+            if trips is None:
+                continue
+            body = {v: [w for w in self.edges.get(v, ()) if w in loop and w != h] for v in loop}
+            per_iter = self.longest(loop, body)
+            if per_iter is not None:
+                return (trips + 2) * per_iter
+        return None
+
+    def trips(self, h: int, loop: Set[int], writes: Dict[int, List[Insn]]) -> Optional[int]:
+        """Times the branch ending block h can stay in the loop, if it tests an induction register."""
+        br = self.blocks[h].last
+        succ = self.edges.get(h, [])
+        if br.name not in BRANCHES or len(succ) != 2 or (succ[0] in loop) == (succ[1] in loop):
+            return None
+        regs = self.run(h, self.entry[h])
+        for ind, other, swapped in ((br.rs1, br.rs2, False), (br.rs2, br.rs1, True)):
+            inc = writes.get(ind, [])
+            if not ind or ind == other or regs[other] is None or len(inc) != 1:
+                continue
+            inc = inc[0]
+            if inc.name != "addi" or inc.rs1 != ind or not inc.imm or not self.once_per_iteration(inc, h, loop):
+                continue
+            starts = {self.run(p, self.entry[p])[ind] for p in self.entry if p not in loop
+                      for s in self.edges.get(p, ()) if s in loop}
+            if not starts or None in starts:
+                continue
+            ks = [exit_after(br.name, succ[0] in loop, swapped, v, regs[other], inc.imm)
+                  for v0 in starts for v in (v0, (v0 + inc.imm) & MASK)]
+            if None not in ks:
+                return max(ks)
+        return None
+
+    def once_per_iteration(self, inc: Insn, h: int, loop: Set[int]) -> bool:
+        """`inc` runs on every path from h back to h, outside any inner loop."""
+        a = next(n for n in loop if any(x is inc for x in self.blocks[n].insns))
+        body = {v: [w for w in self.edges.get(v, ()) if w in loop and w != h] for v in loop}
+        inner = next(c for c in sccs(loop, body) if a in c)
+        if len(inner) > 1 or a in body[a]:
+            return False
+        seen, work = {h}, [h]
+        while work and a != h:
+            v = work.pop()
+            for w in self.edges.get(v, ()):
+                if w == h:
+                    return False  # back at h without passing inc
+                if w in loop and w != a and w not in seen:
+                    seen.add(w)
+                    work.append(w)
+        return True
+
+def exit_after(branch: str, taken_stays: bool, swapped: bool, v: int, bound: int, step_: int) -> Optional[int]:
+    """Evaluations of `branch` that stay in the loop before the first that exits, for an
+    induction value starting at v and stepping by step_ (None: wraps around first)."""
+    signed = branch in ("blt", "bge", "beq", "bne")
+    lo, hi = (-(1 << 63), (1 << 63) - 1) if signed else (0, MASK)
+    v, bound = (_s64(v), _s64(bound)) if signed else (v, bound)
+    rel = {"beq": "eq", "bne": "ne", "blt": "lt", "bge": "ge", "bltu": "lt", "bgeu": "ge"}[branch]
+    if swapped and rel in ("lt", "ge"):  # bound < i  ≡  i >= bound + 1
+        rel, bound = ("ge" if rel == "lt" else "lt"), bound + 1
+    if taken_stays:
+        rel = {"eq": "ne", "ne": "eq", "lt": "ge", "ge": "lt"}[rel]
+    if rel == "ne":
+        return 0 if v != bound else 1
+    if rel == "eq":
+        d = bound - v
+        return d // step_ if d % step_ == 0 and d // step_ >= 0 else None
+    if rel == "ge":
+        if v >= bound:
+            return 0
+        k = -(-(bound - v) // step_) if step_ > 0 else None
+    else:
+        if v < bound:
+            return 0
+        k = -(-(v - bound + 1) // -step_) if step_ < 0 else None
+    return k if k is not None and lo <= v + k * step_ <= hi else None
+
+def analyse_cfg(code: str) -> CfgReport:
+    try:
+        words = rvisa.assemble(code, BASE)
+    except (rvisa.AsmError, ValueError, ArithmeticError, LookupError) as e:
+        # AsmError, an overflow on a huge directive, or text rvisa's parser trips over:
+        # the filter must never raise on mutant text
+        return CfgReport(error=f"not analysed: {e}")
+    if not words:
+        return CfgReport(error="no instructions")
+    insns, pc = [], BASE
+    for (size, word), insn in zip(words, rvisa.disassemble(words, BASE)):
+        insns.append(lift(insn, pc, size))
+        pc += size
+    a = Analysis(insns)
+    report = CfgReport(blocks=len(a.blocks), text_stores=a.text_stores())
+    reached = set(a.entry)
+    for comp in sccs(reached, a.edges):
+        if len(comp) == 1 and comp[0] not in a.edges.get(comp[0], ()):
+            continue
+        report.loops += 1
+        loop = set(comp)
+        if not report.text_stores and not any(a.blocks[v].leaves for v in loop) \
+                and all(w in loop for v in loop for w in a.edges.get(v, ())):
+            report.no_exit.append(a.blocks[min(comp)].insns[0].pc)
+    report.no_exit.sort()
+    if not report.no_exit:
+        report.max_insns = a.longest(reached, a.edges)
+    return report
+
+def describe(report: CfgReport) -> str:
+    if report.error:
+        return report.error
+    parts = [f"{report.blocks} blocks, {report.loops} loops"]
+    if report.no_exit:
+        parts.append("endless loop at " + ", ".join(f"0x{pc:x}" for pc in report.no_exit))
+    if report.text_stores:
+        parts.append("stores into .text at " + ", ".join(f"0x{pc:x}" for pc in report.text_stores))
+    parts.append(f"≤ {report.max_insns} insns" if report.max_insns is not None else "no insn bound")
+    return "; ".join(parts)
+
+def main():
+    for path in sys.argv[1:]:
+        print(f"{path}: {describe(analyse_cfg(Path(path).read_text()))}")
+
+if __name__ == "__main__":
+    main()
@@ -1,50 +1,315 @@
-# utils/checker.py
-from typing import List, Dict, Any
+# scripts/execute/checker.py
+from typing import List, Dict, Any, Optional, Sequence, Tuple, Union
 from dataclasses import dataclass
 from pathlib import Path
 import json
+import numpy as np
+
+from utils.trace import TraceArray, COLUMNS, COL_KIND, CSRS, MASK64
+from utils.tracefile import read_trace
+
+# Only compared when both ISS and DUT logs carry them (log formats differ)
+OPTIONAL_COLUMNS = {"insn", *CSRS}
+
+CHUNK_ROWS = 16384  # rows per vectorized block (bounds temporary memory)
+PROBE_ROWS = 64     # first block size when hunting for the next divergence
+
+Trace = Union[TraceArray, List[Dict]]
 
 @dataclass
 class Mismatch:
     cycle: int
-    type: str  # "pc", "reg", "mem", "timing"
+    type: str  # "pc", "insn", "reg", "freg", "csr", "length" (retired a different number of commits)
     expected: Any
     actual: Any
     dut_id: int
+    field: str = ""
 
 class DifferentialChecker:
-    """Live checker: compares DUT vs ISS golden trace."""
-    
-    def __init__(self, tolerance_cycles: int = 5):
+    """Live checker: compares DUT vs ISS golden trace.
+
+    Traces are compared as columnar arrays, all DUTs at once. With
+    `first_only` each DUT reports only its first divergence; otherwise every
+    differing field of every divergent row is reported (up to `max_mismatches`).
+    A divergence that disappears when the DUT is shifted by at most
+    `tolerance_cycles` rows is treated as timing skew: the traces are
+    realigned and the shift is logged in `realigned` instead of `mismatches`.
+    Each DUT is compared over its own length; a DUT that retires fewer or
+    more commits than the ISS (crashed, killed, ran on) gets a "length"
+    mismatch at the first row only one side has.
+    """
+
+    def __init__(self, tolerance_cycles: int = 5, first_only: bool = True,
+                 fields: Optional[Sequence[str]] = None, max_mismatches: int = 1000):
         self.tolerance = tolerance_cycles
+        self.first_only = first_only
+        self.fields = set(fields or COLUMNS)
+        self.max_mismatches = max_mismatches
         self.mismatches: List[Mismatch] = []
+        self.realigned: List[Tuple[int, int, int]] = []  # (dut_id, cycle, shift)
+
+    def load_iss_trace(self, log_path: Path) -> TraceArray:
+        if log_path.suffix == ".trc":
+            return read_trace(log_path)
+        data = json.loads(log_path.read_text())  # pre-.trc JSON logs
+        return TraceArray.from_records(data.get("trace", []))
+
+    # === Column selection ===
+    def _columns(self, iss: TraceArray, duts: List[TraceArray]) -> Tuple[List[str], np.ndarray]:
+        """Union of compared columns + per-DUT mask of which ones apply."""
+        names = [c for c in COLUMNS if c in self.fields
+                 and (c in iss.index or any(c in d.index for d in duts))]
+        mask = np.array([
+            [(c in iss.index and c in d.index) if c in OPTIONAL_COLUMNS
+             else (c in iss.index or c in d.index) for c in names]
+            for d in duts
+        ], dtype=bool).reshape(len(duts), len(names))
+        return names, mask
+
+    @staticmethod
+    def _diff(a, va, b, vb, mask) -> np.ndarray:
+        """Per-field divergence: differing values, or a field present on one side only."""
+        return (((a != b) & va & vb) | (va != vb)) & mask
 
-    def load_iss_trace(self, log_path: Path) -> List[Dict]:
-        data = json.loads(log_path.read_text())
-        return data.get("trace", [])
+    # === Search ===
+    def _first_divergences(self, iss, duts, names, mask) -> List[Optional[int]]:
+        """Zero-offset pass over all DUTs at once; first divergent row per DUT.
+        Each DUT is compared up to the shorter of its own and the ISS trace."""
+        ends = [min(len(iss), len(d)) for d in duts]
+        first: List[Optional[int]] = [None] * len(duts)
+        start = 0
+        while True:
+            open_ = [k for k, f in enumerate(first) if f is None and ends[k] > start]
+            if not open_:
+                break
+            stop = min(start + CHUNK_ROWS, *(ends[k] for k in open_))
+            a, va = iss.select(names, start, stop)
+            sel = [duts[k].select(names, start, stop) for k in open_]
+            b = np.stack([s[0] for s in sel])
+            vb = np.stack([s[1] for s in sel])
+            bad = self._diff(a[None], va[None], b, vb, mask[open_][:, None, :]).any(axis=2)
+            hit = bad.any(axis=1)
+            rows = bad.argmax(axis=1)
+            for j, k in enumerate(open_):
+                if hit[j]:
+                    first[k] = start + int(rows[j])
+            start = stop
+        return first
 
-    def compare(self, iss_trace: List[Dict], dut_traces: List[List[Dict]], dut_ids: List[int]):
+    def _next_divergence(self, iss, dut, names, mask, i: int, offset: int) -> Optional[int]:
+        """First ISS row >= i that diverges from DUT row + offset."""
+        end = min(len(iss), len(dut) - offset)
+        step = PROBE_ROWS
+        while i < end:
+            stop = min(i + step, end)
+            a, va = iss.select(names, i, stop)
+            b, vb = dut.select(names, i + offset, stop + offset)
+            bad = self._diff(a, va, b, vb, mask).any(axis=1)
+            if bad.any():
+                return i + int(bad.argmax())
+            i = stop
+            step = min(step * 2, CHUNK_ROWS)
+        return None
+
+    def _realign(self, iss, dut, names, mask, i: int, offset: int) -> Optional[Tuple[int, int]]:
+        """Smallest skew within tolerance after which the traces match again.
+
+        The DUT may have retired extra rows (skip DUT rows: offset grows) or
+        dropped some (skip ISS rows: resume later with a smaller offset).
+        Returns (resume_row, new_offset) or None.
+        """
+        window = self.tolerance + 1
+        for s in range(1, self.tolerance + 1):
+            for resume, o in ((i, offset + s), (i + s, offset - s)):
+                stop = min(resume + window, len(iss), len(dut) - o)
+                if stop <= resume:
+                    continue
+                a, va = iss.select(names, resume, stop)
+                b, vb = dut.select(names, resume + o, stop + o)
+                if not self._diff(a, va, b, vb, mask).any():
+                    return resume, o
+        return None
+
+    # === Reporting ===
+    def _record(self, iss, dut, dut_id: int, names, mask, i: int, offset: int):
+        a, va = iss.select(names, i, i + 1)
+        b, vb = dut.select(names, i + offset, i + offset + 1)
+        cols = np.flatnonzero(self._diff(a[0], va[0], b[0], vb[0], mask))
+        if self.first_only:
+            cols = cols[:1]
+        for c in cols:
+            self.mismatches.append(Mismatch(
+                cycle=i, type=COL_KIND[names[c]],
+                expected=int(a[0, c]) if va[0, c] else None,
+                actual=int(b[0, c]) if vb[0, c] else None,
+                dut_id=dut_id, field=names[c],
+            ))
+
+    def _length(self, iss, dut, dut_id: int, offset: int):
+        """A "length" mismatch if the DUT retired a different number of commits than the ISS."""
+        retired = len(dut) - offset
+        if retired != len(iss) and len(self.mismatches) < self.max_mismatches:
+            self.mismatches.append(Mismatch(cycle=min(retired, len(iss)), type="length", expected=len(iss),
+                                            actual=retired, dut_id=dut_id, field="commits"))
+
+    def _walk(self, iss, dut, dut_id: int, names, mask, i: Optional[int]) -> Optional[int]:
+        """Record the divergences from row i on; the final DUT offset, None if it stopped at one."""
+        offset = 0
+        while i is not None and len(self.mismatches) < self.max_mismatches:
+            realign = self._realign(iss, dut, names, mask, i, offset) if self.tolerance else None
+            if realign is not None:
+                self.realigned.append((dut_id, i, realign[1] - offset))
+                i, offset = realign
+            else:
+                self._record(iss, dut, dut_id, names, mask, i, offset)
+                if self.first_only:
+                    return None
+                i += 1
+            i = self._next_divergence(iss, dut, names, mask, i, offset)
+        return offset
+
+    def compare(self, iss_trace: Trace, dut_traces: List[Trace], dut_ids: List[int]):
         self.mismatches.clear()
-        min_len = min(len(iss_trace), min(len(d) for d in dut_traces))
-
-        for cycle in range(min_len):
-            iss_state = iss_trace[cycle]
-            for dut_id, dut_trace in zip(dut_ids, dut_traces):
-                dut_state = dut_trace[cycle]
-
-                # PC check
-                if iss_state.get("pc") != dut_state.get("pc"):
-                    self.mismatches.append(Mismatch(
-                        cycle=cycle, type="pc", expected=iss_state["pc"],
-                        actual=dut_state["pc"], dut_id=dut_id
-                    ))
-
-                # Register divergence
-                for reg in ["x0", "x1", "x2", "x3"]:
-                    if iss_state.get(reg) != dut_state.get(reg):
-                        self.mismatches.append(Mismatch(
-                            cycle=cycle, type="reg", expected=iss_state[reg],
-                            actual=dut_state[reg], dut_id=dut_id
-                        ))
-
-        return self.mismatches
\ No newline at end of file
+        self.realigned.clear()
+        if not dut_traces:
+            return self.mismatches
+
+        iss = iss_trace if isinstance(iss_trace, TraceArray) else TraceArray.from_records(iss_trace)
+        duts = [d if isinstance(d, TraceArray) else TraceArray.from_records(d) for d in dut_traces]
+        names, mask = self._columns(iss, duts)
+
+        for k, first in enumerate(self._first_divergences(iss, duts, names, mask)):
+            offset = self._walk(iss, duts[k], dut_ids[k], names, mask[k], first) if first is not None else 0
+            if offset is not None:
+                self._length(iss, duts[k], dut_ids[k], offset)
+
+        return self.mismatches
+
+class StreamingChecker:
+    """Checks one DUT's commit records against the ISS trace as they arrive.
+
+    feed() returns True once `max_mismatches` divergences are confirmed, so the
+    caller can kill the simulator. A divergence is only confirmed once enough
+    further records have arrived for every realignment within the tolerance
+    to be tried (2 * tolerance_cycles + 1), the stream ended, the DUT stalled
+    (stall()), or fewer ISS rows than a realignment window remain, and none
+    explains it. At the end of the stream a DUT that retired a different
+    number of commits than the ISS (or ran past it and was stopped) gets a
+    "length" mismatch.
+    """
+
+    def __init__(self, iss: TraceArray, dut_id: int, max_mismatches: int = 1,
+                 tolerance_cycles: int = 5, fields: Optional[Sequence[str]] = None):
+        self.iss = iss
+        self.dut_id = dut_id
+        self.max_mismatches = max_mismatches
+        self.tolerance = tolerance_cycles
+        wanted = set(fields or COLUMNS)
+        self.iss_cols = [(n, iss.index[n]) for n in iss.names if n in wanted]
+        self.extra_cols = [n for n in COLUMNS if n in wanted and n not in iss.index
+                           and n not in OPTIONAL_COLUMNS]
+        self.records: List[dict] = []
+        self.offset = 0                     # DUT row = ISS row + offset
+        self.pending: Optional[int] = None  # DUT row of an unconfirmed divergence
+        self._resume = 0
+        self.mismatches: List[Mismatch] = []
+        self.realigned: List[Tuple[int, int, int]] = []
+
+    @property
+    def done(self) -> bool:
+        return len(self.mismatches) >= self.max_mismatches
+
+    def _fields(self, i: int, rec: dict) -> List[Tuple[str, Any, Any]]:
+        """(field, expected, actual) for every differing field of ISS row i vs rec."""
+        if i < 0 or i >= len(self.iss):
+            return []  # outside the ISS trace: nothing to compare against
+        values, valid = self.iss.values, self.iss.valid
+        out = []
+        for name, c in self.iss_cols:
+            actual = rec.get(name)
+            if actual is None and name in OPTIONAL_COLUMNS:
+                continue
+            expected = int(values[i, c]) if valid[i, c] else None
+            if actual is not None:
+                actual &= MASK64
+            if expected != actual:
+                out.append((name, expected, actual))
+        for name in self.extra_cols:
+            if rec.get(name) is not None:
+                out.append((name, None, rec[name] & MASK64))
+        return out
+
+    def _match(self, i: int, j: int, rows: int) -> bool:
+        """ISS rows i.. equal DUT rows j.. for `rows` rows (as far as both exist)."""
+        n = min(rows, len(self.iss) - i, len(self.records) - j)
+        return n > 0 and i >= 0 and all(not self._fields(i + k, self.records[j + k]) for k in range(n))
+
+    def _scan(self, j: int):
+        """Check already-received DUT rows from j on; stop at the first divergence."""
+        while j < len(self.records) and not self.done:
+            if self._fields(j - self.offset, self.records[j]):
+                self.pending = j
+                self._try_resolve()
+                if self.pending is not None:
+                    return
+                j = self._resume
+            else:
+                j += 1
+
+    def _try_resolve(self, final: bool = False):
+        j = self.pending
+        i = j - self.offset
+        window = self.tolerance + 1
+        if not final and len(self.records) - 1 - j < 2 * self.tolerance + 1 \
+                and len(self.iss) - i >= window:
+            return  # wait for more rows; too short an ISS tail for a realignment window: judge now
+        for s in range(1, self.tolerance + 1):
+            for ii, jj in ((i, j + s), (i + s, j)):  # DUT retired extra rows / dropped rows
+                if self._match(ii, jj, window):
+                    self.realigned.append((self.dut_id, i, (jj - ii) - self.offset))
+                    self.offset = jj - ii
+                    self.pending, self._resume = None, jj
+                    return
+        for name, expected, actual in self._fields(i, self.records[j]):
+            self.mismatches.append(Mismatch(cycle=i, type=COL_KIND[name], expected=expected,
+                                            actual=actual, dut_id=self.dut_id, field=name))
+            break  # one mismatch per divergent row
+        self.pending, self._resume = None, j + 1
+
+    @property
+    def exhausted(self) -> bool:
+        """The DUT ran past the ISS trace by more than any realignment can absorb."""
+        return self.pending is None and len(self.records) - self.offset > len(self.iss) + self.tolerance
+
+    def feed(self, rec: dict) -> bool:
+        """Take the next DUT record; True means the simulator can be stopped."""
+        self.records.append(rec)
+        if self.pending is not None:
+            self._try_resolve()
+            if self.pending is None:
+                self._scan(self._resume)
+        else:
+            self._scan(len(self.records) - 1)
+        return self.done or self.exhausted
+
+    def stall(self) -> bool:
+        """The DUT printed nothing for a while: judge a pending divergence with
+        whatever arrived; True means the simulator can be stopped."""
+        self._judge_pending()
+        return self.done
+
+    def _judge_pending(self):
+        while self.pending is not None and not self.done:
+            self._try_resolve(final=True)
+            if self.pending is None:
+                self._scan(self._resume)
+
+    def finish(self) -> List[Mismatch]:
+        """End of stream: judge a pending divergence with whatever arrived."""
+        self._judge_pending()
+        retired = len(self.records) - self.offset
+        if not self.done and retired != len(self.iss):
+            self.mismatches.append(Mismatch(cycle=min(retired, len(self.iss)), type="length",
+                                            expected=len(self.iss), actual=retired,
+                                            dut_id=self.dut_id, field="commits"))
+        return self.mismatches
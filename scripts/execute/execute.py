@@ -1,45 +1,135 @@
 # scripts/execute/execute.py
 """
 Execute Stage: Asymmetric simulation with ISS pre-run
-1. Filter
+1. Filter (+ optional static CFG stage: tests bounded above defer_insns
+   dynamic instructions run after the rest, cheapest first)
 2. ISS pre-run (fast oracle)
+   → gate: skip / defer DUTs for unpromising ISS results
 3. DUT execution (slow)
 4. Differential check
-Output: logs/iss/*.json, logs/dut/*.json
+Output: logs/iss/*.trc, logs/dut/*.trc (binary traces, see utils/tracefile.py)
 """
 
 import sys
-import json
 import asyncio
+import yaml
 from pathlib import Path
+from typing import Optional
 
 # === Add project root ===
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
 from utils.models import Testcase
-from scripts.execute.filter import LightweightFilter
-from scripts.execute.checker import DifferentialChecker
+from utils.tracefile import write_trace
+from scripts.execute.filter import LightweightFilter, shared_filter
+from scripts.execute.checker import DifferentialChecker, StreamingChecker
+from scripts.execute.scheduler import ExecScheduler, Deferred, default_workers
+from scripts.execute.gate import IssGate, GateDecision
+from scripts.execute.sim import run_sim
 
 # === Paths ===
+CONFIG = yaml.safe_load((PROJECT_ROOT / "config.yaml").read_text())
+EXEC_CONFIG = CONFIG["execution"]
 IN_DIR = PROJECT_ROOT / "queue_mutate"
 ISS_LOG_DIR = PROJECT_ROOT / "logs" / "iss"
 DUT_LOG_DIR = PROJECT_ROOT / "logs" / "dut"
+SCRATCH_DIR = PROJECT_ROOT / EXEC_CONFIG.get("scratch_dir", "sandbox")
+DEFER_INSNS = EXEC_CONFIG.get("filter", {}).get("cfg", {}).get("defer_insns", 0)
 ISS_LOG_DIR.mkdir(parents=True, exist_ok=True)
 DUT_LOG_DIR.mkdir(parents=True, exist_ok=True)
 
-# === Mock ISS & DUT (replace with real spike/verilator) ===
-async def run_iss(tc: Testcase) -> dict:
-    await asyncio.sleep(0.01)  # fast
-    trace = [{"pc": 0x1000 + i*4, "x1": i, "x2": i+1, "x3": i+2} for i in range(100)]
-    return {"trace": trace, "cycles": 100}
+# === ISS & DUT (real subprocesses, one sandbox per worker) ===
+async def run_iss(tc: Testcase, workdir: Path, timeout: Optional[float] = None) -> dict:
+    tc_path = tc.save(workdir)
+    return await run_sim(EXEC_CONFIG["iss_cmd"], tc_path, workdir / "iss", timeout or EXEC_CONFIG["timeout_sec"])
 
-async def run_dut(tc: Testcase, dut_id: int) -> dict:
-    await asyncio.sleep(0.5)  # slow RTL
-    # Simulate divergence
-    offset = 1 if dut_id == 1 else 0
-    trace = [{"pc": 0x1000 + i*4 + offset, "x1": i, "x2": i+1, "x3": i+2} for i in range(100)]
-    return {"trace": trace, "cycles": 500}
+async def run_dut(tc: Testcase, dut_id: int, workdir: Path, on_record=None,
+                  timeout: Optional[float] = None, on_idle=None) -> dict:
+    tc_path = tc.save(workdir)
+    return await run_sim(EXEC_CONFIG["dut_cmd"], tc_path, workdir / f"dut{dut_id}",
+                         timeout or EXEC_CONFIG["timeout_sec"], on_record=on_record,
+                         on_idle=on_idle, idle=EXEC_CONFIG.get("stream_idle_sec", 1.0))
+
+def log_meta(result: dict) -> dict:
+    return {k: result[k] for k in ("cycles", "exit", "trap")}
+
+def build_scheduler(job) -> ExecScheduler:
+    dut_count = EXEC_CONFIG["dut_count"]
+    workers = EXEC_CONFIG.get("workers") or default_workers(dut_count)
+    return ExecScheduler(job, SCRATCH_DIR, workers)
+
+# === Per-testcase flow ===
+async def execute_testcase(tc: Testcase, filter: LightweightFilter,
+                           checker: DifferentialChecker, workdir: Path,
+                           gate: Optional[IssGate] = None):
+    """Filter → ISS → gate → DUTs → check for one testcase.
+    Returns None if filtered out, Deferred if the static bound or the gate postponed it."""
+    # 1. Filter
+    rule, bound = filter.assess(tc)
+    if rule is not None:
+        print(f"    [FILTER] Rejected ({rule})")
+        return None
+    if DEFER_INSNS and bound is not None and bound > DEFER_INSNS:
+        print(f"    [FILTER] {tc.id[:8]} deferred: up to {bound} instructions")
+        return Deferred(lambda wd: run_testcase(tc, checker, wd, gate), priority=bound)
+    return await run_testcase(tc, checker, workdir, gate)
+
+async def run_testcase(tc: Testcase, checker: DifferentialChecker, workdir: Path,
+                       gate: Optional[IssGate] = None):
+    # 2. ISS pre-run
+    iss_result = await run_iss(tc, workdir)
+    iss_log = ISS_LOG_DIR / f"{tc.id}.trc"
+    write_trace(iss_log, iss_result["trace"], meta=log_meta(iss_result))
+    iss_result["log"] = iss_log  # the analyse stage reads coverage and cycles from here
+    print(f"    [ISS] → {iss_log.name} ({iss_result['cycles']} cycles, {iss_result['exit']})")
+
+    # Gate
+    decision = gate.decide(iss_result) if gate else GateDecision("run", "no gate", 1.0)
+    if decision.action == "skip":
+        print(f"    [GATE] {tc.id[:8]} skipped: {decision.reason}")
+        return {"iss": iss_result, "duts": [], "mismatches": [], "gate": decision}
+    if decision.action == "defer":
+        print(f"    [GATE] {tc.id[:8]} deferred: {decision.reason}")
+        return Deferred(lambda wd: run_duts(tc, iss_result, checker, wd, gate, decision))
+
+    return await run_duts(tc, iss_result, checker, workdir, gate, decision)
+
+async def run_duts(tc: Testcase, iss_result: dict, checker: DifferentialChecker,
+                   workdir: Path, gate: Optional[IssGate], decision: GateDecision) -> dict:
+    # 3. DUT runs (streaming: checked while running, killed at the mismatch budget)
+    dut_ids = list(range(EXEC_CONFIG["dut_count"]))
+    streams = None
+    if EXEC_CONFIG.get("stream_check", False):
+        streams = [StreamingChecker(iss_result["trace"], i,
+                                    max_mismatches=EXEC_CONFIG.get("stream_max_mismatches", 1),
+                                    tolerance_cycles=checker.tolerance,
+                                    fields=checker.fields)
+                   for i in dut_ids]
+    dut_tasks = [run_dut(tc, i, workdir, streams[i].feed, on_idle=streams[i].stall) if streams
+                 else run_dut(tc, i, workdir) for i in dut_ids]
+    dut_results = await asyncio.gather(*dut_tasks)
+    for i, res in enumerate(dut_results):
+        dut_log = DUT_LOG_DIR / f"{tc.id}_dut{i}.trc"
+        write_trace(dut_log, res["trace"], meta=log_meta(res))
+        print(f"    [DUT{i}] → {dut_log.name} ({res['cycles']} cycles, {res['exit']})")
+    if gate:
+        gate.record_dut_time(sum(r["wall"] for r in dut_results))
+
+    # 4. Differential check
+    if streams:
+        mismatches = [m for s in streams for m in s.finish()]
+    else:
+        dut_traces = [r["trace"] for r in dut_results]
+        mismatches = list(checker.compare(iss_result["trace"], dut_traces, dut_ids))
+    if mismatches:
+        print(f"    [MISMATCH] {len(mismatches)} found:")
+        for m in mismatches[:2]:
+            print(f"      cycle {m.cycle}: {m.field} {m.expected} ≠ {m.actual} (DUT{m.dut_id})")
+    else:
+        print(f"    [PASS] No mismatch")
+
+    return {"iss": iss_result, "duts": dut_results, "mismatches": mismatches, "gate": decision}
 
 # === Main ===
 async def execute():
@@ -48,42 +138,19 @@ async def execute():
         print("[ERROR] No mutants in queue_mutate!")
         return
 
-    filter = LightweightFilter()
-    checker = DifferentialChecker()
+    filter = shared_filter()
+    checker = DifferentialChecker(**EXEC_CONFIG.get("checker", {}))
+    gate = IssGate(EXEC_CONFIG.get("gate", {}))
+
+    scheduler = build_scheduler(lambda tc, workdir: execute_testcase(tc, filter, checker, workdir, gate))
 
     for seed_file in IN_DIR.glob("*.s"):
         tc = Testcase.from_file(seed_file)
         print(f"  [TESTCASE] {tc.id[:8]}... ({tc.source})")
+        await scheduler.submit(tc)
+    await scheduler.drain()
 
-        # 1. Filter
-        if not filter.is_valid(tc):
-            print(f"    [FILTER] Rejected")
-            continue
-
-        # 2. ISS pre-run
-        iss_result = await run_iss(tc)
-        iss_log = ISS_LOG_DIR / f"{tc.id}.json"
-        iss_log.write_text(json.dumps({"trace": iss_result["trace"], "cycles": iss_result["cycles"]}))
-        print(f"    [ISS] → {iss_log.name} ({iss_result['cycles']} cycles)")
-
-        # 3. DUT runs
-        dut_tasks = [run_dut(tc, i) for i in range(3)]
-        dut_results = await asyncio.gather(*dut_tasks)
-        for i, res in enumerate(dut_results):
-            dut_log = DUT_LOG_DIR / f"{tc.id}_dut{i}.json"
-            dut_log.write_text(json.dumps({"trace": res["trace"], "cycles": res["cycles"]}))
-            print(f"    [DUT{i}] → {dut_log.name}")
-
-        # 4. Differential check
-        dut_traces = [r["trace"] for r in dut_results]
-        mismatches = checker.compare(iss_result["trace"], dut_traces, [0,1,2])
-        if mismatches:
-            print(f"    [MISMATCH] {len(mismatches)} found:")
-            for m in mismatches[:2]:
-                print(f"      cycle {m.cycle}: {m.type} {m.expected} ≠ {m.actual} (DUT{m.dut_id})")
-        else:
-            print(f"    [PASS] No mismatch")
-
+    print(f"[EXECUTE] {scheduler.report()}; {gate.report()}; {filter.report()}")
     print(f"[EXECUTE] Done → logs/iss/, logs/dut/")
 
 if __name__ == "__main__":
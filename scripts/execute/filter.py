@@ -1,45 +1,207 @@
-# utils/filter.py
+# scripts/execute/filter.py
+"""
+Pre-execution filter: discard pathological testcases before any simulator runs
+- Rules, in order; the first that fires is the verdict:
+  size          more than max_lines lines
+  loops         more than max_loops "loop:" labels
+  inf_label     a ".inf:" label
+  jump_to_self  "j ." / "c.j ." (the mnemonic, not the tail of fsgnj.s / fsgnj.d,
+                and not "j .L1" or "j .+8")
+  loop_loop     "loop:" directly followed by "loop"
+  too_short     fewer than min_instructions non-blank, non-comment lines
+  no_exit       (cfg stage) a loop that provably never exits
+  text_store    (cfg stage, reject_text_stores) a store into .text
+- The optional cfg stage (scripts/execute/cfg.py) runs on what the string
+  rules pass; besides its two rules it yields a static bound on dynamic
+  instructions, which assess() returns with the verdict for the scheduler
+- scan() lowercases once and runs C-level searches with early exit: line and
+  label counts are str.count, the banned patterns are compiled regexes that
+  start with a literal (one alternation of all rules was 5-15x slower in re)
+- Verdicts are cached by content hash (code_hash), and shared_filter() is
+  one process-wide instance, so a mutant filtered in the mutate stage is not
+  scanned again in execute
+- filter_batch() dedupes by content, answers cache hits, and fans the rest
+  out across `processes` worker processes for large batches
+- stats count every verdict per rule (cache hits included): which rule is
+  costing us mutants
+"""
 import re
-from typing import List
+import threading
+from pathlib import Path
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import List, Optional, Tuple
+
+import yaml
+from utils.lineage import code_hash
 from utils.models import Testcase
+from scripts.execute.cfg import analyse_cfg
+
+CONFIG_PATH = Path(__file__).parent.parent.parent / "config.yaml"
+
+INF_LABEL = ".inf:"                                     # infinite loop labels
+JUMP_TO_SELF = re.compile(r"j[ \t]*\.(?![\w.+-])")        # unconditional jump to self
+LOOP_LOOP = re.compile(r"loop:\s*loop")                  # nested infinite
+WORD = re.compile(r"[\w.]")
+INSTRUCTION_LINE = re.compile(r"^(?!#)[^\S\n]*\S", re.MULTILINE)
+RULES = ("size", "loops", "inf_label", "jump_to_self", "loop_loop", "too_short", "no_exit", "text_store")
+PARALLEL_MIN = 256  # smaller batches are not worth the pickling
+
+def _jumps_to_self(code: str) -> bool:
+    """`j .` / `c.j .` as a mnemonic: the j must not end a longer name (fsgnj.s, fsgnj.d)."""
+    for m in JUMP_TO_SELF.finditer(code):
+        i = m.start()
+        if i >= 2 and code[i - 2:i] == "c.":
+            i -= 2
+        if i == 0 or not WORD.match(code[i - 1]):
+            return True
+    return False
+
+def scan(code: str, max_lines: int = 200, max_loops: int = 3, min_instructions: int = 3) -> Optional[str]:
+    """The rule that rejects `code`, or None if it passes."""
+    lines = code.count("\n") + (not code.endswith("\n")) if code else 0
+    if lines > max_lines:
+        return "size"
+    code = code.lower()
+    loops = code.count("loop:")
+    if loops > max_loops:
+        return "loops"
+    if INF_LABEL in code:
+        return "inf_label"
+    if _jumps_to_self(code):
+        return "jump_to_self"
+    if loops and LOOP_LOOP.search(code):
+        return "loop_loop"
+    if sum(1 for _ in islice(INSTRUCTION_LINE.finditer(code), min_instructions)) < min_instructions:
+        return "too_short"
+    return None
+
+def judge(code: str, max_lines: int = 200, max_loops: int = 3, min_instructions: int = 3,
+          cfg: bool = False, reject_text_stores: bool = False) -> Tuple[Optional[str], Optional[int]]:
+    """(rejecting rule or None, static bound on dynamic instructions or None)."""
+    rule = scan(code, max_lines, max_loops, min_instructions)
+    if rule is not None or not cfg:
+        return rule, None
+    report = analyse_cfg(code)
+    if report.no_exit:
+        return "no_exit", None
+    if reject_text_stores and report.text_stores:
+        return "text_store", None
+    return None, report.max_insns
+
+def _scan_chunk(codes: List[str], options: tuple) -> List[Tuple[Optional[str], Optional[int]]]:
+    return [judge(code, *options) for code in codes]
 
 class LightweightFilter:
     """Pre-execution filter to discard pathological testcases."""
-    
-    def __init__(self):
-        self.max_lines = 200
-        self.max_loops = 3
-        self.banned_patterns = [
-            r"\.inf:",           # infinite loop labels
-            r"j\s*\.",           # unconditional jump to self
-            r"loop:\s*loop",     # nested infinite
-        ]
 
-    def is_valid(self, tc: Testcase) -> bool:
-        code = tc.code.lower()
-        lines = code.splitlines()
+    def __init__(self, max_lines: int = 200, max_loops: int = 3, min_instructions: int = 3,
+                 cache_size: int = 65536, processes: int = 1, cfg: bool = False,
+                 reject_text_stores: bool = False):
+        self.max_lines = max_lines
+        self.max_loops = max_loops
+        self.min_instructions = min_instructions
+        self.cfg = cfg
+        self.reject_text_stores = reject_text_stores
+        self.cache_size = cache_size
+        self.processes = processes
+        self.verdicts: "OrderedDict[str, tuple]" = OrderedDict()  # code hash → (rule / None, insn bound)
+        self.stats: Counter = Counter()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()  # the mutate stage filters from worker threads
 
-        # 1. Size check
-        if len(lines) > self.max_lines:
-            return False
+    @property
+    def options(self) -> tuple:
+        return self.max_lines, self.max_loops, self.min_instructions, self.cfg, self.reject_text_stores
 
-        # 2. Loop count
-        loop_count = code.count("loop:")
-        if loop_count > self.max_loops:
-            return False
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
 
-        # 3. Banned patterns
-        if any(re.search(p, code) for p in self.banned_patterns):
-            return False
+    # === Verdicts ===
+    def _cached(self, key: str) -> tuple:
+        """(hit, verdict) under the lock."""
+        with self._lock:
+            if key not in self.verdicts:
+                return False, None
+            self.verdicts.move_to_end(key)
+            return True, self.verdicts[key]
 
-        # 4. Minimal instruction count
-        instr = [l for l in lines if l.strip() and not l.startswith("#")]
-        if len(instr) < 3:
-            return False
+    def _record(self, key: str, verdict: tuple, hit: bool):
+        with self._lock:
+            if not hit:
+                self.verdicts[key] = verdict
+                if len(self.verdicts) > self.cache_size:
+                    self.verdicts.popitem(last=False)
+            self.stats["checked"] += 1
+            self.stats["cache_hits"] += hit
+            self.stats[verdict[0] or "passed"] += 1
+            self.stats["bounded"] += verdict[1] is not None
 
-        return True
+    def assess(self, tc: Testcase) -> Tuple[Optional[str], Optional[int]]:
+        """(the rule that rejects `tc` or None, static bound on its dynamic instructions or None)."""
+        key = code_hash(tc.code)
+        hit, verdict = self._cached(key)
+        if not hit:
+            verdict = judge(tc.code, *self.options)
+        self._record(key, verdict, hit)
+        return verdict
+
+    def check(self, tc: Testcase) -> Optional[str]:
+        """The rule that rejects `tc` (None: it passes)."""
+        return self.assess(tc)[0]
+
+    def is_valid(self, tc: Testcase) -> bool:
+        return self.check(tc) is None
 
     def filter_batch(self, testcases: List[Testcase]) -> List[Testcase]:
-        valid = [tc for tc in testcases if self.is_valid(tc)]
+        keys = [code_hash(tc.code) for tc in testcases]
+        codes = dict(zip(keys, (tc.code for tc in testcases)))
+        found = {k: self._cached(k) for k in codes}
+        todo = [k for k, (hit, _) in found.items() if not hit]
+        fresh = dict(zip(todo, self._scan_many([codes[k] for k in todo])))
+        valid, done = [], set()
+        for k, tc in zip(keys, testcases):
+            verdict = fresh[k] if k in fresh else found[k][1]
+            self._record(k, verdict, hit=k not in fresh or k in done)  # in-batch repeats are hits
+            done.add(k)
+            if verdict[0] is None:
+                valid.append(tc)
         print(f"[FILTER] {len(testcases)} → {len(valid)} passed")
-        return valid
\ No newline at end of file
+        return valid
+
+    def _scan_many(self, codes: List[str]) -> List[tuple]:
+        if self.processes <= 1 or len(codes) < PARALLEL_MIN:
+            return _scan_chunk(codes, self.options)
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self.processes)
+        size = -(-len(codes) // self.processes)
+        chunks = [codes[i:i + size] for i in range(0, len(codes), size)]
+        return [v for part in self._pool.map(_scan_chunk, chunks, [self.options] * len(chunks)) for v in part]
+
+    def report(self) -> str:
+        s = self.stats
+        rejected = ", ".join(f"{r} {s[r]}" for r in RULES if s[r])
+        return (f"filter: {s['passed']}/{s['checked']} passed ({s['cache_hits']} cached)"
+                + (f", {s['bounded']} statically bounded" if self.cfg else "")
+                + (f"; rejected: {rejected}" if rejected else ""))
+
+def build_filter(config: dict) -> LightweightFilter:
+    cfg = config.get("execution", {}).get("filter", {})
+    stage = cfg.get("cfg", {})
+    return LightweightFilter(max_lines=cfg.get("max_lines", 200), max_loops=cfg.get("max_loops", 3),
+                             min_instructions=cfg.get("min_instructions", 3),
+                             cache_size=cfg.get("cache_size", 65536), processes=cfg.get("processes", 1),
+                             cfg=stage.get("enabled", False),
+                             reject_text_stores=stage.get("reject_text_stores", False))
+
+_SHARED: Optional[LightweightFilter] = None
+
+def shared_filter() -> LightweightFilter:
+    """Process-wide filter (execution.filter in config.yaml), so mutate and execute share one verdict cache."""
+    global _SHARED
+    if _SHARED is None:
+        _SHARED = build_filter(yaml.safe_load(CONFIG_PATH.read_text()))
+    return _SHARED
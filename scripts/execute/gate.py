@@ -0,0 +1,118 @@
+# scripts/execute/gate.py
+"""
+ISS gate: decide from the ISS pre-run whether a testcase deserves RTL time
+- skip:  ISS timed out or left no trace, trapped within the first few
+         commits, trace too short, or exact (pc, insn) sequence already seen
+         (a non-zero ISS exit with a trace, e.g. a tohost failure, still runs);
+         the instruction words are hashed too, so a register / immediate /
+         data-path mutant that keeps its parent's PCs is not a repeat
+- seen sequences / edge sets are LRUs of `history` hashes each, so a
+  resident pipeline does not grow them without bound
+- defer: same control-flow edges as an earlier trace (only counts differ)
+- run:   everything else
+"""
+
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+import numpy as np
+
+@dataclass
+class GateDecision:
+    action: str  # "run", "defer", "skip"
+    reason: str
+    score: float
+
+def commit_sequence_hash(pcs: np.ndarray, insns: Optional[np.ndarray] = None) -> str:
+    h = hashlib.blake2b(pcs.astype("<u8").tobytes(), digest_size=16)
+    if insns is not None:
+        h.update(insns.astype("<u4").tobytes())
+    return h.hexdigest()
+
+def pc_edge_hash(pcs: np.ndarray) -> str:
+    edges = np.unique(np.stack([pcs[:-1], pcs[1:]], axis=1), axis=0)
+    return hashlib.blake2b(edges.astype("<u8").tobytes(), digest_size=16).hexdigest()
+
+class IssGate:
+    def __init__(self, config: dict):
+        self.enabled = config.get("enabled", True)
+        self.min_trace_len = config.get("min_trace_len", 4)
+        self.early_trap_len = config.get("early_trap_len", 8)
+        self.repeat_action = config.get("repeat_action", "skip")
+        self.similar_action = config.get("similar_action", "defer")
+        self.history = config.get("history", 100000)
+
+        self.seen_sequences: "OrderedDict[str, None]" = OrderedDict()
+        self.seen_edges: "OrderedDict[str, None]" = OrderedDict()
+
+        # Metrics
+        self.total = 0
+        self.skipped = 0
+        self.deferred = 0
+        self.dut_seconds = 0.0
+        self.dut_runs = 0
+
+    def decide(self, iss_result: dict) -> GateDecision:
+        self.total += 1
+        decision = self._score(iss_result)
+        if decision.action == "skip":
+            self.skipped += 1
+        elif decision.action == "defer":
+            self.deferred += 1
+        return decision
+
+    def _score(self, iss_result: dict) -> GateDecision:
+        if not self.enabled:
+            return GateDecision("run", "gate disabled", 1.0)
+
+        trace = iss_result["trace"]
+        if iss_result["exit"] == "timeout":
+            return GateDecision("skip", "iss timeout", 0.0)
+        if len(trace) == 0:
+            return GateDecision("skip", f"no iss trace ({iss_result['exit']})", 0.0)
+        if iss_result["exit"] == "trap" and len(trace) < self.early_trap_len:
+            return GateDecision("skip", f"early trap ({iss_result['trap']})", 0.0)
+        if len(trace) < self.min_trace_len:
+            return GateDecision("skip", f"short trace ({len(trace)})", 0.0)
+
+        pcs = trace.column("pc")
+        insns = trace.column("insn") if "insn" in trace.index else None
+        seq, edges = commit_sequence_hash(pcs, insns), pc_edge_hash(pcs)
+        new_seq = self._remember(self.seen_sequences, seq)
+        new_edges = self._remember(self.seen_edges, edges)
+
+        if not new_seq:
+            return GateDecision(self.repeat_action, "repeated commit sequence", 0.1)
+        if not new_edges:
+            return GateDecision(self.similar_action, "known control flow", 0.5)
+        return GateDecision("run", "novel", 1.0)
+
+    def _remember(self, seen: "OrderedDict[str, None]", key: str) -> bool:
+        """Add `key` to the LRU `seen`; True if it was not there."""
+        new = key not in seen
+        seen[key] = None
+        seen.move_to_end(key)
+        if len(seen) > self.history:
+            seen.popitem(last=False)
+        return new
+
+    def record_dut_time(self, seconds: float):
+        """Feed the summed wall time of one testcase's DUT runs."""
+        self.dut_seconds += seconds
+        self.dut_runs += 1
+
+    def metrics(self) -> dict:
+        mean_dut = self.dut_seconds / self.dut_runs if self.dut_runs else 0.0
+        return {
+            "total": self.total,
+            "skipped": self.skipped,
+            "deferred": self.deferred,
+            "skip_rate": self.skipped / self.total if self.total else 0.0,
+            "dut_seconds_saved": self.skipped * mean_dut,
+        }
+
+    def report(self) -> str:
+        m = self.metrics()
+        return (f"gate skipped {m['skipped']}/{m['total']} ({m['skip_rate']:.0%}), "
+                f"deferred {m['deferred']}, ~{m['dut_seconds_saved']:.1f} DUT-s saved")
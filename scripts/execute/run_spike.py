@@ -0,0 +1,43 @@
+# scripts/execute/run_spike.py
+"""
+ISS wrapper: spike runs ELFs, testcases are .s files
+- assembles and links the test at the reset PC (0x80000000) with the
+  riscv64-unknown-elf toolchain, next to the input, then execs spike in the
+  same process, so the runner's timeout / killpg still reaches it
+- extra arguments after the input go to spike
+
+    execution:
+      iss_cmd: "python scripts/execute/run_spike.py {input}"
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+from pathlib import Path
+
+TEXT_BASE = "0x80000000"
+SPIKE = ["spike", "--isa=rv64gc", "-l", "--log-commits"]
+
+def link(asm: Path) -> Path:
+    elf = asm.with_suffix(".elf")
+    subprocess.run(["riscv64-unknown-elf-gcc", "-march=rv64gc", "-mabi=lp64d", "-nostdlib", "-nostartfiles",
+                    f"-Wl,-Ttext={TEXT_BASE}", "-Wl,-e,_start", str(asm), "-o", str(elf)],
+                   check=True, capture_output=True, text=True)
+    return elf
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("input", type=Path)
+    ap.add_argument("spike_args", nargs=argparse.REMAINDER)
+    args = ap.parse_args()
+    try:
+        elf = link(args.input)
+    except (subprocess.CalledProcessError, OSError) as e:
+        print(f"[ISS] {args.input.name}: does not build: {getattr(e, 'stderr', '') or e}", file=sys.stderr)
+        sys.exit(2)
+    argv = SPIKE + args.spike_args + [str(elf)]
+    os.execvp(argv[0], argv)
+
+if __name__ == "__main__":
+    main()
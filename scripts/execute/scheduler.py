@@ -0,0 +1,93 @@
+# scripts/execute/scheduler.py
+"""
+Execution scheduler: keep N testcases in flight
+- Each worker owns a scratch sandbox (scratch_dir/worker<i>)
+- submit() blocks only while all workers are busy
+- A job may return Deferred to park its remaining work until drain();
+  parked work resumes lowest priority value first (e.g. a static cost)
+- Reports throughput in testcases/sec
+"""
+
+import os
+import time
+import asyncio
+import shutil
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Awaitable, Callable, List, Optional, Set, Tuple
+
+from utils.models import Testcase
+
+Job = Callable[[Testcase, Path], Awaitable[Optional[dict]]]
+OnDone = Callable[[Testcase, Optional[dict]], Awaitable[None]]
+
+@dataclass
+class Deferred:
+    """Job result meaning: run `resume` later, once regular work has drained."""
+    resume: Callable[[Path], Awaitable[Optional[dict]]]
+    priority: float = 0.0  # parked jobs resume in ascending order
+
+def default_workers(dut_count: int) -> int:
+    """One worker keeps 1 + dut_count simulators busy at its peak."""
+    return max(1, (os.cpu_count() or 1) // (dut_count + 1))
+
+class ExecScheduler:
+    def __init__(self, job: Job, scratch_root: Path, workers: int):
+        self.job = job
+        self.scratch_root = scratch_root
+        self.workers = workers
+        self.free: asyncio.Queue = asyncio.Queue()
+        for i in range(workers):
+            self.free.put_nowait(i)
+        self.tasks: Set[asyncio.Task] = set()
+        self.deferred: List[Tuple[Testcase, Deferred, Optional[OnDone]]] = []
+        self.done = 0
+        self.start = time.monotonic()
+
+    def sandbox(self, worker_id: int) -> Path:
+        path = self.scratch_root / f"worker{worker_id}"
+        shutil.rmtree(path, ignore_errors=True)
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    async def _run(self, worker_id: int, tc: Testcase, on_done: Optional[OnDone], job: Job):
+        try:
+            result = await job(tc, self.sandbox(worker_id))
+        except Exception as e:
+            print(f"    [ERROR] worker{worker_id} {tc.id[:8]}: {e}")
+            result = None
+        finally:
+            self.free.put_nowait(worker_id)
+        if isinstance(result, Deferred):
+            self.deferred.append((tc, result, on_done))
+            return
+        self.done += 1
+        if on_done is not None:
+            await on_done(tc, result)
+
+    async def submit(self, tc: Testcase, on_done: Optional[OnDone] = None):
+        """Start `tc` on the next free worker, waiting for one if necessary."""
+        await self._start(tc, on_done, self.job)
+
+    async def _start(self, tc: Testcase, on_done: Optional[OnDone], job: Job):
+        worker_id = await self.free.get()
+        task = asyncio.create_task(self._run(worker_id, tc, on_done, job))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def drain(self):
+        """Wait until every submitted testcase, deferred ones included, has finished."""
+        while self.tasks or self.deferred:
+            while self.tasks:
+                await asyncio.gather(*list(self.tasks))
+            parked, self.deferred = sorted(self.deferred, key=lambda p: p[1].priority), []
+            for tc, d, on_done in parked:
+                await self._start(tc, on_done, lambda _tc, workdir, d=d: d.resume(workdir))
+
+    def throughput(self) -> float:
+        return self.done / max(time.monotonic() - self.start, 1e-9)
+
+    def report(self) -> str:
+        elapsed = time.monotonic() - self.start
+        return (f"{self.done} testcases in {elapsed:.2f}s "
+                f"({self.throughput():.2f} tc/s, {self.workers} workers)")
@@ -0,0 +1,149 @@
+# scripts/execute/sim.py
+"""
+Simulator runner: ISS / DUT as real subprocesses
+- One process group per run, killed as a whole on timeout
+- stdout is parsed as a spike-style commit log (or JSON lines) into a TraceArray
+- Relative paths in the command (e.g. scripts/execute/stub_sim.py) are
+  resolved against the project root, since the simulator runs in its sandbox
+- stdout is parsed while the simulator runs: a run killed on timeout keeps
+  the trace it printed so far (exit "timeout")
+- Optional streaming: records are handed to a callback while the simulator
+  runs, and the run is killed as soon as the callback says so; a second
+  callback is asked the same whenever the simulator prints nothing for
+  `idle` seconds (a DUT hung after diverging)
+"""
+
+import os
+import re
+import json
+import shlex
+import signal
+import asyncio
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from utils.trace import TraceArray
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+# core   0: 3 0x0000000080000000 (0x00000297) x5  0x0000000080000000
+COMMIT_RE = re.compile(r"^core\s+\d+:\s+(\d+)\s+0x([0-9a-fA-F]+)\s+\(0x([0-9a-fA-F]+)\)(.*)$")
+# core   0: exception trap_illegal_instruction, epc 0x0000000080000000
+TRAP_RE = re.compile(r"^core\s+\d+:\s+exception\s+(\w+)")
+
+class CommitLogParser:
+    """Turns commit-log lines into full architectural-state records."""
+
+    def __init__(self):
+        self.state: Dict[str, int] = {}
+        self.trap: Optional[str] = None
+
+    def feed(self, line: str) -> Optional[dict]:
+        line = line.strip()
+        if not line:
+            return None
+        if line.startswith("{"):
+            record = json.loads(line)
+            self.state.update({k: v for k, v in record.items() if k != "pc"})
+            return record
+
+        m = COMMIT_RE.match(line)
+        if not m:
+            t = TRAP_RE.match(line)
+            if t and self.trap is None:
+                self.trap = t.group(1)
+            return None
+
+        priv, pc, insn, rest = m.groups()
+        tokens = rest.split()
+        i = 0
+        while i + 1 < len(tokens):
+            name, value = tokens[i], tokens[i + 1]
+            if name == "mem":
+                # mem <addr> [<value>]; stores carry a value, loads do not
+                i += 3 if i + 2 < len(tokens) and tokens[i + 2].startswith("0x") else 2
+                continue
+            if "_" in name and name[0] == "c":  # c300_mstatus
+                name = name.split("_", 1)[1]
+            self.state[name] = int(value, 16)
+            i += 2
+        return {"pc": int(pc, 16), "insn": int(insn, 16), "priv": int(priv), **self.state}
+
+def _kill_group(proc: asyncio.subprocess.Process):
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+async def _stream(proc: asyncio.subprocess.Process, parser: CommitLogParser, records: List[dict],
+                  on_record: Callable[[dict], bool], timeout: float,
+                  on_idle: Optional[Callable[[], bool]] = None, idle: float = 1.0) -> str:
+    async def pump() -> str:
+        while True:
+            try:
+                # a cancelled readline() leaves buffered output in the reader
+                raw = await (asyncio.wait_for(proc.stdout.readline(), idle) if on_idle
+                             else proc.stdout.readline())
+            except asyncio.TimeoutError:
+                if on_idle():
+                    return "stopped"
+                continue
+            if not raw:
+                break
+            rec = parser.feed(raw.decode(errors="replace"))
+            if rec is None:
+                continue
+            records.append(rec)
+            if on_record(rec):
+                return "stopped"
+        await proc.wait()
+        return "ok" if proc.returncode == 0 else "error"
+
+    try:
+        exit_reason = await asyncio.wait_for(pump(), timeout)
+    except asyncio.TimeoutError:
+        exit_reason = "timeout"
+    if proc.returncode is None:
+        _kill_group(proc)
+        await proc.wait()
+    return exit_reason
+
+def command(cmd: str, tc_path: Path, workdir: Path) -> List[str]:
+    """argv for `cmd`; project-relative paths made absolute (the process runs in workdir)."""
+    argv = shlex.split(cmd.format(input=tc_path, workdir=workdir))
+    return [str(PROJECT_ROOT / a) if "/" in a and not os.path.isabs(a) and (PROJECT_ROOT / a).exists() else a
+            for a in argv]
+
+async def run_sim(cmd: str, tc_path: Path, workdir: Path, timeout: float,
+                  on_record: Optional[Callable[[dict], bool]] = None,
+                  on_idle: Optional[Callable[[], bool]] = None, idle: float = 1.0) -> dict:
+    """Run one simulator on `tc_path` inside `workdir` and collect its trace.
+    stdout is parsed incrementally (a timeout keeps the partial trace); with
+    `on_record`, the process group is killed early (exit "stopped") once
+    on_record returns True, or once on_idle does after `idle` silent seconds."""
+    workdir.mkdir(parents=True, exist_ok=True)
+    argv = command(cmd, tc_path, workdir)
+    start = time.monotonic()
+    proc = await asyncio.create_subprocess_exec(
+        *argv, cwd=workdir,
+        stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT,
+        start_new_session=True,  # own process group → killpg reaches children too
+    )
+    parser = CommitLogParser()
+    records: List[dict] = []
+    # stdout is always pumped line by line, so a run killed on timeout keeps its partial trace
+    exit_reason = await _stream(proc, parser, records, on_record or (lambda rec: False), timeout,
+                                on_idle, idle)
+
+    trace = TraceArray.from_records(records)
+    if parser.trap and exit_reason == "ok":
+        exit_reason = "trap"
+    return {
+        "trace": trace,
+        "cycles": len(trace),
+        "exit": exit_reason,
+        "trap": parser.trap,
+        "returncode": proc.returncode,
+        "wall": time.monotonic() - start,
+    }
@@ -0,0 +1,50 @@
+# scripts/execute/stub_sim.py
+"""
+Stub simulator for dry runs of the execute stage without spike/verilator.
+Prints a spike-style commit log, one commit per instruction line of the
+input's .text: a mnemonic line, or a .word/.half line (binary mutants), whose
+value is logged as the instruction bits.
+
+    execution:
+      iss_cmd: "python scripts/execute/stub_sim.py {input}"
+      dut_cmd: "python scripts/execute/stub_sim.py {input} --diverge-at 3 --sleep 0.2"
+"""
+
+import time
+import argparse
+from pathlib import Path
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("input", type=Path)
+    ap.add_argument("--sleep", type=float, default=0.0, help="seconds before printing")
+    ap.add_argument("--repeat", type=int, default=1, help="replay the program N times")
+    ap.add_argument("--diverge-at", type=int, default=-1, help="corrupt x1 from this commit on")
+    ap.add_argument("--hang", action="store_true", help="never exit (timeout testing)")
+    args = ap.parse_args()
+
+    instrs, in_text = [], True
+    for line in args.input.read_text().splitlines():
+        line = line.split("#", 1)[0].strip()
+        name, _, value = line.partition(" ")
+        if name in (".text", ".data", ".rodata", ".bss", ".section"):
+            in_text = (value.split(",")[0].strip() if name == ".section" else name).startswith(".text")
+        elif not in_text or not line or line.endswith(":"):
+            continue
+        elif name in (".word", ".half"):
+            instrs.append((4 if name == ".word" else 2, int(value.strip(), 0)))
+        elif not line.startswith("."):
+            instrs.append((4, 0x13))
+
+    time.sleep(args.sleep)
+    pc = 0x80000000
+    for n in range(len(instrs) * args.repeat):
+        size, bits = instrs[n % len(instrs)]
+        x1 = n if args.diverge_at < 0 or n < args.diverge_at else n + 1
+        print(f"core   0: 3 0x{pc:016x} (0x{bits:0{2 * size}x}) x1  0x{x1:016x}", flush=True)
+        pc += size
+    while args.hang:
+        time.sleep(1)
+
+if __name__ == "__main__":
+    main()
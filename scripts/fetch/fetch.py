@@ -1,6 +1,13 @@
 # scripts/fetch/fetch.py
 """
 Fetch Stage: Select and promote seeds from corpus + W$
+- seed_sources are indexed into a content-addressed SeedStore; only files
+  whose mtime/inode/size changed are re-read and hashed
+- selection is an indexed query on the store, not a scan of the corpus;
+  a seed scheduler (pipeline.scheduler, see scheduler.py) ranks the
+  candidates using W$ history
+- a seed the scheduler plans n times is queued n times (one file per plan
+  slot, <slot>_<id>.s), so the mutate stage gives it n nonces / rng streams
 Output: queue_fetch/*.s
 """
 import sys
@@ -10,22 +17,27 @@ sys.path.append(str(Path(__file__).parent.parent.parent))
 
 import yaml
 import json
+import random
+from typing import List, Optional
 from utils.models import Testcase
+from utils.lineage import derive_rng
 from utils.wcache import WeightCache
+from utils.seedstore import SeedStore
+from scripts.fetch.scheduler import build_seed_scheduler
 
 # === Paths ===
 ROOT = Path(__file__).parent.parent.parent
 CONFIG = yaml.safe_load((ROOT / "config.yaml").read_text())
 WCACHE = WeightCache(ROOT / "wcache.json", CONFIG["wcache"])
+RUN_SEED = CONFIG["pipeline"].get("run_seed", 0)
+STORE = SeedStore(ROOT / CONFIG["pipeline"].get("seed_store", "corpus/store"), rng=derive_rng(RUN_SEED, "store"))
 QUEUE_DIR = ROOT / "queue_fetch"
 QUEUE_DIR.mkdir(exist_ok=True)
 
-def fetch():
-    print("[FETCH] Starting seed selection...")
-
-    # 1. Load all seeds from sources
+def load_seeds(seed_sources: List[str]) -> List[Testcase]:
+    """Load every .S seed from the configured source directories."""
     seeds = []
-    for src_path in CONFIG["pipeline"]["seed_sources"]:
+    for src_path in seed_sources:
         src = ROOT / src_path
         print(f"[LOAD] {src}")
         if not src.exists():
@@ -39,31 +51,48 @@ def fetch():
                 print(f"  [LOAD] {tc.id} ← {f.name}")
             except Exception as e:
                 print(f"  [SKIP] {f}: {e}")
+    return seeds
 
-    if not seeds:
-        print("[ERROR] No seeds found!")
-        return
-
-    # 2. Promote from W$
-    top_k = WCACHE.top_k(CONFIG["pipeline"]["batch_size"])
-    promoted_ids = [tid for tid, _ in top_k]
+def select_seeds(seeds: List[Testcase], wcache: WeightCache, batch_size: int,
+                 rng: Optional[random.Random] = None) -> List[Testcase]:
+    """Promote the top-weighted seeds from W$, topping up with random ones."""
+    top_k = wcache.top_k(batch_size)
+    promoted_ids = {tid for tid, _ in top_k}
     promoted = [s for s in seeds if s.id in promoted_ids]
 
-    # 3. Fallback: take random if not enough
-    import random
-    if len(promoted) < CONFIG["pipeline"]["batch_size"]:
+    # Fallback: take random if not enough
+    if len(promoted) < batch_size:
         remaining = [s for s in seeds if s.id not in promoted_ids]
-        random.shuffle(remaining)
-        promoted += remaining[:CONFIG["pipeline"]["batch_size"] - len(promoted)]
+        (rng or random).shuffle(remaining)
+        promoted += remaining[:batch_size - len(promoted)]
+
+    return promoted[:batch_size]
+
+def fetch():
+    print("[FETCH] Starting seed selection...")
+
+    # 1. Index new/changed seeds from sources
+    STORE.scan(CONFIG["pipeline"]["seed_sources"], ROOT)
+    if not len(STORE):
+        print("[ERROR] No seeds found!")
+        return
 
-    selected = promoted[:CONFIG["pipeline"]["batch_size"]]
+    # 2. Promote from W$ (3. fallback to random if not enough)
+    STORE.set_weights(WCACHE.entries.items())
+    batch_size = CONFIG["pipeline"]["batch_size"]
+    sched = build_seed_scheduler(CONFIG["pipeline"].get("scheduler", "energy"), WCACHE.history,
+                                 rng=derive_rng(RUN_SEED, "fetch"))
+    plan = sched.plan(STORE.candidates(CONFIG["pipeline"].get("scheduler_pool", 8 * batch_size)),
+                      batch_size)
+    selected = {tid: STORE.get(tid) for tid in dict.fromkeys(plan)}
 
-    # 4. Save to queue
-    for tc in selected:
-        out_path = tc.save(QUEUE_DIR)
-        print(f"  [QUEUE] {tc.id} → {out_path.name}")
+    # 4. Save to queue: one file per round, a seed listed n times gets n mutation rounds
+    for slot, tid in enumerate(plan):
+        out_path = QUEUE_DIR / f"{slot:04d}_{tid}.s"
+        out_path.write_text(selected[tid].code)
+        print(f"  [QUEUE] {tid} → {out_path.name}")
 
-    print(f"[FETCH] Selected {len(selected)} seeds → queue_fetch/")
+    print(f"[FETCH] Selected {len(plan)} rounds over {len(selected)} seeds → queue_fetch/")
 
 if __name__ == "__main__":
-    fetch()
\ No newline at end of file
+    fetch()
@@ -0,0 +1,178 @@
+# scripts/fetch/scheduler.py
+"""
+Seed schedulers for the fetch stage (pipeline.scheduler)
+- topk:     top W$ weights, topped up with random seeds (the original policy)
+- weighted: sample in proportion to W$ weight, mixed with uniform
+- ucb:      UCB1 over seeds, reward = cov_gain + bug_score of their mutants
+- thompson: Beta-Bernoulli Thompson sampling, success = mutant gained
+            coverage or found a bug
+- energy:   AFL-style power schedule; a budget of mutation rounds is split
+            across seeds by speed (ISS cycles), yield and how rarely they
+            have been fuzzed
+Each policy returns seed ids with repeats: a seed listed n times gets n
+mutation rounds. Arm statistics are rebuilt from W$ history (its "parent"
+field), so no extra state is persisted.
+"""
+import math
+import random
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+@dataclass
+class ArmStats:
+    pulls: int = 0
+    hits: int = 0
+    reward: float = 0.0
+    cycles: int = 0
+
+    @property
+    def mean(self) -> float:
+        return self.reward / self.pulls if self.pulls else 0.0
+
+    @property
+    def mean_cycles(self) -> float:
+        return self.cycles / self.pulls if self.pulls else 0.0
+
+class SeedScheduler:
+    name = "base"
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        self.rng = rng or random.Random()
+        self.arms: Dict[str, ArmStats] = {}
+        self.total_pulls = 0
+
+    def observe(self, seed_id: Optional[str], h: dict):
+        """Credit one mutant's W$ history record to the seed it came from."""
+        if not seed_id:
+            return
+        arm = self.arms.setdefault(seed_id, ArmStats())
+        reward = h.get("cov_gain", 0.0) + h.get("bug_score", 0.0)
+        arm.pulls += 1
+        arm.hits += reward > 0
+        arm.reward += reward
+        arm.cycles += h.get("cycles", 0)
+        self.total_pulls += 1
+
+    def rebuild(self, history: Dict[str, dict]):
+        for h in history.values():
+            self.observe(h.get("parent"), h)
+
+    def plan(self, weights: Dict[str, float], budget: int) -> List[str]:
+        """Seed ids (with repeats) for `budget` mutation rounds, from candidates→W$ weight."""
+        raise NotImplementedError
+
+class TopKScheduler(SeedScheduler):
+    name = "topk"
+
+    def plan(self, weights, budget):
+        ranked = sorted((w, tid) for tid, w in weights.items() if w > 0)[::-1]
+        picked = [tid for _, tid in ranked[:budget]]
+        rest = [tid for tid in weights if tid not in set(picked)]
+        self.rng.shuffle(rest)
+        return picked + rest[:budget - len(picked)]
+
+class WeightedScheduler(SeedScheduler):
+    name = "weighted"
+
+    def __init__(self, rng=None, epsilon: float = 0.1):
+        super().__init__(rng)
+        self.epsilon = epsilon
+
+    def plan(self, weights, budget):
+        ids = list(weights)
+        if not ids:
+            return []
+        w = [max(weights[t], 0.0) for t in ids]
+        total = sum(w)
+        probs = [(1 - self.epsilon) * (x / total if total else 1 / len(ids)) + self.epsilon / len(ids)
+                 for x in w]
+        return self.rng.choices(ids, weights=probs, k=budget)
+
+class UCBScheduler(SeedScheduler):
+    name = "ucb"
+
+    def __init__(self, rng=None, c: float = 1.0):
+        super().__init__(rng)
+        self.c = c
+
+    def plan(self, weights, budget):
+        ids = list(weights)
+        self.rng.shuffle(ids)  # random order among untried seeds
+        pending: Dict[str, int] = {}
+        picked = []
+        for _ in range(min(budget, len(ids)) if ids else 0):
+            n_total = self.total_pulls + len(picked) + 1
+            def ucb(t):
+                arm = self.arms.get(t)
+                n = (arm.pulls if arm else 0) + pending.get(t, 0)
+                if n == 0:
+                    return math.inf
+                mean = arm.reward / n if arm else 0.0
+                return mean + self.c * math.sqrt(2 * math.log(n_total) / n)
+            best = max(ids, key=ucb)
+            pending[best] = pending.get(best, 0) + 1
+            picked.append(best)
+        return picked + self.rng.choices(picked, k=budget - len(picked)) if picked else []
+
+class ThompsonScheduler(SeedScheduler):
+    name = "thompson"
+
+    def plan(self, weights, budget):
+        ids = list(weights)
+        if not ids:
+            return []
+        picked = []
+        for _ in range(budget):
+            def draw(t):
+                arm = self.arms.get(t) or ArmStats()
+                return self.rng.betavariate(1 + arm.hits, 1 + arm.pulls - arm.hits)
+            picked.append(max(ids, key=draw))
+        return picked
+
+class EnergyScheduler(SeedScheduler):
+    """AFL-style: perf score × rarity, budget split by largest remainder."""
+    name = "energy"
+
+    def __init__(self, rng=None, max_energy: int = 4, top: Optional[int] = None):
+        super().__init__(rng)
+        self.max_energy = max_energy
+        self.top = top
+
+    def perf_score(self, tc_id: str, weight: float, mean_cycles: float) -> float:
+        arm = self.arms.get(tc_id)
+        if arm is None or arm.pulls == 0:
+            return 2.0 * (1.0 + weight)  # new seeds get a head start
+        score = 1.0 + weight + 2.0 * arm.hits / arm.pulls
+        if mean_cycles and arm.mean_cycles:  # faster than average → more energy (AFL: 0.25x..3x)
+            score *= min(3.0, max(0.25, mean_cycles / arm.mean_cycles))
+        return score / math.sqrt(1 + arm.pulls)  # fuzzing level decay (AFLFast-ish)
+
+    def plan(self, weights, budget):
+        if not weights:
+            return []
+        cyc = [a.mean_cycles for a in self.arms.values() if a.pulls]
+        mean_cycles = sum(cyc) / len(cyc) if cyc else 0.0
+        scores = {t: self.perf_score(t, max(w, 0.0), mean_cycles) for t, w in weights.items()}
+        ranked = sorted(scores, key=lambda t: (-scores[t], self.rng.random()))
+        ranked = ranked[:self.top or budget]
+        total = sum(scores[t] for t in ranked)
+        shares = {t: budget * scores[t] / total for t in ranked}
+        energy = {t: min(int(s), self.max_energy) for t, s in shares.items()}
+        for t in sorted(ranked, key=lambda t: energy[t] - shares[t]):  # largest remainder
+            if sum(energy.values()) >= budget:
+                break
+            if energy[t] < self.max_energy:
+                energy[t] += 1
+        return [t for t in ranked for _ in range(energy[t])]
+
+SCHEDULERS = {cls.name: cls for cls in
+              (TopKScheduler, WeightedScheduler, UCBScheduler, ThompsonScheduler, EnergyScheduler)}
+
+def build_seed_scheduler(name: str, history: Optional[Dict[str, dict]] = None,
+                         rng: Optional[random.Random] = None, **kwargs) -> SeedScheduler:
+    if name not in SCHEDULERS:
+        raise ValueError(f"unknown scheduler {name!r} (choose from {', '.join(SCHEDULERS)})")
+    sched = SCHEDULERS[name](rng=rng, **kwargs)
+    if history:
+        sched.rebuild(history)
+    return sched
@@ -0,0 +1,249 @@
+# scripts/lifu_pp.py
+"""
+LiFU Pipeline: resident driver for fetch → mutate → execute → analyse → update
+- config.yaml and W$ are loaded once for the whole run
+- Stages are asyncio tasks connected by bounded in-memory queues (maxsize = batch_size)
+- Seeds come from a content-addressed SeedStore (corpus/store): source dirs
+  are rescanned by mtime/inode and selection is an indexed query
+- A seed scheduler (pipeline.scheduler) turns a candidate pool into
+  batch_size mutation rounds; it is credited with every analysed mutant
+- The mutate stage takes a whole fetch batch at once: local mutators run in
+  worker threads while the batch's LLM requests share one AsyncLLM client
+- Each iteration pushes batch_size seeds followed by an IterEnd marker;
+  the update stage promotes when the marker reaches it
+- In directed mode the LLM prompt names uncovered points; the update stage
+  credits the mutator with the targets its mutants hit
+- Fetch and mutation RNGs derive from pipeline.run_seed; each mutant's
+  lineage (parent, mutator, rng key, ops) goes to the lineage index so
+  scripts/mutate/replay.py can rebuild it
+- An operator scheduler (mutators.schedule) is credited with the same W$
+  records per mutator / binary operator and decides what runs next
+- The analyse stage derives per-test coverage from the ISS traces on a
+  process pool and writes each iteration's coverage and W$ updates as one
+  batch (scripts/analyse/analyse.py); mismatching tests are bucketed by
+  signature and only new buckets get an LLM property (scripts/analyse/triage.py)
+- W$ updates are buffered and flushed once per iteration
+- the update stage also runs incremental corpus minimisation (cmin) over the
+  per-test coverage bitmaps
+- queue_fetch/ and queue_mutate/ are only written as a checkpoint/debug
+  mirror when pipeline.checkpoint_queues is set
+"""
+
+import sys
+import asyncio
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+# === Add project root ===
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import yaml
+from utils.models import Testcase
+from utils.wcache import WeightCache
+from utils.seedstore import SeedStore
+from utils.lineage import LineageIndex, derive_rng
+from scripts.fetch.scheduler import build_seed_scheduler
+from scripts.mutate.scheduler import build_operator_scheduler
+from scripts.mutate.mutate import (build_mutators, amutate_seed, drop_near_duplicates, report, credit,
+                                  record_lineage)
+from scripts.execute.execute import execute_testcase, build_scheduler
+from scripts.execute.filter import shared_filter
+from scripts.execute.checker import DifferentialChecker
+from scripts.execute.gate import IssGate
+from scripts.analyse.analyse import build_analyser
+from scripts.analyse.property_generator import PropertyGenerator
+from scripts.analyse.coverage_fusion import CoverageFusion
+from scripts.update.update import promote, RUNTIME_CORPUS
+from scripts.update.cmin import build_minimizer
+
+# === Paths ===
+CONFIG = yaml.safe_load((PROJECT_ROOT / "config.yaml").read_text())
+WCACHE = WeightCache(PROJECT_ROOT / "wcache.json", CONFIG["wcache"])
+COVERAGE = CoverageFusion(PROJECT_ROOT / CONFIG["coverage"]["bitmap"])
+RUN_SEED = CONFIG["pipeline"].get("run_seed", 0)
+STORE = SeedStore(PROJECT_ROOT / CONFIG["pipeline"].get("seed_store", "corpus/store"),
+                  rng=derive_rng(RUN_SEED, "store"))
+LINEAGE = LineageIndex(PROJECT_ROOT / CONFIG["pipeline"].get("lineage", "corpus/lineage.sqlite"))
+FETCH_MIRROR = PROJECT_ROOT / "queue_fetch"
+MUTATE_MIRROR = PROJECT_ROOT / "queue_mutate"
+
+@dataclass
+class IterEnd:
+    """Marker flowing behind the last seed of an iteration."""
+    iteration: int
+
+STOP = None  # end of run
+
+class Pipeline:
+    def __init__(self, config: dict, wcache: WeightCache, coverage: CoverageFusion,
+                 store: SeedStore, lineage: LineageIndex):
+        self.config = config
+        self.wcache = wcache
+        self.coverage = coverage
+        self.store = store  # seed pool: initial seeds + everything promoted so far
+        self.lineage = lineage
+        pipeline_cfg = config["pipeline"]
+        self.batch_size = pipeline_cfg["batch_size"]
+        self.max_iters = pipeline_cfg["max_iters"]
+        self.checkpoint = pipeline_cfg.get("checkpoint_queues", False)
+        self.run_seed = pipeline_cfg.get("run_seed", 0)
+        self.seed_sched = build_seed_scheduler(pipeline_cfg.get("scheduler", "energy"), wcache.history,
+                                               rng=derive_rng(self.run_seed, "fetch"))
+        self.sched_pool = pipeline_cfg.get("scheduler_pool", 8 * self.batch_size)
+        self.mutators = build_mutators(wcache.novelty, coverage)
+        self.op_sched = build_operator_scheduler(config, PROJECT_ROOT)
+        if self.op_sched is not None:
+            self.op_sched.register_mutators(self.mutators)
+
+        self.q_fetch: asyncio.Queue = asyncio.Queue(maxsize=self.batch_size)
+        self.q_mutate: asyncio.Queue = asyncio.Queue(maxsize=self.batch_size)
+        self.q_execute: asyncio.Queue = asyncio.Queue(maxsize=self.batch_size)
+        self.q_analyse: asyncio.Queue = asyncio.Queue(maxsize=self.batch_size)
+
+    def _mirror(self, tc: Testcase, out_dir: Path):
+        if self.checkpoint:
+            out_dir.mkdir(exist_ok=True)
+            tc.save(out_dir)
+
+    # === Stages ===
+    async def _fetch_stage(self):
+        sources = self.config["pipeline"]["seed_sources"]
+        self.store.scan(sources, PROJECT_ROOT)
+        if not len(self.store):
+            print("[ERROR] No seeds found!")
+            await self.q_fetch.put(STOP)
+            return
+
+        for it in range(self.max_iters):
+            self.store.scan(sources, PROJECT_ROOT)  # one stat per seed file when idle
+            plan = self.seed_sched.plan(self.store.candidates(self.sched_pool), self.batch_size)
+            selected = {tid: self.store.get(tid) for tid in dict.fromkeys(plan)}
+            print(f"[FETCH] iter {it}: {len(plan)} rounds over {len(selected)} seeds "
+                  f"({self.seed_sched.name})")
+            for tid in plan:  # a seed listed n times gets n mutation rounds
+                tc = selected[tid]
+                self._mirror(tc, FETCH_MIRROR)
+                await self.q_fetch.put(tc)
+            await self.q_fetch.put(IterEnd(it))
+        await self.q_fetch.put(STOP)
+
+    async def _mutate_stage(self):
+        mutators = self.mutators
+        dup_threshold = self.config["wcache"].get("dup_threshold", 0.9)
+
+        async def mutate_one(seed: Testcase, nonce: str):
+            # Local mutators run in a worker thread; LLM requests of the whole batch overlap
+            mutants = await amutate_seed(seed, mutators, nonce, self.run_seed, self.op_sched)
+            mutants = drop_near_duplicates(mutants, self.wcache.novelty, dup_threshold)
+            record_lineage(self.lineage, mutants, mutators)
+            for m in mutants:
+                self._mirror(m, MUTATE_MIRROR)
+                await self.q_mutate.put(m)
+
+        in_flight, it = [], 0
+        while (item := await self.q_fetch.get()) is not STOP:
+            if isinstance(item, IterEnd):
+                await asyncio.gather(*in_flight)  # the marker stays behind its batch
+                in_flight.clear()
+                it = item.iteration + 1
+                self.lineage.flush()
+                report(mutators)
+                await self.q_mutate.put(item)
+                continue
+            # nonce = (iteration, slot in the plan): a seed planned twice gets two streams
+            nonce = f"{it}.{len(in_flight)}"
+            in_flight.append(asyncio.create_task(mutate_one(item, nonce)))
+        await asyncio.gather(*in_flight)
+        await self.q_mutate.put(STOP)
+
+    async def _execute_stage(self):
+        filter = shared_filter()  # verdicts shared with the mutators
+        checker = DifferentialChecker(**self.config["execution"].get("checker", {}))
+        gate = IssGate(self.config["execution"].get("gate", {}))
+        scheduler = build_scheduler(lambda tc, workdir: execute_testcase(tc, filter, checker, workdir, gate))
+
+        async def on_done(tc: Testcase, result: Optional[dict]):
+            if result is not None:
+                await self.q_execute.put((tc, result))
+
+        while (item := await self.q_mutate.get()) is not STOP:
+            if isinstance(item, IterEnd):
+                # Everything of this iteration must be analysed before update runs
+                await scheduler.drain()
+                print(f"[EXECUTE] iter {item.iteration}: {scheduler.report()}; {gate.report()}; {filter.report()}")
+                await self.q_execute.put(item)
+                continue
+            print(f"  [TESTCASE] {item.id[:8]}... ({item.source})")
+            await scheduler.submit(item, on_done)
+        await scheduler.drain()
+        await self.q_execute.put(STOP)
+
+    async def _analyse_stage(self):
+        with build_analyser(self.config, self.wcache, self.coverage, PropertyGenerator()) as analyser:
+            while (item := await self.q_execute.get()) is not STOP:
+                if isinstance(item, IterEnd):
+                    # W$ must hold the whole iteration before the marker reaches update
+                    await analyser.commit()
+                    print(f"[ANALYSE] iter {item.iteration}: {analyser.report()}")
+                else:
+                    tc, result = item
+                    analyser.submit(tc, result["iss"]["log"], result["mismatches"])
+                await self.q_analyse.put(item)
+            await analyser.commit()
+        await self.q_analyse.put(STOP)
+
+    async def _update_stage(self):
+        threshold = self.config["wcache"]["promote_threshold"]
+        cmin = build_minimizer(self.config, self.wcache, self.coverage) \
+            if self.config.get("cmin", {}).get("enabled", True) else None
+        candidates: Dict[str, Testcase] = {}
+        while (item := await self.q_analyse.get()) is not STOP:
+            if isinstance(item, IterEnd):
+                self.wcache.flush()  # one fsync per iteration
+                self.coverage.flush()
+                credit(self.mutators, self.coverage, self.wcache.history)  # directed targets hit
+                self.store.set_weights((t, self.wcache.entries[t]) for t in candidates
+                                       if t in self.wcache.entries)
+                for t, tc in candidates.items():
+                    if t in self.wcache.history:
+                        self.seed_sched.observe(tc.metadata.get("parent"), self.wcache.history[t])
+                        if self.op_sched is not None:
+                            self.op_sched.observe(tc.metadata, self.wcache.history[t])
+                if self.op_sched is not None:
+                    self.op_sched.update()
+                    print(f"[MOPT] {self.op_sched.report()}")
+                promoted = promote(candidates, self.wcache, threshold)
+                for tc in promoted:
+                    self.store.add(tc, weight=self.wcache.entries[tc.id])
+                if cmin is not None:
+                    before = set(cmin.kept) | candidates.keys()
+                    kept = cmin.minimize(candidates)
+                    self.store.drop(t for t in before - kept if t in self.coverage.tests)
+                    cmin.prune(RUNTIME_CORPUS)
+                print(f"[UPDATE] iter {item.iteration}: {len(promoted)} seeds promoted "
+                      f"(pool={len(self.store)})")
+                candidates.clear()
+                continue
+            tc, _ = item
+            candidates[tc.id] = tc
+
+    async def run(self):
+        with self.wcache, self.coverage, self.lineage:  # W$/coverage updates are flushed per iteration
+            await asyncio.gather(
+                self._fetch_stage(),
+                self._mutate_stage(),
+                self._execute_stage(),
+                self._analyse_stage(),
+                self._update_stage(),
+            )
+
+async def main(max_iters: Optional[int] = None):
+    if max_iters is not None:
+        CONFIG["pipeline"]["max_iters"] = max_iters
+    await Pipeline(CONFIG, WCACHE, COVERAGE, STORE, LINEAGE).run()
+    print("[LIFU] Done")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,24 +1,150 @@
 # scripts/mutate/mutate.py
 """
 Mutate Stage: Apply hybrid mutators to seeds from queue_fetch/
+- every mutator call gets its own rng, derived from pipeline.run_seed and
+  "<parent id>/<nonce>/<mutator>"; mutants carry parent, parent_hash,
+  mutator, run_seed, rng and ops in their metadata (see utils/lineage.py)
+- with an OperatorScheduler (mutators.schedule, scheduler.py) a mutator
+  only runs on a seed with its learned probability, and BinaryMutator draws
+  its operators with the learned weights
 Output: queue_mutate/*.s
 """
 
 import sys
+import yaml
+import asyncio
 from pathlib import Path
+from typing import Optional
 
 # === Add project root ===
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
 from utils.models import Testcase
+from utils.novelty import NoveltyIndex
+from utils.lineage import LineageIndex, derive_rng, code_hash
+from scripts.mutate.scheduler import OperatorScheduler
 from scripts.mutate.mutator.binary import BinaryMutator
 from scripts.mutate.mutator.gen import LLMMutator
+from scripts.mutate.mutator.directed import DirectedLLMMutator
+from scripts.analyse.coverage_fusion import CoverageFusion
 
 # === Paths ===
+CONFIG = yaml.safe_load((PROJECT_ROOT / "config.yaml").read_text())
 IN_DIR = PROJECT_ROOT / "queue_fetch"
 OUT_DIR = PROJECT_ROOT / "queue_mutate"
 OUT_DIR.mkdir(exist_ok=True)
+RUN_SEED = CONFIG["pipeline"].get("run_seed", 0)
+
+def build_mutators(novelty: Optional[NoveltyIndex] = None, coverage: Optional[CoverageFusion] = None) -> list:
+    llm = dict(candidates=CONFIG["llm"].get("candidates", 4), novelty=novelty,
+               dup_threshold=CONFIG["wcache"].get("dup_threshold", 0.9))
+    if CONFIG["mutators"].get("directed") and coverage is not None:
+        directed = CONFIG["llm"].get("directed", {})
+        llm_mutator = DirectedLLMMutator(coverage, budget_tokens=directed.get("budget_tokens", 256),
+                                         per_group=directed.get("per_group", 8), **llm)
+    else:
+        llm_mutator = LLMMutator(**llm)
+    return [BinaryMutator(mutations_per_seed=3), llm_mutator]
+
+def report(mutators: list):
+    for mutator in mutators:
+        if hasattr(mutator, "report"):
+            print(f"    {mutator.report()}")
+
+def credit(mutators: list, coverage: CoverageFusion, history: dict):
+    """Feed analysed coverage back to mutators that track their targets (directed mode)."""
+    for mutator in mutators:
+        if hasattr(mutator, "credit"):
+            mutator.credit(coverage, history)
+
+def is_async(mutator) -> bool:
+    """Mutators with an async path (the LLM) are fanned out over a whole batch."""
+    return hasattr(mutator, "amutate")
+
+def mutator_name(mutator) -> str:
+    return getattr(mutator, "name", type(mutator).__name__)
+
+def rng_key(seed: Testcase, nonce: str, mutator) -> str:
+    """A seed planned n times in one run gets n distinct nonces, hence n streams."""
+    return f"{seed.id}/{nonce}/{mutator_name(mutator)}"
+
+def stamp(mutant: Testcase, seed: Testcase, mutator, key: str, run_seed: int = RUN_SEED):
+    """Lineage metadata: what the mutant came from and how to make it again."""
+    md = mutant.metadata
+    md.setdefault("parent", seed.id)  # also the seed store's parent column
+    md["parent_hash"] = code_hash(seed.code)
+    md["mutator"] = mutator_name(mutator)
+    md["run_seed"] = run_seed
+    md["rng"] = key
+    md.setdefault("ops", [])
+
+def scheduled(seed: Testcase, mutators: list, nonce: str, run_seed: int,
+              schedule: Optional[OperatorScheduler]) -> list:
+    """The mutators that run on this seed round (all of them without a scheduler).
+    Each decision has its own stream, so filtering twice gives the same answer."""
+    if schedule is None:
+        return mutators
+    return [m for m in mutators
+            if schedule.runs(mutator_name(m), derive_rng(run_seed, rng_key(seed, nonce, m) + "/run"))]
+
+def call_kwargs(mutator, key: str, run_seed: int, schedule: Optional[OperatorScheduler]) -> dict:
+    kwargs = {"rng": derive_rng(run_seed, key)}
+    weights = schedule.weights(mutator_name(mutator)) if schedule is not None else None
+    if weights and getattr(mutator, "operators", None):
+        kwargs["weights"] = dict(weights)  # a snapshot: update() may replace them mid-batch
+    return kwargs
+
+def mutate_seed(seed: Testcase, mutators: list, nonce: str = "0", run_seed: int = RUN_SEED,
+                schedule: Optional[OperatorScheduler] = None) -> list[Testcase]:
+    """Run every (scheduled) mutator on one seed; a failing mutator does not stop the others."""
+    mutants = []
+    for mutator in scheduled(seed, mutators, nonce, run_seed, schedule):
+        key = rng_key(seed, nonce, mutator)
+        try:
+            for m in mutator.mutate(seed, **call_kwargs(mutator, key, run_seed, schedule)):
+                stamp(m, seed, mutator, key, run_seed)
+                mutants.append(m)
+        except Exception as e:
+            print(f"    [ERROR] {mutator.__class__.__name__}: {e}")
+    return mutants
+
+async def amutate_seed(seed: Testcase, mutators: list, nonce: str = "0", run_seed: int = RUN_SEED,
+                       schedule: Optional[OperatorScheduler] = None) -> list[Testcase]:
+    """mutate_seed() with local mutators in a worker thread and async ones awaited concurrently."""
+    async def run_async(mutator):
+        key = rng_key(seed, nonce, mutator)
+        try:
+            mutants = await mutator.amutate(seed, **call_kwargs(mutator, key, run_seed, schedule))
+        except Exception as e:
+            print(f"    [ERROR] {mutator.__class__.__name__}: {e}")
+            return []
+        for m in mutants:
+            stamp(m, seed, mutator, key, run_seed)
+        return mutants
+    mutators = scheduled(seed, mutators, nonce, run_seed, schedule)
+    local = [m for m in mutators if not is_async(m)]
+    results = await asyncio.gather(asyncio.to_thread(mutate_seed, seed, local, nonce, run_seed, schedule),
+                                   *(run_async(m) for m in mutators if is_async(m)))
+    return [m for r in results for m in r]
+
+def record_lineage(lineage: Optional[LineageIndex], mutants: list[Testcase], mutators: list):
+    """Index mutants; code is kept only for mutators that cannot be re-run from their rng."""
+    if lineage is None:
+        return
+    replayable = {mutator_name(m) for m in mutators if getattr(m, "replayable", False)}
+    for m in mutants:
+        lineage.record(m, keep_code=m.metadata.get("mutator") not in replayable)
+
+def drop_near_duplicates(mutants: list[Testcase], novelty: Optional[NoveltyIndex],
+                         threshold: float) -> list[Testcase]:
+    """Discard mutants whose MinHash similarity to a scored testcase reaches `threshold`."""
+    if novelty is None:
+        return mutants
+    kept = [m for m in mutants if not novelty.is_duplicate(m.code, threshold)]
+    if len(kept) < len(mutants):
+        print(f"    [DEDUP] {len(mutants) - len(kept)} near-duplicate mutants dropped")
+    return kept
 
 def mutate():
     print(f"[MUTATE] Reading from: {IN_DIR}")
@@ -26,27 +152,31 @@ def mutate():
         print("[ERROR] No seeds in queue_fetch!")
         return
 
-    mutators = [
-        BinaryMutator(mutations_per_seed=3),
-        LLMMutator(),
-    ]
+    novelty = NoveltyIndex(PROJECT_ROOT / "wcache.novelty")
+    lineage = LineageIndex(PROJECT_ROOT / CONFIG["pipeline"].get("lineage", "corpus/lineage.sqlite"))
+    mutators = build_mutators(novelty)
+    dup_threshold = CONFIG["wcache"].get("dup_threshold", 0.9)
+
+    seeds = [Testcase.from_file(f) for f in sorted(IN_DIR.glob("*.s"))]  # stable nonces
+
+    async def fan_out():  # every seed's LLM request is in flight at once
+        return await asyncio.gather(*(amutate_seed(seed, mutators, nonce=f"q.{i}")
+                                      for i, seed in enumerate(seeds)))
 
     all_mutants = []
-    for seed_file in IN_DIR.glob("*.s"):
-        seed = Testcase.from_file(seed_file)
+    for seed, mutants in zip(seeds, asyncio.run(fan_out())):
         print(f"  [SEED] {seed.id[:8]}... ({seed.source})")
 
-        for mutator in mutators:
-            try:
-                mutants = mutator.mutate(seed)
-                for m in mutants:
-                    out_path = m.save(OUT_DIR)
-                    print(f"    [MUTANT] {m.id[:8]}... → {out_path.name} ({m.source})")
-                all_mutants.extend(mutants)
-            except Exception as e:
-                print(f"    [ERROR] {mutator.__class__.__name__}: {e}")
+        mutants = drop_near_duplicates(mutants, novelty, dup_threshold)
+        record_lineage(lineage, mutants, mutators)
+        for m in mutants:
+            out_path = m.save(OUT_DIR)
+            print(f"    [MUTANT] {m.id[:8]}... → {out_path.name} ({m.source})")
+        all_mutants.extend(mutants)
 
+    lineage.close()
     print(f"[MUTATE] Generated {len(all_mutants)} mutants → queue_mutate/")
+    report(mutators)
 
 if __name__ == "__main__":
     mutate()
\ No newline at end of file
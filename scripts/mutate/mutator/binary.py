@@ -63,183 +63,355 @@
 #             temp_bin.unlink(missing_ok=True)
             
 #         return mutants
-# scripts/mutate/mutate.py
-import asyncio
+"""
+Binary mutator: mutates assembled .text words, not the assembly text
+- Seeds are assembled once in-process (utils.rvisa; the toolchain only for
+  sources outside its subset) and cached; seeds already in .word/.half
+  form (earlier mutants) are parsed directly
+- 16-bit RVC and 32-bit instructions are split by their low two bits and
+  mutated with format-aware field handling (R/I/S/B/U/J/R4, CR/CI/CSS/CIW/
+  CL/CS/CA/CB/CJ); opcode/funct mutations stay inside legal encodings of the
+  same format, branch/jump offsets land on instruction boundaries
+- Mutants are emitted as a .word/.half .S with the seed's _start entry;
+  the seed's non-.text sections (.data, .rodata, .tohost, ...) are copied
+  after the words verbatim, .text labels other than _start are not kept
+- The operator (opcode / immediate / register, c.* for RVC) is drawn with
+  the weights passed to mutate() (scripts/mutate/scheduler.py), uniform
+  by default
+- All choices come from the rng passed to mutate() (utils.lineage derives
+  it from the run seed and the parent), so a mutant can be rebuilt
+  bit-exactly; metadata["ops"] lists [operator, index, size, old, new]
+  per mutant and apply() replays those ops without the rng
+"""
 import random
 import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
 from pathlib import Path
+from typing import List, Optional, Tuple
 from utils.models import Testcase
-from scripts.execute.filter import LightweightFilter
+from utils import rvisa
+from utils.asm_util import assemble
+from utils.rvisa import split_words
+from scripts.execute.filter import shared_filter
 
-# RISC-V 32-bit instruction masks (simplified for RV64GC)
-INSTR_MASK = 0xFFFFFFFF  # 32-bit instructions
+# RISC-V 32-bit instruction fields
+INSTR_MASK = 0xFFFFFFFF
 OPCODE_MASK = 0x7F       # Bits 0-6
-FUNCT3_MASK = 0x700      # Bits 12-14 (shift 12)
-FUNCT7_MASK = 0xFE000000 # Bits 25-31 (shift 25)
-RS1_MASK = 0xF80         # Bits 15-19 (shift 15)
-RS2_MASK = 0x1F000       # Bits 20-24 (shift 20)
-RD_MASK = 0xF800         # Bits 7-11 (shift 7)
+RD_MASK = 0xF80          # Bits 7-11
+FUNCT3_MASK = 0x7000     # Bits 12-14
+RS1_MASK = 0xF8000       # Bits 15-19
+RS2_MASK = 0x1F00000     # Bits 20-24
+FUNCT7_MASK = 0xFE000000 # Bits 25-31
+RS3_MASK = 0xF8000000    # Bits 27-31 (R4)
 
 # Termination instructions (preserve these to avoid infinite loops)
-TERMINATION_INSTR = {0x00100073}  # ebreak (32-bit encoding)
+TERMINATION_INSTR = {0x00100073, 0x00000073}  # ebreak, ecall
+C_EBREAK = 0x9002
+
+# Major opcode → format, legal funct3 values, and same-format siblings
+FORMATS = {
+    0x33: "R", 0x3B: "R", 0x53: "R", 0x2F: "R",
+    0x13: "I", 0x1B: "I", 0x03: "I", 0x07: "I", 0x67: "I", 0x0F: "I", 0x73: "I",
+    0x23: "S", 0x27: "S",
+    0x63: "B",
+    0x37: "U", 0x17: "U",
+    0x6F: "J",
+    0x43: "R4", 0x47: "R4", 0x4B: "R4", 0x4F: "R4",
+}
+FUNCT3 = {
+    0x03: (0, 1, 2, 3, 4, 5, 6), 0x23: (0, 1, 2, 3), 0x07: (2, 3), 0x27: (2, 3),
+    0x63: (0, 1, 4, 5, 6, 7), 0x1B: (0, 1, 5), 0x3B: (0, 1, 5), 0x67: (0,),
+    0x2F: (2, 3), 0x0F: (0, 1),
+}
+FUNCT7 = {0x33: (0x00, 0x20, 0x01), 0x3B: (0x00, 0x20, 0x01)}
+SIBLINGS = [(0x33, 0x3B), (0x13, 0x1B), (0x03,), (0x23,), (0x07,), (0x27,), (0x37, 0x17),
+            (0x43, 0x47, 0x4B, 0x4F)]
+WRITES_RD = {"R", "I", "U", "J", "R4"}
+
+# RVC: (quadrant, funct3) → format; same-format funct3 swaps
+C_FORMATS = {
+    (0, 0): "CIW", (0, 1): "CL", (0, 2): "CL", (0, 3): "CL", (0, 5): "CS", (0, 6): "CS", (0, 7): "CS",
+    (1, 0): "CI", (1, 1): "CI", (1, 2): "CI", (1, 3): "CI", (1, 4): "CA", (1, 5): "CJ",
+    (1, 6): "CB", (1, 7): "CB",
+    (2, 0): "CI", (2, 1): "CI", (2, 2): "CI", (2, 3): "CI", (2, 4): "CR", (2, 5): "CSS",
+    (2, 6): "CSS", (2, 7): "CSS",
+}
+C_SIBLINGS = {(0, 2): 3, (0, 3): 2, (0, 6): 7, (0, 7): 6, (1, 0): 1, (1, 1): 0,
+              (2, 2): 3, (2, 3): 2, (2, 6): 7, (2, 7): 6, (1, 6): 7, (1, 7): 6}
+C_SIGNED_IMM = {(1, 0), (1, 1), (1, 2)}  # c.addi / c.addiw / c.li: imm[5|4:0] at 12|6:2
+
+def _sext(value: int, bits: int) -> int:
+    return value - (1 << bits) if value >> (bits - 1) & 1 else value
+
+DATA_SECTIONS = (".data", ".rodata", ".bss", ".sdata", ".sbss")
+
+def split_sections(code: str) -> Tuple[List[str], str]:
+    """(.text lines, the other sections' source with their section directives)."""
+    text, data, in_text = [], [], True
+    for raw in code.splitlines():
+        toks = raw.split("#", 1)[0].split()
+        if toks and (toks[0] in DATA_SECTIONS or toks[0] in (".text", ".section")):
+            name = toks[1].split(",")[0] if toks[0] == ".section" and len(toks) > 1 else toks[0]
+            in_text = name.startswith(".text")
+        (text if in_text else data).append(raw)
+    return text, "\n".join(data) + "\n" if data else ""
+
+def parse_words(code: str) -> Optional[List[Tuple[int, int]]]:
+    """Words of a .word/.half-only program (an earlier mutant), else None."""
+    out = []
+    for line in split_sections(code)[0]:
+        line = line.split("#", 1)[0].strip()
+        if not line or line.endswith(":") or line.startswith((".global", ".globl", ".text", ".option")):
+            continue
+        directive, _, value = line.partition(" ")
+        if directive not in (".word", ".half"):
+            return None
+        out.append((4 if directive == ".word" else 2, int(value.strip(), 0)))
+    return out or None
+
+def emit(words: List[Tuple[int, int]], data: str = "") -> str:
+    body = "\n".join(f"    .word 0x{w:08x}" if size == 4 else f"    .half 0x{w:04x}"
+                     for size, w in words)
+    return f".global _start\n_start:\n{body}\n{data}"
+
+def is_legal(size: int, word: int) -> bool:
+    """Full decode against the RV64GC tables (reserved encodings and bad rm rejected)."""
+    return (size == 4) == (word & 0x3 == 0x3) and rvisa.legal(word)
 
 class BinaryMutator:
-    def __init__(self, mutations_per_seed: int = 3):
-        self.n = mutations_per_seed
-        self.filter = LightweightFilter()
-        self.registers = [f"x{i}" for i in range(32)]  # x0-x31
+    name = "binary"
+    replayable = True  # rebuilt from (parent, rng key, weights) or apply(ops)
+    operators = ("opcode", "immediate", "register", "c.opcode", "c.immediate", "c.register")
 
-    def _instr_to_bytes(self, instr: int) -> bytes:
-        """Convert 32-bit instruction to little-endian bytes"""
-        return instr.to_bytes(4, byteorder='little')
+    def __init__(self, mutations_per_seed: int = 3, max_tries: int = 8, cache_size: int = 1024):
+        self.n = mutations_per_seed
+        self.max_tries = max_tries
+        self.filter = shared_filter()
+        self._words: "OrderedDict[str, List[Tuple[int, int]]]" = OrderedDict()
+        self._cache_size = cache_size
+        self._offsets: List[int] = []
+        self.rng = self._unseeded = random.Random()
+        self.weights: Optional[dict] = None
+        self._op = ""
+        self._lock = threading.Lock()  # mutate() runs in worker threads; helpers share state
 
-    def _bytes_to_instr(self, b: bytes) -> int:
-        """Convert 4-byte little-endian to 32-bit instruction"""
-        return int.from_bytes(b, byteorder='little') & INSTR_MASK
+    # === Seed → words ===
+    def text_words(self, tc: Testcase) -> List[Tuple[int, int]]:
+        words = self._words.get(tc.id)
+        if words is not None:
+            self._words.move_to_end(tc.id)
+            return words
+        words = parse_words(tc.code)
+        if words is None:
+            try:
+                words = rvisa.assemble("\n".join(split_sections(tc.code)[0]))
+            except rvisa.AsmError:
+                words = None
+        if words is None:  # outside the in-process subset: the toolchain
+            with tempfile.TemporaryDirectory(prefix="lifu_bin_") as tmp:
+                asm, binary = Path(tmp) / "seed.S", Path(tmp) / "seed.bin"
+                asm.write_text(tc.code)
+                words = split_words(binary.read_bytes()) if assemble(asm, binary, text_only=True) else []
+        self._words[tc.id] = words
+        if len(self._words) > self._cache_size:
+            self._words.popitem(last=False)
+        return words
 
+    # === 32-bit field mutations ===
     def _mutate_opcode(self, instr: int) -> int:
-        """Mutate opcode/funct3/funct7 to related instructions"""
+        """Swap to a same-format opcode or another legal funct3/funct7"""
         if instr in TERMINATION_INSTR:
-            return instr  # Preserve termination
-        
+            return instr
         opcode = instr & OPCODE_MASK
-        funct3 = (instr & FUNCT3_MASK) >> 12
-        funct7 = (instr & FUNCT7_MASK) >> 25
-
-        # Flip 1-2 bits in opcode (keep within valid ranges)
-        for _ in range(random.randint(1, 2)):
-            bit = random.randint(0, 6)  # Opcode is 7 bits
-            opcode ^= (1 << bit)
-        
-        # Flip 1 bit in funct3 if present (for ALU instructions)
-        if funct3 != 0:
-            bit = random.randint(0, 2)
-            funct3 ^= (1 << bit)
-        
-        # Flip 1 bit in funct7 if present (for R-type)
-        if funct7 != 0:
-            bit = random.randint(0, 6)
-            funct7 ^= (1 << bit)
-        
-        # Reassemble instruction
-        new_instr = instr & ~(OPCODE_MASK | FUNCT3_MASK | FUNCT7_MASK)
-        new_instr |= opcode
-        new_instr |= (funct3 << 12)
-        new_instr |= (funct7 << 25)
-        return new_instr
+        choices = []
+        sibs = next((s for s in SIBLINGS if opcode in s), ())
+        if len(sibs) > 1:
+            choices.append("opcode")
+        if FORMATS.get(opcode) in ("R", "I", "S", "B") and opcode not in (0x73, 0x67):
+            choices.append("funct3")
+        if opcode in FUNCT7:
+            choices.append("funct7")
+        if not choices:
+            return instr
+        what = self.rng.choice(choices)
+        if what == "opcode":
+            new_op = self.rng.choice([s for s in sibs if s != opcode])
+            instr = (instr & ~OPCODE_MASK) | new_op
+            opcode = new_op
+            legal = FUNCT3.get(opcode)
+            if legal and (instr >> 12 & 0x7) not in legal:
+                instr = (instr & ~FUNCT3_MASK) | (self.rng.choice(legal) << 12)
+        elif what == "funct3":
+            instr = (instr & ~FUNCT3_MASK) | (self.rng.choice(FUNCT3.get(opcode, range(8))) << 12)
+            if opcode in (0x13, 0x1B) and (instr >> 12 & 0x3) == 1:  # shifts: keep imm[11:6] legal
+                top = self.rng.choice((0x00, 0x10)) if instr >> 12 & 0x4 else 0x00  # srai vs slli/srli
+                instr = (instr & ~(0x3F << 26)) | (top << 26)
+        else:
+            instr = (instr & ~FUNCT7_MASK) | (self.rng.choice(FUNCT7[opcode]) << 25)
+        return instr & INSTR_MASK
 
     def _mutate_immediate(self, instr: int) -> int:
-        """Mutate immediate fields (scale/shift instead of random flip)"""
+        """Scale/nudge/saturate the immediate; branch and jump targets stay on instruction boundaries"""
         opcode = instr & OPCODE_MASK
-        new_instr = instr
-
-        # I-type (imm[11:0]): bits 20-31
-        if opcode in (0x13, 0x03, 0x67):  # addi, lw, jalr
-            imm = (instr >> 20) & 0xFFF
-            imm = max(-2048, min(2047, imm * random.choice([-2, -1, 1, 2])))  # Scale
-            new_instr = (new_instr & 0xFFFFF) | ((imm & 0xFFF) << 20)
-        
-        # S-type (imm[11:5] + imm[4:0]): bits 25-31 and 7-11
-        elif opcode in (0x23,):  # sw
-            imm_high = (instr >> 25) & 0x7F
-            imm_low = (instr >> 7) & 0x1F
-            imm = (imm_high << 5) | imm_low
-            imm = max(-2048, min(2047, imm * random.choice([-2, -1, 1, 2])))
-            new_instr = (new_instr & 0x1F80F) | (((imm >> 5) & 0x7F) << 25) | (((imm & 0x1F) << 7))
-        
-        # B-type (imm[12,10:5,4:1,11]): sign-extended branch offset
-        elif opcode in (0x63,):  # beq, bne, etc.
-            imm = ((instr >> 12) & 0x1) << 11  # bit 12
-            imm |= ((instr >> 25) & 0x3F) << 5  # bits 10:5
-            imm |= ((instr >> 8) & 0xF) << 1    # bits 4:1
-            imm |= ((instr >> 7) & 0x1) << 12   # bit 11 (sign)
-            imm = (imm >> 1)  # B-type is 13-bit signed (scaled by 2)
-            imm = max(-4096, min(4094, imm * random.choice([-2, -1, 1, 2])))
-            imm <<= 1  # Re-scale
-            new_instr = (new_instr & 0x800F) | \
-                        (((imm >> 11) & 0x1) << 12) | \
-                        (((imm >> 5) & 0x3F) << 25) | \
-                        (((imm >> 1) & 0xF) << 8) | \
-                        (((imm >> 12) & 0x1) << 7)
-        
-        return new_instr
+        fmt = FORMATS.get(opcode)
+        if instr in TERMINATION_INSTR or fmt not in ("I", "S", "B", "U", "J") or opcode == 0x73:
+            return instr
+        if fmt == "I":
+            if opcode in (0x13, 0x1B) and (instr >> 12 & 0x3) == 1:  # slli/srli/srai: shamt only
+                shamt = self.rng.randrange(64 if opcode == 0x13 else 32)
+                return (instr & ~(0x3F << 20)) | (shamt << 20)
+            imm = self._new_imm(_sext(instr >> 20, 12), 12)
+            return (instr & 0xFFFFF) | ((imm & 0xFFF) << 20)
+        if fmt == "S":
+            imm = _sext(((instr >> 25) << 5) | (instr >> 7 & 0x1F), 12)
+            imm = self._new_imm(imm, 12)
+            return (instr & 0x01FFF07F) | ((imm >> 5 & 0x7F) << 25) | ((imm & 0x1F) << 7)
+        if fmt == "U":
+            imm = self._new_imm(_sext(instr >> 12, 20), 20)
+            return (instr & 0xFFF) | ((imm & 0xFFFFF) << 12)
+        off = self._branch_target()
+        if off is None:
+            return instr
+        if fmt == "B":
+            off = max(-4096, min(4094, off))
+            return (instr & 0x01FFF07F) | ((off >> 12 & 1) << 31) | ((off >> 5 & 0x3F) << 25) \
+                | ((off >> 1 & 0xF) << 8) | ((off >> 11 & 1) << 7)
+        return (instr & 0xFFF) | ((off >> 20 & 1) << 31) | ((off >> 1 & 0x3FF) << 21) \
+            | ((off >> 11 & 1) << 20) | ((off >> 12 & 0xFF) << 12)
 
     def _mutate_register(self, instr: int) -> int:
-        """Swap registers with valid alternatives (avoid x0 for writes)"""
+        """Swap register fields the format actually has (never write x0)"""
         opcode = instr & OPCODE_MASK
-        new_instr = instr
+        fmt = FORMATS.get(opcode)
+        if instr in TERMINATION_INSTR or fmt is None:
+            return instr
+        fields = []
+        if fmt in WRITES_RD:
+            fields.append((7, range(1, 32)))
+        if fmt in ("R", "I", "S", "B", "R4") and opcode != 0x73:
+            fields.append((15, range(32)))
+        if fmt in ("R", "S", "B", "R4") and opcode != 0x53:
+            fields.append((20, range(32)))
+        if fmt == "R4":
+            fields.append((27, range(32)))
+        if not fields:
+            return instr
+        shift, regs = self.rng.choice(fields)
+        return (instr & ~(0x1F << shift)) | (self.rng.choice(regs) << shift)
 
-        # Mutate RS1 (source register 1)
-        if (opcode & 0x3F) not in (0x23, 0x63):  # Most instructions use RS1
-            rs1 = (instr & RS1_MASK) >> 15
-            new_rs1 = random.choice(range(32))
-            new_instr = (new_instr & ~RS1_MASK) | (new_rs1 << 15)
-        
-        # Mutate RS2 (source register 2)
-        if opcode in (0x33, 0x23, 0x63):  # R-type, S-type, B-type
-            rs2 = (instr & RS2_MASK) >> 20
-            new_rs2 = random.choice(range(32))
-            new_instr = (new_instr & ~RS2_MASK) | (new_rs2 << 20)
-        
-        # Mutate RD (destination register) - avoid x0 for writes
-        if opcode in (0x33, 0x13, 0x3, 0x6F, 0x17):  # Write to RD
-            rd = (instr & RD_MASK) >> 7
-            new_rd = random.choice([x for x in range(32) if x != 0])  # Not x0
-            new_instr = (new_instr & ~RD_MASK) | (new_rd << 7)
-        
-        return new_instr
+    # === RVC field mutations ===
+    def _mutate_compressed(self, half: int) -> int:
+        if half in (C_EBREAK, 0):
+            return half
+        quad, funct3 = half & 0x3, half >> 13
+        fmt = C_FORMATS.get((quad, funct3))
+        op = self._pick(("opcode", "immediate", "register"), "c.")
+        self._op = f"c.{op}"
+        if op == "opcode" and (quad, funct3) in C_SIBLINGS:
+            return (half & 0x1FFF) | (C_SIBLINGS[(quad, funct3)] << 13)
+        if op == "opcode" and fmt == "CA" and (half >> 10 & 0x3) == 0x3:
+            # c.sub/xor/or/and/subw/addw: bit 12 + funct2[6:5]
+            sel = self.rng.choice([(0, 0), (0, 1), (0, 2), (0, 3), (1, 0), (1, 1)])
+            return (half & ~0x1060) | (sel[0] << 12) | (sel[1] << 5)
+        if op == "opcode" and fmt == "CR" and (half >> 2 & 0x1F) and (half >> 7 & 0x1F):
+            return half ^ 0x1000  # c.mv ↔ c.add
+        if op == "immediate" and (quad, funct3) in C_SIGNED_IMM:
+            imm = self._new_imm(_sext(((half >> 12 & 1) << 5) | (half >> 2 & 0x1F), 6), 6)
+            return (half & ~0x107C) | ((imm >> 5 & 1) << 12) | ((imm & 0x1F) << 2)
+        if op == "register":
+            if fmt in ("CI", "CR") and (half >> 7 & 0x1F):  # rd/rs1 (nonzero: x0 forms are reserved/hints)
+                return (half & ~0xF80) | (self.rng.randrange(1, 32) << 7)
+            if fmt in ("CSS",) or (fmt == "CR" and (half >> 2 & 0x1F)):
+                return (half & ~0x7C) | (self.rng.randrange(1, 32) << 2)
+            if fmt in ("CL", "CS", "CA", "CIW"):  # rd'/rs2' at 4:2 (x8-x15)
+                return (half & ~0x1C) | (self.rng.randrange(8) << 2)
+        return half
+
+    # === Helpers ===
+    def _new_imm(self, imm: int, bits: int) -> int:
+        lo, hi = -(1 << (bits - 1)), (1 << (bits - 1)) - 1
+        op = self.rng.random()
+        if op < 0.4:
+            imm *= self.rng.choice([-2, -1, 2])
+        elif op < 0.8:
+            imm += self.rng.choice([-4, -1, 1, 4])
+        else:
+            imm = self.rng.choice([0, 1, -1, lo, hi])
+        return max(lo, min(hi, imm))
+
+    def _branch_target(self) -> Optional[int]:
+        """Offset from the instruction being mutated to another instruction boundary."""
+        if len(self._offsets) < 2:
+            return None
+        here = self._offsets[self._idx]
+        return self.rng.choice([o for o in self._offsets if o != here]) - here
+
+    def _pick(self, ops, prefix: str = "") -> str:
+        """An operator name, weighted by the scheduler's probabilities when given."""
+        w = [self.weights.get(prefix + op, 0.0) for op in ops] if self.weights is not None else None
+        return self.rng.choices(ops, weights=w)[0] if w and sum(w) > 0 else self.rng.choice(ops)
 
     def _mutate_instruction(self, instr: int) -> int:
         """Choose a mutation operator based on instruction type"""
         if instr in TERMINATION_INSTR:
             return instr  # Never mutate termination instructions
-        
-        mutators = [
-            self._mutate_opcode,
-            self._mutate_immediate,
-            self._mutate_register
-        ]
-        return random.choice(mutators)(instr)
-
-    def mutate(self, tc: Testcase) -> list[Testcase]:
-        """Mutate testcase by modifying RISC-V instructions"""
-        mutants = []
-        code_bytes = tc.code.encode('utf-8', errors='ignore')
+        self._op = self._pick(("opcode", "immediate", "register"))
+        return getattr(self, f"_mutate_{self._op}")(instr)
 
-        # Validate input is multiple of 4 bytes (RISC-V instructions)
-        if len(code_bytes) % 4 != 0:
-            return mutants
+    def mutate(self, tc: Testcase, rng: Optional[random.Random] = None,
+               weights: Optional[dict] = None) -> list[Testcase]:
+        """Mutate testcase by modifying one assembled RISC-V instruction per mutant"""
+        with self._lock:
+            self.rng = rng or self._unseeded
+            self.weights = weights if weights and any(weights.values()) else None
+            return self._mutate(tc)
 
-        # Split into 32-bit instructions
-        instr_count = len(code_bytes) // 4
-        instructions = [
-            self._bytes_to_instr(code_bytes[i*4 : (i+1)*4])
-            for i in range(instr_count)
-        ]
+    def _mutate(self, tc: Testcase) -> list[Testcase]:
+        mutants = []
+        words = self.text_words(tc)
+        targets = [i for i, (size, w) in enumerate(words)
+                   if w not in TERMINATION_INSTR and w != C_EBREAK]
+        if not targets:
+            return mutants
+        self._offsets, pos = [], 0
+        for size, _ in words:
+            self._offsets.append(pos)
+            pos += size
 
+        data = split_sections(tc.code)[1]
+        seen = {tuple(words)}
         for _ in range(self.n):
-            # Copy and mutate a random instruction
-            mutated_instrs = instructions.copy()
-            idx = random.randint(0, instr_count - 1)
-            mutated_instrs[idx] = self._mutate_instruction(mutated_instrs[idx])
-
-            # Convert back to bytes and decode
-            mutated_bytes = b"".join([
-                self._instr_to_bytes(ins) for ins in mutated_instrs
-            ])
-            try:
-                mutated_code = mutated_bytes.decode()
-                # Validate with lightweight filter
-                mutant = Testcase(
-                    id="",
-                    code=mutated_code,
-                    source="binary_isa",
-                    path=tc.path
-                )
-                if self.filter.is_valid(mutant):
-                    mutant.id = hashlib.sha256(mutated_code.encode()).hexdigest()[:12]
-                    mutants.append(mutant)
-            except UnicodeDecodeError:
-                continue  # Skip invalid UTF-8
-        
+            for _ in range(self.max_tries):  # retry no-op / illegal mutations
+                self._idx = self.rng.choice(targets)
+                size, old = words[self._idx]
+                self._op = ""
+                new = self._mutate_compressed(old) if size == 2 else self._mutate_instruction(old)
+                mutated = list(words)
+                mutated[self._idx] = (size, new)
+                if new != old and is_legal(size, new) and tuple(mutated) not in seen:
+                    break
+            else:
+                continue
+            seen.add(tuple(mutated))
+            code = emit(mutated, data)
+            mutant = Testcase(id="", code=code, source="binary_isa", path=tc.path,
+                              metadata={"ops": [[self._op, self._idx, size, old, new]]})
+            if self.weights is not None:
+                mutant.metadata["weights"] = self.weights
+            if self.filter.is_valid(mutant):
+                mutant.id = hashlib.sha256(code.encode()).hexdigest()[:12]
+                mutants.append(mutant)
         return mutants
+
+    def apply(self, tc: Testcase, ops: list) -> Optional[Testcase]:
+        """Rebuild a mutant of `tc` from its recorded ops (None if they do not fit tc)."""
+        words = list(self.text_words(tc))
+        for _, idx, size, old, new in ops:
+            if idx >= len(words) or words[idx] != (size, old):
+                return None
+            words[idx] = (size, new)
+        code = emit(words, split_sections(tc.code)[1])
+        return Testcase(id=hashlib.sha256(code.encode()).hexdigest()[:12], code=code, source="binary_isa",
+                        path=tc.path, metadata={"ops": ops})
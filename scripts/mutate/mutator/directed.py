@@ -0,0 +1,156 @@
+# scripts/mutate/mutator/directed.py
+"""
+Coverage-directed LLM mutation (mutators.directed)
+- Uncovered points (CoverageFusion.get_uncoverpoints over the interned
+  points plus a known universe, by default every RV64GC opcode) are grouped by
+  instruction class or module: "opcode:fmadd.d" → opcode/D,
+  "csr:mstatus:w" → csr, "core.alu.toggle_3" → core.alu
+- Each prompt carries a summary of a few groups within budget_tokens
+  (~4 characters per token); groups and their members rotate between
+  prompts so a batch spreads over the whole gap instead of repeating it
+- The points named in a prompt are the mutant's targets (metadata
+  "targets"); credit() checks them against the mutant's analysed coverage
+  and keeps hit / coverage-gain statistics
+"""
+from collections import Counter, OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils import rvisa
+from utils.llm import call, async_client
+from utils.models import Testcase
+from scripts.analyse.coverage_fusion import CoverageFusion
+from scripts.mutate.mutator.gen import LLMMutator
+
+CHARS_PER_TOKEN = 4  # no tokenizer dependency; close enough for budgeting
+ISA_POINTS = frozenset(f"opcode:{op.name}" for op in rvisa.OPCODES)
+
+def group_of(point: str) -> Tuple[str, str]:
+    """(group, label within the group) for a coverage point name."""
+    head, sep, rest = point.partition(":")
+    if sep:
+        if head == "opcode":
+            op = rvisa.BY_NAME.get(rest.split(":", 1)[0])
+            return f"opcode/{op.ext if op else '?'}", rest
+        return head, rest
+    for s in "./":
+        if s in point:
+            module, _, leaf = point.rpartition(s)
+            return module, leaf
+    return "other", point
+
+class UncoveredSummary:
+    """Uncovered points grouped for prompting; rebuilt by refresh()."""
+
+    def __init__(self, coverage: CoverageFusion, budget_tokens: int = 256, per_group: int = 8,
+                 universe: Iterable[str] = ISA_POINTS):
+        self.coverage = coverage
+        self.universe = frozenset(universe)
+        self.budget = budget_tokens * CHARS_PER_TOKEN
+        self.per_group = per_group
+        self.groups: Dict[str, List[Tuple[str, str]]] = {}  # group → [(label, point)]
+        self.order: List[str] = []
+        self._covered: Counter = Counter()
+        self._group_cursor = 0
+        self._member_cursor: Counter = Counter()
+        self._stamp = None
+
+    def refresh(self, force: bool = False):
+        stamp = (len(self.coverage.names), self.coverage.total_covered())
+        if stamp == self._stamp and not force:
+            return
+        self._stamp = stamp
+        universe = self.universe.union(self.coverage.names)
+        groups: Dict[str, List[Tuple[str, str]]] = {}
+        for point in sorted(self.coverage.get_uncoverpoints(universe)):
+            group, label = group_of(point)
+            groups.setdefault(group, []).append((label, point))
+        total = Counter(group_of(p)[0] for p in universe)
+        self._covered = Counter({g: total[g] - len(groups.get(g, ())) for g in total})
+        self.groups = groups
+        # partly covered classes first (reachable from what already runs), then by gap size
+        self.order = sorted(groups, key=lambda g: (self._covered[g] == 0, -len(groups[g]), g))
+        self._group_cursor %= max(len(self.order), 1)
+
+    def next(self) -> Tuple[str, List[str]]:
+        """(summary text, target points) for one prompt; empty when everything is covered."""
+        self.refresh()
+        lines, targets, size = [], [], 0
+        for i in range(len(self.order)):
+            group = self.order[(self._group_cursor + i) % len(self.order)]
+            members = self.groups[group]
+            start = self._member_cursor[group] % len(members)
+            picked = (members[start:] + members[:start])[:self.per_group]
+            more = len(members) - len(picked)
+            line = (f"- {group} ({len(members)} uncovered, {self._covered[group]} covered): "
+                    + ", ".join(label for label, _ in picked) + (f" (+{more} more)" if more else ""))
+            if lines and size + len(line) > self.budget:
+                break
+            lines.append(line)
+            size += len(line) + 1
+            targets += [point for _, point in picked]
+            self._member_cursor[group] += len(picked)
+        self._group_cursor = (self._group_cursor + max(len(lines), 1)) % max(len(self.order), 1)
+        return "\n".join(lines), targets
+
+class DirectedLLMMutator(LLMMutator):
+    """LLMMutator whose prompts name uncovered coverage points to reach."""
+
+    name = "directed"
+
+    def __init__(self, coverage: CoverageFusion, budget_tokens: int = 256, per_group: int = 8,
+                 universe: Iterable[str] = ISA_POINTS, pending: int = 4096, **kwargs):
+        super().__init__(**kwargs)
+        self.coverage = coverage
+        self.summary = UncoveredSummary(coverage, budget_tokens, per_group, universe)
+        self._pending: "OrderedDict[str, frozenset]" = OrderedDict()  # mutant id → targets
+        self._pending_max = pending
+
+    def _directed_prompt(self, seed: Testcase) -> Tuple[str, List[str]]:
+        prompt = self._prompt(seed)
+        text, targets = self.summary.next()
+        if not targets:
+            return prompt, []
+        return (f"{prompt}\nThese coverage points are still uncovered; each mutant should reach "
+                f"some of them:\n{text}\n"), targets
+
+    def _track(self, mutants: List[Testcase], targets: List[str]) -> List[Testcase]:
+        if targets:
+            self.stats["directed_calls"] += 1
+        for m in mutants:
+            m.metadata["targets"] = targets
+            if targets:
+                self._pending[m.id] = frozenset(targets)
+                if len(self._pending) > self._pending_max:  # never analysed (filtered, crashed)
+                    self._pending.popitem(last=False)
+        return mutants
+
+    def mutate(self, seed: Testcase, rng=None) -> List[Testcase]:
+        prompt, targets = self._directed_prompt(seed)
+        return self._track(self._mutants(*call(prompt, system_prompt=self.system_prompt)), targets)
+
+    async def amutate(self, seed: Testcase, rng=None) -> List[Testcase]:
+        llm = self.llm or async_client()
+        prompt, targets = self._directed_prompt(seed)
+        return self._track(self._mutants(*await llm.call(prompt, system_prompt=self.system_prompt)), targets)
+
+    def credit(self, coverage: Optional[CoverageFusion] = None, history: Optional[Dict[str, dict]] = None):
+        """Match pending mutants' targets against their analysed coverage (and W$ cov_gain)."""
+        coverage = coverage or self.coverage
+        for tc_id in [t for t in self._pending if t in coverage.tests]:
+            targets = self._pending.pop(tc_id)
+            hit = targets & {coverage.names[i] for i in coverage.tests[tc_id]}
+            self.stats["analysed"] += 1
+            self.stats["targets"] += len(targets)
+            self.stats["target_hits"] += len(hit)
+            self.stats["hitting_mutants"] += bool(hit)
+            if history and tc_id in history:
+                self.stats["cov_gain"] += history[tc_id].get("cov_gain", 0)
+        self.summary.refresh()
+
+    def report(self) -> str:
+        s = self.stats
+        rate = s["target_hits"] / s["targets"] if s["targets"] else 0.0
+        gain = 1000 * s["cov_gain"] / s["tokens"] if s["tokens"] else 0.0
+        return (f"{super().report()}; directed: {s['hitting_mutants']}/{s['analysed']} analysed mutants "
+                f"hit a target, {s['target_hits']}/{s['targets']} targets hit ({rate:.1%}), "
+                f"{gain:.3f} cov gain/1k tokens")
@@ -1,36 +1,47 @@
 # scripts/mutate/mutator/gen.py
-from utils.llm import call
+from utils.llm import call, async_client, AsyncLLM
 from utils.models import Testcase
+from utils.novelty import NoveltyIndex
+from utils.asm_util import assembles
+from scripts.execute.filter import shared_filter
+from collections import Counter, OrderedDict, deque
 from pathlib import Path
+import asyncio
 import hashlib
 import re
 from typing import Optional
+import numpy as np
 
 class LLMMutator:
-    def __init__(self):
+    """Asks for `candidates` variants per call (one fenced block each) and keeps those
+    that pass LightweightFilter, assemble, and are neither exact nor near duplicates
+    of earlier output or of the novelty index."""
+
+    name = "llm"
+    replayable = False  # model output: lineage keeps the code
+
+    def __init__(self, llm: Optional[AsyncLLM] = None, candidates: int = 4,
+                 novelty: Optional[NoveltyIndex] = None, dup_threshold: float = 0.9, recent: int = 1024):
         self.system_prompt = """You are a RISC-V assembly fuzzer. Generate valid, novel, short tests.
 Your response should contain the assembly code between ```assembly or ```asm tags."""
+        self.llm = llm  # async client for batches; the shared one by default
+        self.candidates = max(candidates, 1)
+        self.filter = shared_filter()
+        self.novelty = novelty
+        self.dup_threshold = dup_threshold
+        self._seen: "OrderedDict[str, None]" = OrderedDict()  # ids already emitted
+        self._recent: deque = deque(maxlen=recent)  # their MinHash signatures
+        self.stats: Counter = Counter()
 
-    def _extract_code(self, response: str) -> Optional[str]:
-        """Extract assembly code from LLM response."""
-        # Try both assembly and asm tags
-        patterns = [
-            r'```assembly\n(.*?)\n```',
-            r'```asm\n(.*?)\n```',
-            r'```Assembly\n(.*?)\n```',
-            r'```ASM\n(.*?)\n```'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, response, re.DOTALL)
-            if match:
-                return match.group(1).strip()
-        
-        # If no code blocks found, return None
-        return None
-
-    def mutate(self, seed: Testcase) -> list[Testcase]:
-        user_prompt = f"""Mutate this RISC-V test to increase coverage:
+    def _extract_code(self, response: str) -> list[str]:
+        """Extract every assembly code block from LLM response."""
+        blocks = re.findall(r'```(?:assembly|asm|s)[ \t]*\n(.*?)\n?```', response, re.DOTALL | re.IGNORECASE)
+        return [b.strip() for b in blocks if b.strip()]
+
+    def _prompt(self, seed: Testcase) -> str:
+        many = (f"\nGive {self.candidates} different mutants, each complete and in its own ```asm block.\n"
+                if self.candidates > 1 else "")
+        return f"""Mutate this RISC-V test to increase coverage:
 
 {seed.code}
 
@@ -40,30 +51,73 @@ Requirements:
 - No infinite loops
 - Add fence.i if needed
 - Target pipeline hazards or cache
-"""
-        
-        result, _, _ = call(user_prompt, system_prompt=self.system_prompt)
-        
-        # Extract assembly code from response
-        code = self._extract_code(result)
-        
-        if not code:
+{many}"""
+
+    def _is_duplicate(self, code: str) -> bool:
+        if self.novelty is None:
+            return False
+        sig = self.novelty.signature(code)
+        if self._recent and (np.stack(self._recent) == sig).mean(axis=1).max() >= self.dup_threshold:
+            return True
+        if self.novelty.nearest(sig)[1] >= self.dup_threshold:
+            return True
+        self._recent.append(sig)
+        return False
+
+    def _mutants(self, result: str, p_tokens: int = 0, c_tokens: int = 0) -> list[Testcase]:
+        self.stats["calls"] += 1
+        self.stats["tokens"] += p_tokens + c_tokens
+        blocks = self._extract_code(result)
+        if not blocks:
             print(f"Warning: No assembly code found in LLM response")
             return []
-            
-        # Generate unique ID
-        mutant_id = hashlib.sha256(code.encode()).hexdigest()[:12]
-        
-        # Create and return new test case
-        return [Testcase(id=mutant_id, code=code, source="llm", path=Path(""))]
 
-    def batch_mutate(self, seeds: list[Testcase]) -> list[Testcase]:
-        """Mutate multiple test cases."""
         mutants = []
-        for seed in seeds:
-            mutants.extend(self.mutate(seed))
+        for code in blocks:
+            self.stats["candidates"] += 1
+            mutant_id = hashlib.sha256(code.encode()).hexdigest()[:12]
+            tc = Testcase(id=mutant_id, code=code, source="llm", path=Path(""))
+            if mutant_id in self._seen:
+                self.stats["duplicate"] += 1
+            elif not self.filter.is_valid(tc):
+                self.stats["rejected_filter"] += 1
+            elif not assembles(code):
+                self.stats["rejected_asm"] += 1
+            elif self._is_duplicate(code):
+                self.stats["near_duplicate"] += 1
+            else:
+                self.stats["accepted"] += 1
+                mutants.append(tc)
+            self._seen[mutant_id] = None
+            if len(self._seen) > 4 * self._recent.maxlen:
+                self._seen.popitem(last=False)
         return mutants
 
+    @property
+    def accepted_per_1k_tokens(self) -> float:
+        return 1000 * self.stats["accepted"] / self.stats["tokens"] if self.stats["tokens"] else 0.0
+
+    def report(self) -> str:
+        s = self.stats
+        return (f"[LLM] {s['accepted']}/{s['candidates']} candidates accepted from {s['calls']} calls "
+                f"(filter {s['rejected_filter']}, asm {s['rejected_asm']}, dup {s['duplicate']}, "
+                f"near-dup {s['near_duplicate']}), {self.accepted_per_1k_tokens:.2f} accepted/1k tokens")
+
+    def mutate(self, seed: Testcase, rng=None) -> list[Testcase]:
+        return self._mutants(*call(self._prompt(seed), system_prompt=self.system_prompt))
+
+    async def amutate(self, seed: Testcase, rng=None) -> list[Testcase]:
+        llm = self.llm or async_client()
+        return self._mutants(*await llm.call(self._prompt(seed), system_prompt=self.system_prompt))
+
+    async def abatch_mutate(self, seeds: list[Testcase]) -> list[list[Testcase]]:
+        """Mutants per seed; all requests are in flight at once (bounded by the client)."""
+        return await asyncio.gather(*(self.amutate(seed) for seed in seeds))
+
+    def batch_mutate(self, seeds: list[Testcase]) -> list[Testcase]:
+        """Mutate multiple test cases concurrently."""
+        return [m for mutants in asyncio.run(self.abatch_mutate(seeds)) for m in mutants]
+
 # from utils.models import Testcase
 # import random
 # import hashlib
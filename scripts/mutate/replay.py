@@ -0,0 +1,96 @@
+# scripts/mutate/replay.py
+"""
+Replay: rebuild a mutant bit-exactly from the lineage index
+- the parent comes from the seed store, or is itself replayed (mutants
+  that were never promoted), and must match the recorded parent_hash
+- rng-driven mutators (binary) are re-run with derive_rng(run_seed, rng
+  key) and the operator weights they drew with; their recorded ops are
+  the fallback if the mutator changed since
+- LLM mutants are model output: the lineage index keeps their code
+- the result is checked against the mutant id (sha256[:12] of the code)
+
+    python scripts/mutate/replay.py <mutant id> [--out DIR] [--chain]
+"""
+
+import sys
+import argparse
+from pathlib import Path
+from typing import Optional
+
+# === Add project root ===
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import yaml
+from utils.models import Testcase
+from utils.seedstore import SeedStore
+from utils.lineage import LineageIndex, derive_rng, code_hash
+from scripts.mutate.mutator.binary import BinaryMutator
+
+CONFIG = yaml.safe_load((PROJECT_ROOT / "config.yaml").read_text())
+REPLAY_ROUNDS = 64  # mutant k of a stream only depends on draws 0..k, so more rounds are harmless
+
+class ReplayError(Exception):
+    pass
+
+def _rerun(rec: dict, parent: Testcase) -> Optional[Testcase]:
+    if rec["mutator"] != "binary":
+        return None
+    mutator = BinaryMutator(mutations_per_seed=REPLAY_ROUNDS)
+    if rec["rng"] is not None and rec["run_seed"] is not None:
+        for m in mutator.mutate(parent, rng=derive_rng(rec["run_seed"], rec["rng"]), weights=rec["weights"]):
+            if m.id == rec["id"]:
+                return m
+    if rec["ops"]:
+        print(f"[REPLAY] {rec['id']}: rng re-run did not reproduce it, applying recorded ops")
+        return mutator.apply(parent, rec["ops"])
+    return None
+
+def replay(tc_id: str, lineage: LineageIndex, store: Optional[SeedStore] = None) -> Testcase:
+    """The mutant `tc_id`, rebuilt from its ancestors; raises ReplayError."""
+    rec = lineage.get(tc_id)
+    if rec is None:
+        raise ReplayError(f"{tc_id}: not in the lineage index")
+    if rec["code"] is not None:
+        tc = Testcase(id=tc_id, code=rec["code"], source=rec["mutator"], path=Path(""))
+    else:
+        parent = store.get(rec["parent"]) if store is not None and rec["parent"] else None
+        if parent is None:
+            parent = replay(rec["parent"], lineage, store)
+        if code_hash(parent.code) != rec["parent_hash"]:
+            raise ReplayError(f"{tc_id}: parent {rec['parent']} content changed")
+        tc = _rerun(rec, parent)
+        if tc is None:
+            raise ReplayError(f"{tc_id}: no way to re-run mutator {rec['mutator']!r}")
+    if code_hash(tc.code) != tc_id:
+        raise ReplayError(f"{tc_id}: rebuilt code hashes to {code_hash(tc.code)}")
+    keys = ("parent", "parent_hash", "mutator", "run_seed", "rng", "ops", "weights")
+    tc.metadata.update({k: rec[k] for k in keys if rec[k] is not None})
+    return tc
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("id", help="mutant id")
+    ap.add_argument("--out", type=Path, help="write <id>.s here (default: print)")
+    ap.add_argument("--chain", action="store_true", help="print the lineage back to the root seed")
+    args = ap.parse_args()
+    pipeline = CONFIG["pipeline"]
+    lineage = LineageIndex(PROJECT_ROOT / pipeline.get("lineage", "corpus/lineage.sqlite"))
+    store = SeedStore(PROJECT_ROOT / pipeline.get("seed_store", "corpus/store"))
+    if args.chain:
+        for rec in lineage.chain(args.id):
+            print(f"[LINEAGE] {rec['id']} ← {rec['parent']} ({rec['mutator']}, rng {rec['rng']}, "
+                  f"ops {rec['ops']})")
+    try:
+        tc = replay(args.id, lineage, store)
+    except ReplayError as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
+    if args.out:
+        args.out.mkdir(parents=True, exist_ok=True)
+        print(f"[REPLAY] {tc.id} → {tc.save(args.out)}")
+    else:
+        print(tc.code)
+
+if __name__ == "__main__":
+    main()
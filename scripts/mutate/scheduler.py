@@ -0,0 +1,127 @@
+# scripts/mutate/scheduler.py
+"""
+Operator scheduler for the mutate stage (mutators.schedule)
+- Arms are grouped: "mutators" (binary, llm, directed: which mutators run
+  on a seed) and one group per mutator with operators (binary: opcode,
+  immediate, register, c.opcode, c.immediate, c.register)
+- Each analysed mutant credits its mutator and the operators in its
+  metadata["ops"] with cov_gain + bug_score from W$ history
+- Probabilities follow adaptive probability matching: discounted
+  (gamma) mean reward per arm, smoothed toward the group mean, with a
+  floor p_min so no arm starves; they are recomputed once per iteration
+  (update()) and stay fixed in between, so a mutant's draws are replayable
+  from the weights recorded in its metadata
+- A mutator runs on a seed with probability min(1, k * p) (k = number of
+  mutators): uniform probabilities run everything, as before
+- State is a small JSON file written with the same tmp + rename as cmin
+"""
+import json
+import random
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from scripts.fetch.scheduler import ArmStats
+
+MUTATORS = "mutators"
+
+class OperatorScheduler:
+    def __init__(self, state_path: Optional[Path] = None, gamma: float = 0.98, p_min: float = 0.05,
+                 prior: float = 2.0):
+        self.state_path = state_path
+        self.gamma = gamma  # per-iteration discount: old evidence fades as coverage saturates
+        self.p_min = p_min
+        self.prior = prior  # pseudo-pulls at the group mean for arms with little evidence
+        self.arms: Dict[str, Dict[str, ArmStats]] = {}
+        self.probs: Dict[str, Dict[str, float]] = {}
+        self.active: Dict[str, None] = {}  # mutators of this run (the state may know others)
+        self._load()
+
+    # === Persistence ===
+    def _load(self):
+        if self.state_path is None or not self.state_path.exists():
+            return
+        state = json.loads(self.state_path.read_text())
+        self.arms = {g: {a: ArmStats(**s) for a, s in arms.items()} for g, arms in state["arms"].items()}
+        self.probs = state["probs"]
+
+    def save(self):
+        if self.state_path is None:
+            return
+        state = {"arms": {g: {a: vars(s) for a, s in arms.items()} for g, arms in self.arms.items()},
+                 "probs": self.probs}
+        tmp = self.state_path.with_name(self.state_path.name + ".tmp")
+        tmp.write_text(json.dumps(state))
+        tmp.replace(self.state_path)
+
+    # === Arms ===
+    def register(self, group: str, arms: Iterable[str]):
+        """Make sure every arm exists; new arms start at the uniform share."""
+        group_arms = self.arms.setdefault(group, {})
+        fresh = [a for a in arms if a not in group_arms]
+        for a in fresh:
+            group_arms[a] = ArmStats()
+        if fresh or group not in self.probs:
+            self._recompute(group)
+
+    def register_mutators(self, mutators: list, name=lambda m: getattr(m, "name", type(m).__name__)):
+        self.active = dict.fromkeys(name(m) for m in mutators)
+        self.register(MUTATORS, self.active)
+        for m in mutators:
+            if getattr(m, "operators", None):
+                self.register(name(m), m.operators)
+
+    def observe(self, metadata: dict, h: dict):
+        """Credit one analysed mutant (its W$ history record) to its mutator and operators."""
+        mutator = metadata.get("mutator")
+        if mutator is None:
+            return
+        reward = h.get("cov_gain", 0.0) + h.get("bug_score", 0.0)
+        credited = [(MUTATORS, mutator)] + [(mutator, op[0]) for op in metadata.get("ops", []) if op and op[0]]
+        for group, arm in credited:
+            stats = self.arms.setdefault(group, {}).setdefault(arm, ArmStats())
+            stats.pulls += 1
+            stats.hits += reward > 0
+            stats.reward += reward
+
+    def update(self):
+        """End of iteration: recompute probabilities, then discount the evidence."""
+        for group in self.arms:
+            self._recompute(group)
+            for stats in self.arms[group].values():
+                stats.pulls *= self.gamma
+                stats.hits *= self.gamma
+                stats.reward *= self.gamma
+        self.save()
+
+    def _recompute(self, group: str):
+        arms = self.arms[group]
+        pulls = sum(s.pulls for s in arms.values())
+        mean = sum(s.reward for s in arms.values()) / pulls if pulls else 0.0
+        q = {a: (s.reward + self.prior * mean) / (s.pulls + self.prior) for a, s in arms.items()}
+        total, k = sum(q.values()), len(arms)
+        p_min = min(self.p_min, 1.0 / k)
+        self.probs[group] = {a: p_min + (1 - k * p_min) * (q[a] / total if total > 0 else 1.0 / k)
+                             for a in arms}
+
+    # === Decisions ===
+    def weights(self, group: str) -> Optional[Dict[str, float]]:
+        """Operator probabilities of a mutator (None if it has no operator arms)."""
+        return self.probs.get(group) if group != MUTATORS else None
+
+    def runs(self, mutator: str, rng: random.Random) -> bool:
+        probs = self.probs.get(MUTATORS, {})
+        active = [p for m, p in probs.items() if m in self.active]
+        if mutator not in probs or not active:
+            return True
+        return rng.random() < min(1.0, len(active) * probs[mutator] / sum(active))
+
+    def report(self) -> str:
+        return "; ".join(f"{g}: " + ", ".join(f"{a} {p:.2f}" for a, p in sorted(probs.items()))
+                         for g, probs in sorted(self.probs.items()))
+
+def build_operator_scheduler(config: dict, root: Path) -> Optional[OperatorScheduler]:
+    cfg = config.get("mutators", {}).get("schedule", {})
+    if not cfg.get("enabled", True):
+        return None
+    return OperatorScheduler(root / cfg.get("state", "mopt.json"), gamma=cfg.get("gamma", 0.98),
+                             p_min=cfg.get("p_min", 0.05), prior=cfg.get("prior", 2.0))
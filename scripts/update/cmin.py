@@ -0,0 +1,143 @@
+# scripts/update/cmin.py
+"""
+Corpus minimisation over per-test coverage bitsets (CoverageFusion.tests)
+- Greedy set cover: repeatedly keep the test adding the most uncovered
+  points; ties go to the higher W$ weight, then the fewer ISS cycles
+- Lazy evaluation: gains only shrink, so stale heap entries are re-scored
+  on pop instead of re-scoring every test per pick
+- Incremental: the kept set is persisted; minimize() with only the newly
+  analysed ids extends the cover without touching (or re-simulating) the rest.
+  A full pass runs once the cover has grown by `full_every` tests
+- prune() drops runtime-corpus files (and stale weight-suffixed copies) of
+  tests outside the cover
+
+    python scripts/update/cmin.py [--full] [--dry-run]
+"""
+import sys
+import json
+import heapq
+import argparse
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+# === Add project root ===
+ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT))
+
+import yaml
+import numpy as np
+from utils.wcache import WeightCache
+from scripts.analyse.coverage_fusion import CoverageFusion, popcount
+
+class CorpusMinimizer:
+    def __init__(self, coverage: CoverageFusion, wcache: WeightCache,
+                 state_path: Path, full_every: int = 256):
+        self.coverage = coverage
+        self.wcache = wcache
+        self.state_path = state_path
+        self.full_every = full_every
+        self.kept: Set[str] = set()
+        self._since_full = 0
+        if state_path.exists():
+            state = json.loads(state_path.read_text())
+            self.kept = set(state.get("kept", []))
+            self._since_full = state.get("since_full", 0)
+
+    def save(self):
+        tmp = self.state_path.with_name(self.state_path.name + ".tmp")
+        tmp.write_text(json.dumps({"kept": sorted(self.kept), "since_full": self._since_full}))
+        tmp.replace(self.state_path)
+
+    def _tiebreak(self, tc_id: str):
+        h = self.wcache.history.get(tc_id, {})
+        return (-self.wcache.entries.get(tc_id, 0.0), h.get("cycles", float("inf")), tc_id)
+
+    def _cover(self, candidates: Iterable[str], covered: np.ndarray) -> List[str]:
+        """Greedy cover of the candidates' union, given bits already `covered`."""
+        nwords = len(covered)
+        sets = {t: self.coverage.test_bitset(t, nwords) for t in candidates
+                if t in self.coverage.tests}
+        heap = [(-popcount(b & ~covered), *self._tiebreak(t)) for t, b in sets.items()]
+        heapq.heapify(heap)
+        picked = []
+        while heap:
+            neg_gain, *key = heapq.heappop(heap)
+            if neg_gain == 0:
+                break
+            tc_id = key[-1]
+            gain = popcount(sets[tc_id] & ~covered)
+            if gain != -neg_gain:  # stale: re-score and retry
+                if gain:
+                    heapq.heappush(heap, (-gain, *key))
+                continue
+            covered |= sets[tc_id]
+            picked.append(tc_id)
+        return picked
+
+    def minimize(self, new_ids: Optional[Iterable[str]] = None, full: bool = False) -> Set[str]:
+        """Update the kept set; `new_ids=None` or `full` re-covers every known test."""
+        nwords = -(-len(self.coverage.names) // 64)
+        full = full or new_ids is None or self._since_full >= self.full_every
+        if full:
+            before = len(self.kept)
+            self.kept = set(self._cover(self.coverage.tests, np.zeros(nwords, dtype=np.uint64)))
+            self._since_full = 0
+            print(f"[CMIN] full pass: {len(self.coverage.tests)} tests → {len(self.kept)} kept "
+                  f"(was {before})")
+        else:
+            self.kept &= self.coverage.tests.keys()
+            covered = np.zeros(nwords, dtype=np.uint64)
+            for t in self.kept:
+                covered |= self.coverage.test_bitset(t, nwords)
+            added = self._cover(set(new_ids) - self.kept, covered)
+            self.kept.update(added)
+            self._since_full += len(added)
+            print(f"[CMIN] +{len(added)} kept ({len(self.kept)} total)")
+        self.save()
+        return self.kept
+
+    def prune(self, corpus_dir: Path, dry_run: bool = False) -> List[Path]:
+        """Remove corpus files of tests outside the cover, and stale duplicates.
+
+        Files of tests with no recorded coverage are left alone: there is
+        nothing to judge them by.
+        """
+        by_id: Dict[str, List[Path]] = {}
+        for f in corpus_dir.glob("*.[sS]"):
+            by_id.setdefault(f.stem.split("_")[0], []).append(f)
+        removed = []
+        for tc_id, files in by_id.items():
+            files.sort(key=lambda f: f.stat().st_mtime, reverse=True)
+            if tc_id not in self.coverage.tests:
+                continue  # no coverage record: leave every copy alone
+            if tc_id not in self.kept:
+                removed += files
+            else:
+                removed += files[1:]  # older weight-suffixed copies
+        for f in removed:
+            if not dry_run:
+                f.unlink()
+        print(f"[CMIN] {'would prune' if dry_run else 'pruned'} {len(removed)} files from {corpus_dir}")
+        return removed
+
+def build_minimizer(config: dict, wcache: WeightCache, coverage: CoverageFusion) -> CorpusMinimizer:
+    cfg = config.get("cmin", {})
+    return CorpusMinimizer(coverage, wcache, ROOT / cfg.get("state", "cmin.json"),
+                           full_every=cfg.get("full_every", 256))
+
+def main():
+    ap = argparse.ArgumentParser(description="Minimise corpus/runtime by coverage")
+    ap.add_argument("--full", action="store_true", help="re-cover every test, not just new ones")
+    ap.add_argument("--dry-run", action="store_true", help="report what would be pruned")
+    args = ap.parse_args()
+
+    config = yaml.safe_load((ROOT / "config.yaml").read_text())
+    wcache = WeightCache(ROOT / "wcache.json", config["wcache"])
+    coverage = CoverageFusion(ROOT / config["coverage"]["bitmap"])
+    cmin = build_minimizer(config, wcache, coverage)
+    new = None if args.full else coverage.tests.keys() - cmin.kept
+    cmin.minimize(new, full=args.full)
+    cmin.prune(ROOT / "corpus" / "runtime", dry_run=args.dry_run)
+
+if __name__ == "__main__":
+    main()
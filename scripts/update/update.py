@@ -1,21 +1,48 @@
-# scripts/5_update.py
+# scripts/update/update.py
+import sys
+from pathlib import Path
+
+# === Add project root ===
+ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT))
+
+from utils.models import Testcase
 from utils.wcache import WeightCache
+from scripts.analyse.coverage_fusion import CoverageFusion
+from scripts.update.cmin import build_minimizer
+from typing import Dict, List
 import yaml, shutil
-from pathlib import Path
 
-CONFIG = yaml.safe_load(Path("../config.yaml").read_text())
-WCACHE = WeightCache(Path("../wcache.json"), CONFIG["wcache"])
-RUNTIME_CORPUS = Path("../corpus/runtime")
+CONFIG = yaml.safe_load((ROOT / "config.yaml").read_text())
+WCACHE = WeightCache(ROOT / "wcache.json", CONFIG["wcache"])
+RUNTIME_CORPUS = ROOT / "corpus" / "runtime"
 RUNTIME_CORPUS.mkdir(exist_ok=True)
 
+def promote(candidates: Dict[str, Testcase], wcache: WeightCache,
+            threshold: float, k: int = 5) -> List[Testcase]:
+    """Copy the top-k W$ entries found in `candidates` into the runtime corpus."""
+    promoted = []
+    for tc_id, w in wcache.top_k(k):
+        tc = candidates.get(tc_id)
+        if tc is not None and w > threshold:
+            dst = RUNTIME_CORPUS / f"{tc_id}_{w:.3f}.s"
+            dst.write_text(tc.code)
+            promoted.append(tc)
+    return promoted
+
 def update():
     top = WCACHE.top_k(5)
     for tc_id, w in top:
-        src = Path("../queue_mutate") / f"{tc_id}.s"
+        src = ROOT / "queue_mutate" / f"{tc_id}.s"
         if src.exists() and w > CONFIG["wcache"]["promote_threshold"]:
             dst = RUNTIME_CORPUS / f"{tc_id}_{w:.3f}.s"
             shutil.copy(src, dst)
     print(f"[UPDATE] → {len(top)} seeds promoted")
+    if CONFIG.get("cmin", {}).get("enabled", True):
+        coverage = CoverageFusion(ROOT / CONFIG["coverage"]["bitmap"])
+        cmin = build_minimizer(CONFIG, WCACHE, coverage)
+        cmin.minimize(coverage.tests.keys() - cmin.kept)
+        cmin.prune(RUNTIME_CORPUS)
 
 if __name__ == "__main__":
-    update()
\ No newline at end of file
+    update()
@@ -0,0 +1,130 @@
+# utils/lineage.py
+"""
+Reproducible mutation: derived RNGs + a lineage index (SQLite)
+- derive_rng(run_seed, key) seeds a private random.Random from sha256 of
+  the run seed and a key; mutate_seed uses "<parent id>/<nonce>/<mutator>"
+  so every mutation round has its own stream, independent of thread or
+  task scheduling
+- lineage(id, parent, parent_hash, mutator, run_seed, rng_key, ops,
+  weights, code) holds one row per mutant (weights: the operator
+  probabilities the mutator drew with); code (zlib) is only kept for
+  mutators that cannot be re-run from the rng (the LLM), everything else
+  is rebuilt by scripts/mutate/replay.py
+- record() buffers rows; flush() writes them in one transaction
+  (`with lineage:` batches like WeightCache)
+"""
+import json
+import zlib
+import random
+import sqlite3
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .models import Testcase
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS lineage (
+    id          TEXT PRIMARY KEY,
+    parent      TEXT,
+    parent_hash TEXT,
+    mutator     TEXT NOT NULL,
+    run_seed    INTEGER,
+    rng_key     TEXT,
+    ops         TEXT,
+    weights     TEXT,
+    code        BLOB,
+    added       REAL NOT NULL DEFAULT (julianday('now'))
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS lineage_parent ON lineage (parent);
+"""
+
+def derive_seed(run_seed: int, key: str) -> int:
+    digest = hashlib.sha256(f"{run_seed}/{key}".encode()).digest()
+    return int.from_bytes(digest[:8], "little")
+
+def derive_rng(run_seed: int, key: str) -> random.Random:
+    return random.Random(derive_seed(run_seed, key))
+
+def code_hash(code: str) -> str:
+    """Same id scheme as Testcase.from_file / the seed store."""
+    return hashlib.sha256(code.encode()).hexdigest()[:12]
+
+class LineageIndex:
+    def __init__(self, path: Path, flush_every: int = 256):
+        self.path = path
+        self.flush_every = flush_every
+        self._pending: List[tuple] = []
+        self._batch_depth = 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        if "weights" not in {r[1] for r in self.db.execute("PRAGMA table_info(lineage)")}:
+            self.db.execute("ALTER TABLE lineage ADD COLUMN weights TEXT")
+
+    def close(self):
+        self.flush()
+        self.db.close()
+
+    def __len__(self) -> int:
+        self.flush()
+        return self.db.execute("SELECT COUNT(*) FROM lineage").fetchone()[0]
+
+    def __enter__(self):
+        self._batch_depth += 1
+        return self
+
+    def __exit__(self, *exc):
+        self._batch_depth -= 1
+        if self._batch_depth == 0:
+            self.flush()
+
+    # === Writes ===
+    def record(self, tc: Testcase, keep_code: bool = False):
+        """Index a mutant from its metadata (parent, parent_hash, mutator, run_seed, rng, ops, weights)."""
+        m = tc.metadata
+        code = zlib.compress(tc.code.encode()) if keep_code else None
+        weights = json.dumps(m["weights"], separators=(",", ":")) if m.get("weights") else None
+        self._pending.append((tc.id, m.get("parent"), m.get("parent_hash"), m.get("mutator", tc.source),
+                              m.get("run_seed"), m.get("rng"), json.dumps(m.get("ops", []), separators=(",", ":")),
+                              weights, code))
+        if self._batch_depth == 0 or len(self._pending) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        with self.db:
+            self.db.executemany(
+                "INSERT OR IGNORE INTO lineage (id, parent, parent_hash, mutator, run_seed, rng_key, ops, weights, "
+                "code) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", self._pending)
+        self._pending.clear()
+
+    # === Queries ===
+    def get(self, tc_id: str) -> Optional[Dict]:
+        self.flush()
+        row = self.db.execute(
+            "SELECT parent, parent_hash, mutator, run_seed, rng_key, ops, weights, code FROM lineage WHERE id = ?",
+            (tc_id,)).fetchone()
+        if row is None:
+            return None
+        parent, parent_hash, mutator, run_seed, rng_key, ops, weights, code = row
+        return {"id": tc_id, "parent": parent, "parent_hash": parent_hash, "mutator": mutator,
+                "run_seed": run_seed, "rng": rng_key, "ops": json.loads(ops or "[]"),
+                "weights": json.loads(weights) if weights else None,
+                "code": zlib.decompress(code).decode() if code is not None else None}
+
+    def chain(self, tc_id: str) -> List[Dict]:
+        """Records from `tc_id` back to the first ancestor that is not a mutant."""
+        out, seen = [], set()
+        while tc_id and tc_id not in seen and (rec := self.get(tc_id)) is not None:
+            seen.add(tc_id)
+            out.append(rec)
+            tc_id = rec["parent"]
+        return out
+
+    def children(self, tc_id: str) -> List[str]:
+        self.flush()
+        return [r[0] for r in self.db.execute("SELECT id FROM lineage WHERE parent = ?", (tc_id,))]
@@ -4,16 +4,29 @@ General-Purpose LLM Interface for \name\ Pipeline
 - Single source of truth for API client
 - Prompt + response + token logging
 - Retry, timeout, error handling
+- AsyncLLM: concurrent calls behind a semaphore and a requests/min token
+  bucket, jittered exponential backoff on rate-limit/timeout errors
+  (Retry-After pauses the whole bucket), and hedged duplicates for
+  requests slower than the recent latency quantile
+- Responses are cached on disk (llm.cache, utils/llmcache.py) by prompt,
+  model and sampling parameters, with n variants per key
 - NO hardware-specific logic
 """
 
 import os
+import time
+import atexit
+import random
+import asyncio
 import logging
-from typing import Tuple, Optional, Dict, Any
+from collections import Counter, deque
+from typing import Tuple, Optional, Dict, Any, List
 import openai
-from openai import OpenAI, APIError, RateLimitError, Timeout
+from openai import (OpenAI, AsyncOpenAI, APIError, APIStatusError, APIConnectionError,
+                    APITimeoutError, RateLimitError)
 from pathlib import Path
 import yaml
+from .llmcache import LLMCache, cache_key
 
 # === Logging ===
 log = logging.getLogger("llm")
@@ -39,9 +52,31 @@ os.environ["OPENAI_API_KEY"] = LLM_CONFIG.get("api_key")
 client = OpenAI(
     api_key=os.environ.get("OPENAI_API_KEY"),
     base_url=os.environ.get("OPENAI_API_BASE"),
-    timeout=openai.Timeout(LLM_CONFIG.get("time_sec"), connect=LLM_CONFIG.get("time_sec"))
+    timeout=openai.Timeout(LLM_CONFIG.get("timeout_sec", 600), connect=LLM_CONFIG.get("timeout_sec", 600))
 )
 
+# === Response Cache ===
+def build_cache(cfg: Dict[str, Any]) -> Optional[LLMCache]:
+    if not cfg.get("enabled", False):
+        return None
+    cache = LLMCache(CONFIG_PATH.parent / cfg.get("path", "llm_cache.sqlite"),
+                     variants=cfg.get("variants", 1), ttl_sec=cfg.get("ttl_sec", 0),
+                     max_entries=cfg.get("max_entries", 100000))
+    atexit.register(cache.flush_stats)
+    return cache
+
+CACHE = build_cache(LLM_CONFIG.get("cache", {}))
+
+def _cache_lookup(cache: Optional[LLMCache], variants: Optional[int], *params) -> Tuple[Optional[str], Any]:
+    """(key, cached response or None); key is None when caching is off."""
+    if cache is None:
+        return None, None
+    key = cache_key(*params)
+    hit = cache.get(key, variants)
+    if hit is not None:
+        log.info(f"[LLM] Cache hit | {params[2]} | {hit[1]}+{hit[2]} tokens saved")
+    return key, hit
+
 # === General Call ===
 def call(
     user_prompt: str,
@@ -49,9 +84,12 @@ def call(
     model: Optional[str] = None,
     temperature: Optional[float] = None,
     max_tokens: Optional[int] = None,
+    variants: Optional[int] = None,
+    cache: bool = True,
 ) -> Tuple[str, int, int]:
     """
     General LLM call.
+    variants: distinct cached responses kept for this prompt (llm.cache.variants by default)
     Returns: (response_text, prompt_tokens, completion_tokens)
     """
     model = model or LLM_CONFIG.get("model", "gpt-4o")
@@ -59,6 +97,11 @@ def call(
     max_tokens = max_tokens or LLM_CONFIG.get("max_tokens", 2048)
     system_prompt = system_prompt or LLM_CONFIG.get("system_prompt", "You are a helpful assistant.")
 
+    key, hit = _cache_lookup(CACHE if cache else None, variants,
+                             system_prompt, user_prompt, model, temperature, max_tokens)
+    if hit is not None:
+        return hit
+
     messages = [{"role": "system", "content": system_prompt}]
     messages.append({"role": "user", "content": user_prompt})
 
@@ -75,17 +118,213 @@ def call(
         c_tokens = response.usage.completion_tokens
 
         log.info(f"[LLM] Success | {model} | {p_tokens}+{c_tokens} tokens")
+        if key is not None:
+            CACHE.put(key, content, p_tokens, c_tokens, variants)
         return content, p_tokens, c_tokens
 
     except RateLimitError as e:
         log.error(f"[LLM] Rate limit: {e}")
         return "", 0, 0
-    except Timeout as e:
+    except APITimeoutError as e:
         log.error(f"[LLM] Timeout: {e}")
         return "", 0, 0
     except APIError as e:
-        log.error(f"[LLM] API error {e.status_code}: {e.message}")
+        log.error(f"[LLM] API error {getattr(e, 'status_code', None)}: {e.message}")
         return "", 0, 0
     except Exception as e:
         log.error(f"[LLM] Unexpected error: {e}")
-        return "", 0, 0
\ No newline at end of file
+        return "", 0, 0
+
+def _messages(user_prompt: str, system_prompt: Optional[str]) -> List[Dict[str, str]]:
+    system_prompt = system_prompt or LLM_CONFIG.get("system_prompt", "You are a helpful assistant.")
+    return [{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}]
+
+# === Async Client ===
+class TokenBucket:
+    """`rate` requests/s, bursts up to `burst`; acquire() waits for a token."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self.tokens = self.burst
+        self.stamp = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds: float):
+        """Server said slow down: nobody gets a token for `seconds`."""
+        if self.rate > 0:
+            self._refill()
+            self.tokens = min(self.tokens, 0.0) - seconds * self.rate
+
+class AsyncLLM:
+    """Concurrent chat completions; call() has the same contract as the sync call()."""
+
+    RETRYABLE = (RateLimitError, APITimeoutError, APIConnectionError)
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None, client: Optional[AsyncOpenAI] = None,
+                 cache: Optional[LLMCache] = CACHE):
+        self.cfg = {**LLM_CONFIG, **(config or {})}
+        self.cache = cache
+        self.concurrency = self.cfg.get("concurrency", 8)
+        self.max_retries = self.cfg.get("max_retries", 5)
+        self.backoff_base = self.cfg.get("backoff_base_sec", 1.0)
+        self.backoff_max = self.cfg.get("backoff_max_sec", 60.0)
+        self.hedge_quantile = self.cfg.get("hedge_quantile", 0.95)
+        self.hedge_min = self.cfg.get("hedge_min_sec", 2.0)
+        self.hedge_budget = self.cfg.get("hedge_budget", 0.1)  # max hedged fraction of requests
+        self.latencies: deque = deque(maxlen=256)
+        self.stats: Counter = Counter()
+        self._client = client
+        self._loop = None
+
+    def _bind(self):
+        """Semaphore, bucket and HTTP client belong to one event loop; rebuild on a new one."""
+        loop = asyncio.get_running_loop()
+        if loop is self._loop:
+            return
+        self._loop = loop
+        self.sem = asyncio.Semaphore(self.concurrency)
+        self.bucket = TokenBucket(self.cfg.get("requests_per_min", 60) / 60.0,
+                                  self.cfg.get("burst", self.concurrency))
+        self.client = self._client or AsyncOpenAI(
+            api_key=self.cfg.get("api_key"), base_url=self.cfg.get("base_url"),
+            timeout=self.cfg.get("timeout_sec", 600), max_retries=0,  # retries are ours
+        )
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        jitter = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        return max(retry_after or 0.0, jitter)
+
+    def hedge_delay(self) -> Optional[float]:
+        if not self.hedge_quantile or len(self.latencies) < 16:
+            return None
+        if self.stats["hedged"] >= self.hedge_budget * self.stats["requests"]:
+            return None
+        ranked = sorted(self.latencies)
+        return max(self.hedge_min, ranked[int(self.hedge_quantile * (len(ranked) - 1))])
+
+    async def _attempt(self, kwargs: Dict[str, Any]):
+        """One logical request: rate-limited, bounded, retried with jitter."""
+        for attempt in range(self.max_retries + 1):
+            await self.bucket.acquire()
+            retry_after = None
+            async with self.sem:
+                t = time.monotonic()
+                try:
+                    response = await self.client.chat.completions.create(**kwargs)
+                    self.latencies.append(time.monotonic() - t)
+                    return response
+                except RateLimitError as e:
+                    self.stats["rate_limited"] += 1
+                    retry_after = float(e.response.headers.get("retry-after", 0) or 0)
+                    self.bucket.pause(retry_after)
+                    error = e
+                except APITimeoutError as e:
+                    self.stats["timeouts"] += 1
+                    error = e
+                except APIConnectionError as e:
+                    error = e
+                except APIStatusError as e:
+                    if e.status_code < 500:
+                        raise
+                    error = e
+            if attempt == self.max_retries:
+                raise error
+            self.stats["retries"] += 1
+            await asyncio.sleep(self._backoff(attempt, retry_after))
+
+    async def _hedged(self, kwargs: Dict[str, Any]):
+        tasks = [asyncio.ensure_future(self._attempt(kwargs))]
+        try:
+            delay = self.hedge_delay()
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done:
+                    self.stats["hedged"] += 1
+                    tasks.append(asyncio.ensure_future(self._attempt(kwargs)))
+            pending, error = set(tasks), None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        self.stats["hedge_wins"] += task is not tasks[0]
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def call(
+        self,
+        user_prompt: str,
+        system_prompt: Optional[str] = None,
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        variants: Optional[int] = None,
+        cache: bool = True,
+    ) -> Tuple[str, int, int]:
+        """Async call(). Returns: (response_text, prompt_tokens, completion_tokens)"""
+        self._bind()
+        model = model or self.cfg.get("model", "gpt-4o")
+        messages = _messages(user_prompt, system_prompt)
+        kwargs = dict(
+            model=model,
+            messages=messages,
+            temperature=temperature or self.cfg.get("temperature", 0.2),
+            max_tokens=max_tokens or self.cfg.get("max_tokens", 2048),
+            stream=False,
+        )
+        key, hit = _cache_lookup(self.cache if cache else None, variants, messages[0]["content"], user_prompt,
+                                 model, kwargs["temperature"], kwargs["max_tokens"])
+        if hit is not None:
+            self.stats["cache_hits"] += 1
+            return hit
+        self.stats["requests"] += 1
+        try:
+            response = await self._hedged(kwargs)
+            content = (response.choices[0].message.content or "").strip()
+            p_tokens = response.usage.prompt_tokens
+            c_tokens = response.usage.completion_tokens
+            log.info(f"[LLM] Success | {model} | {p_tokens}+{c_tokens} tokens")
+            if key is not None:
+                self.cache.put(key, content, p_tokens, c_tokens, variants)
+            return content, p_tokens, c_tokens
+        except RateLimitError as e:
+            log.error(f"[LLM] Rate limit (gave up after {self.max_retries} retries): {e}")
+        except APITimeoutError as e:
+            log.error(f"[LLM] Timeout (gave up after {self.max_retries} retries): {e}")
+        except APIError as e:
+            log.error(f"[LLM] API error {getattr(e, 'status_code', None)}: {e.message}")
+        except Exception as e:
+            log.error(f"[LLM] Unexpected error: {e}")
+        self.stats["failed"] += 1
+        return "", 0, 0
+
+    async def call_many(self, prompts: List[str], **kwargs) -> List[Tuple[str, int, int]]:
+        """All prompts at once; concurrency and rate are bounded by the semaphore/bucket."""
+        return await asyncio.gather(*(self.call(p, **kwargs) for p in prompts))
+
+_ASYNC: Optional[AsyncLLM] = None
+
+def async_client() -> AsyncLLM:
+    """Process-wide AsyncLLM, so every caller shares one rate limit."""
+    global _ASYNC
+    if _ASYNC is None:
+        _ASYNC = AsyncLLM()
+    return _ASYNC
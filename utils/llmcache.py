@@ -0,0 +1,131 @@
+# utils/llmcache.py
+"""
+Persistent LLM response cache (SQLite)
+- key = sha256 of (system prompt, user prompt, model, temperature,
+  max_tokens); each key holds up to `variants` responses so sampling
+  diversity survives caching: a key is a miss until it has n variants,
+  afterwards hits rotate through them (least-served first, so replays are
+  deterministic)
+- ttl_sec expires responses by age, max_entries evicts least recently
+  used ones
+- hits / misses / tokens_saved are counted per process (stats) and
+  accumulated in the database (totals)
+- only successful (non-empty) responses are stored
+"""
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key               TEXT NOT NULL,
+    variant           INTEGER NOT NULL,
+    content           TEXT NOT NULL,
+    prompt_tokens     INTEGER NOT NULL,
+    completion_tokens INTEGER NOT NULL,
+    created           REAL NOT NULL,
+    used              REAL NOT NULL,
+    served            INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (key, variant)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS responses_used ON responses (used);
+CREATE TABLE IF NOT EXISTS counters (
+    name  TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+def cache_key(system_prompt: str, user_prompt: str, model: str, temperature: float, max_tokens: int) -> str:
+    blob = json.dumps([system_prompt, user_prompt, model, temperature, max_tokens], ensure_ascii=False)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+class LLMCache:
+    def __init__(self, path: Path, variants: int = 1, ttl_sec: float = 0, max_entries: int = 100000,
+                 evict_every: int = 256):
+        self.path = path
+        self.variants = max(variants, 1)
+        self.ttl = ttl_sec
+        self.max_entries = max_entries
+        self.evict_every = evict_every
+        self.stats: Counter = Counter()
+        self._flushed: Counter = Counter()
+        self._puts = 0
+        self._lock = threading.Lock()  # sync call() may run in worker threads
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def _fresh_after(self, now: float) -> float:
+        return now - self.ttl if self.ttl else float("-inf")
+
+    def get(self, key: str, variants: Optional[int] = None) -> Optional[Tuple[str, int, int]]:
+        """(content, prompt_tokens, completion_tokens), or None while the key has < n variants."""
+        n = max(variants or self.variants, 1)
+        now = time.time()
+        with self._lock:
+            rows = self.db.execute(
+                "SELECT variant, content, prompt_tokens, completion_tokens FROM responses "
+                "WHERE key = ? AND created >= ? ORDER BY served, variant",
+                (key, self._fresh_after(now))).fetchall()
+            if len(rows) < n:
+                self.stats["misses"] += 1
+                return None
+            variant, content, p_tokens, c_tokens = rows[0]
+            self.db.execute("UPDATE responses SET served = served + 1, used = ? WHERE key = ? AND variant = ?",
+                            (now, key, variant))
+            self.stats["hits"] += 1
+            self.stats["tokens_saved"] += p_tokens + c_tokens
+        return content, p_tokens, c_tokens
+
+    def put(self, key: str, content: str, p_tokens: int, c_tokens: int, variants: Optional[int] = None):
+        if not content:
+            return
+        n = max(variants or self.variants, 1)
+        now = time.time()
+        with self._lock:
+            self.db.execute("DELETE FROM responses WHERE key = ? AND created < ?", (key, self._fresh_after(now)))
+            taken = {v for v, in self.db.execute("SELECT variant FROM responses WHERE key = ?", (key,))}
+            free = next((v for v in range(n) if v not in taken), None)
+            if free is None:  # a concurrent request filled the last slot
+                return
+            self.db.execute("INSERT INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, 0)",
+                            (key, free, content, p_tokens, c_tokens, now, now))
+            self._puts += 1
+            if self._puts % self.evict_every == 0:
+                self._evict(now)
+
+    def _evict(self, now: float):
+        if self.ttl:
+            self.db.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+        excess = self.db.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_entries
+        if excess > 0:
+            self.db.execute("DELETE FROM responses WHERE (key, variant) IN "
+                            "(SELECT key, variant FROM responses ORDER BY used LIMIT ?)", (excess,))
+
+    def flush_stats(self):
+        """Add this process's counters to the persisted totals."""
+        with self._lock:
+            for name, value in (self.stats - self._flushed).items():
+                self.db.execute("INSERT INTO counters VALUES (?, ?) "
+                                "ON CONFLICT (name) DO UPDATE SET value = value + excluded.value", (name, value))
+            self._flushed = self.stats.copy()
+
+    def totals(self) -> Dict[str, int]:
+        """Counters over every run that used this cache file."""
+        with self._lock:
+            persisted = Counter(dict(self.db.execute("SELECT name, value FROM counters")))
+        return dict(persisted + (self.stats - self._flushed))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
@@ -0,0 +1,148 @@
+# utils/novelty.py
+"""
+Novelty index: MinHash signatures of instruction n-grams + LSH buckets
+- Shingles: each normalised instruction, plus opcode n-grams
+- novelty(code) = 1 - highest estimated Jaccard similarity to any indexed
+  testcase sharing an LSH bucket (1.0 when nothing is close)
+- Persisted as an append-only file of (id, signature) records; buckets are
+  rebuilt on load, which cuts a torn tail (crash mid-append) back to the
+  last whole record, like the W$ journal; flush() appends with one fsync
+"""
+import os
+import zlib
+import struct
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+from .asm_util import parse_instruction
+
+MAGIC = b"LIFUNOV1"
+HEADER = struct.Struct("<8sHH")
+ID_BYTES = 16
+PRIME = (1 << 31) - 1  # Mersenne prime: a*x+b stays inside uint64
+
+def shingles(code: str, ngram: int = 3) -> List[str]:
+    instrs = []
+    for line in code.splitlines():
+        opcode, operands = parse_instruction(line)
+        if opcode:
+            instrs.append((opcode.lower(), ",".join(o.lower() for o in operands)))
+    out = [f"{op} {ops}" for op, ops in instrs]
+    ops = [op for op, _ in instrs]
+    out += ["|".join(ops[i:i + ngram]) for i in range(max(len(ops) - ngram + 1, 0))]
+    return out
+
+class NoveltyIndex:
+    def __init__(self, path: Path, num_perm: int = 64, bands: int = 16, ngram: int = 3):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.path = path
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.ngram = ngram
+        rng = np.random.RandomState(0x11F0)  # fixed: signatures must be stable across runs
+        self.a = rng.randint(1, PRIME, size=num_perm).astype(np.uint64)
+        self.b = rng.randint(0, PRIME, size=num_perm).astype(np.uint64)
+
+        self.ids: List[str] = []
+        self.pos: Dict[str, int] = {}
+        self.sigs = np.zeros((0, num_perm), dtype=np.uint32)
+        self.buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(bands)]
+        self._pending: List[bytes] = []
+        self.load()
+
+    # === Persistence ===
+    def load(self):
+        if not self.path.exists():
+            return
+        raw = self.path.read_bytes()
+        if len(raw) < HEADER.size:  # torn header: start over
+            self._truncate(0)
+            return
+        magic, num_perm, bands = HEADER.unpack_from(raw, 0)
+        if magic != MAGIC or num_perm != self.num_perm or bands != self.bands:
+            raise ValueError(f"{self.path}: incompatible novelty index")
+        rec = ID_BYTES + 4 * num_perm
+        body = raw[HEADER.size:]
+        n = len(body) // rec
+        if HEADER.size + n * rec < len(raw):
+            # cut the torn tail, or the next flush() would append onto it and misalign every record
+            self._truncate(HEADER.size + n * rec)
+        recs = np.frombuffer(body, dtype=np.uint8, count=n * rec).reshape(n, rec)
+        sigs = recs[:, ID_BYTES:].copy().view("<u4")
+        for row in range(n):
+            self._insert(bytes(recs[row, :ID_BYTES]).rstrip(b"\0").decode(), sigs[row])
+
+    def _truncate(self, size: int):
+        with open(self.path, "r+b") as f:
+            f.truncate(size)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def flush(self):
+        """Persist buffered signatures: one append + one fsync."""
+        if not self._pending:
+            return
+        new = not self.path.exists() or self.path.stat().st_size == 0
+        with open(self.path, "ab") as f:
+            if new:
+                f.write(HEADER.pack(MAGIC, self.num_perm, self.bands))
+            f.write(b"".join(self._pending))
+            f.flush()
+            os.fsync(f.fileno())
+        self._pending.clear()
+
+    # === MinHash / LSH ===
+    def signature(self, code: str) -> np.ndarray:
+        sh = shingles(code, self.ngram)
+        if not sh:
+            return np.full(self.num_perm, PRIME, dtype=np.uint32)
+        x = np.fromiter((zlib.crc32(s.encode()) % PRIME for s in sh), dtype=np.uint64, count=len(sh))
+        h = (self.a[:, None] * x[None, :] + self.b[:, None]) % PRIME
+        return h.min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, sig: np.ndarray) -> List[bytes]:
+        return [sig[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def _insert(self, tc_id: str, sig: np.ndarray):
+        row = len(self.ids)
+        self.ids.append(tc_id)
+        self.pos[tc_id] = row
+        if row >= len(self.sigs):  # grow geometrically
+            grown = np.zeros((max(64, 2 * len(self.sigs)), self.num_perm), dtype=np.uint32)
+            grown[:len(self.sigs)] = self.sigs
+            self.sigs = grown
+        self.sigs[row] = sig
+        for band, key in zip(self.buckets, self._band_keys(sig)):
+            band.setdefault(key, []).append(row)
+
+    def nearest(self, sig: np.ndarray, exclude: Optional[str] = None) -> Tuple[Optional[str], float]:
+        """Most similar indexed testcase among LSH candidates, with estimated Jaccard."""
+        cands = set()
+        for band, key in zip(self.buckets, self._band_keys(sig)):
+            cands.update(band.get(key, ()))
+        cands.discard(self.pos.get(exclude))
+        if not cands:
+            return None, 0.0
+        rows = np.fromiter(cands, dtype=np.int64, count=len(cands))
+        sim = (self.sigs[rows] == sig).mean(axis=1)
+        best = int(sim.argmax())
+        return self.ids[rows[best]], float(sim[best])
+
+    def novelty(self, code: str, exclude: Optional[str] = None) -> float:
+        return 1.0 - self.nearest(self.signature(code), exclude)[1]
+
+    def is_duplicate(self, code: str, threshold: float = 0.9) -> bool:
+        return self.nearest(self.signature(code))[1] >= threshold
+
+    def add(self, tc_id: str, code: str) -> float:
+        """Index `code` under `tc_id` and return its novelty w.r.t. everything else."""
+        sig = self.signature(code)
+        novelty = 1.0 - self.nearest(sig, exclude=tc_id)[1]
+        if tc_id not in self.pos:
+            self._insert(tc_id, sig)
+            self._pending.append(tc_id.encode()[:ID_BYTES].ljust(ID_BYTES, b"\0")
+                                 + sig.astype("<u4").tobytes())
+        return novelty
@@ -0,0 +1,970 @@
+# utils/rvisa.py
+"""
+RV64GC (I, M, A, F, D, C, Zicsr, Zifencei) table-driven encoder/decoder
+- OPCODES holds one Op per instruction: match/mask plus operand kinds;
+  decode() tries the candidates for the word's major opcode (RVC: quadrant
+  + funct3) in table order, so specific encodings shadow general ones
+- Text follows `objdump -d -M no-aliases,numeric`: "addi x1,x0,1",
+  "lw x2,8(x1)", "csrrw x1,mstatus,x2", branch/jump targets as absolute
+  hex addresses
+- encode()/assemble() also take ABI register names, common
+  pseudo-instructions and labels, so seeds become words without forking
+  the toolchain; AsmError marks anything outside that subset
+- legal_mask()/decode_many() classify whole NumPy word arrays at once
+
+    python -m utils.rvisa dis 0x00100093 0x4085
+    python -m utils.rvisa check utils/rvisa_golden.dump
+    python -m utils.rvisa record utils/rvisa_golden.dump   # ziglang + capstone
+"""
+import re
+import sys
+import argparse
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+class AsmError(ValueError):
+    """Text the in-process assembler cannot encode."""
+
+# === Operand fields ===
+@dataclass(frozen=True)
+class Field:
+    pieces: Tuple[Tuple[int, int, int], ...]  # (word_lo, width, value_lo)
+    signed: bool = False
+    bits: int = 0  # value width, for sign extension / range checks
+
+    @property
+    def mask(self) -> int:
+        return sum(((1 << w) - 1) << lo for lo, w, _ in self.pieces)
+
+    @property
+    def width(self) -> int:
+        return self.bits or max(vlo + w for _, w, vlo in self.pieces)
+
+    def get(self, word: int) -> int:
+        v = 0
+        for lo, w, vlo in self.pieces:
+            v |= ((word >> lo) & ((1 << w) - 1)) << vlo
+        if self.signed and v >> (self.width - 1) & 1:
+            v -= 1 << self.width
+        return v
+
+    def put(self, v: int) -> int:
+        word = 0
+        for lo, w, vlo in self.pieces:
+            word |= ((v >> vlo) & ((1 << w) - 1)) << lo
+        return word
+
+    def fits(self, v: int) -> bool:
+        n = self.width
+        lo, hi = (-(1 << (n - 1)), (1 << (n - 1)) - 1) if self.signed else (0, (1 << n) - 1)
+        covered = sum(((1 << w) - 1) << vlo for _, w, vlo in self.pieces)
+        return lo <= v <= hi and (v & ((1 << n) - 1) & ~covered) == 0
+
+def F(*pieces, signed=False, bits=0) -> Field:
+    return Field(tuple(pieces), signed, bits)
+
+@dataclass(frozen=True)
+class Kind:
+    field: Optional[Field]
+    style: str           # x f x' f' dec hex20 pcrel csr rm fence lit
+    paren: bool = False  # printed as "(reg)" glued to the preceding immediate
+    literal: int = 0     # register number for fixed operands (sp)
+
+REG5 = lambda lo: F((lo, 5, 0))
+REG3 = lambda lo: F((lo, 3, 0))
+KINDS: Dict[str, Kind] = {
+    "rd": Kind(REG5(7), "x"), "rs1": Kind(REG5(15), "x"), "rs2": Kind(REG5(20), "x"),
+    "(rs1)": Kind(REG5(15), "x", paren=True),
+    "frd": Kind(REG5(7), "f"), "frs1": Kind(REG5(15), "f"), "frs2": Kind(REG5(20), "f"),
+    "frs3": Kind(REG5(27), "f"),
+    "i12": Kind(F((20, 12, 0), signed=True), "dec"),
+    "s12": Kind(F((7, 5, 0), (25, 7, 5), signed=True), "dec"),
+    "b13": Kind(F((8, 4, 1), (25, 6, 5), (7, 1, 11), (31, 1, 12), signed=True), "pcrel"),
+    "j21": Kind(F((21, 10, 1), (20, 1, 11), (12, 8, 12), (31, 1, 20), signed=True), "pcrel"),
+    "u20": Kind(F((12, 20, 12), signed=True), "hex20"),
+    "sh6": Kind(F((20, 6, 0)), "dec"), "sh5": Kind(F((20, 5, 0)), "dec"),
+    "csr": Kind(F((20, 12, 0)), "csr"), "zimm": Kind(F((15, 5, 0)), "dec"),
+    "rm": Kind(F((12, 3, 0)), "rm"),
+    "pred": Kind(F((24, 4, 0)), "fence"), "succ": Kind(F((20, 4, 0)), "fence"),
+    # RVC
+    "crd": Kind(REG5(7), "x"), "crs2": Kind(REG5(2), "x"),
+    "cfrd": Kind(REG5(7), "f"), "cfrs2": Kind(REG5(2), "f"),
+    "crd'": Kind(REG3(2), "x'"), "crs1'": Kind(REG3(7), "x'"), "crs2'": Kind(REG3(2), "x'"),
+    "(crs1')": Kind(REG3(7), "x'", paren=True),
+    "cfrd'": Kind(REG3(2), "f'"), "cfrs2'": Kind(REG3(2), "f'"),
+    "sp": Kind(None, "lit", literal=2), "(sp)": Kind(None, "lit", paren=True, literal=2),
+    "ci6": Kind(F((2, 5, 0), (12, 1, 5), signed=True), "dec"),
+    "cshamt": Kind(F((2, 5, 0), (12, 1, 5)), "dec"),
+    "clui": Kind(F((2, 5, 12), (12, 1, 17), signed=True), "hex20"),
+    "c16sp": Kind(F((12, 1, 9), (6, 1, 4), (5, 1, 6), (3, 2, 7), (2, 1, 5), signed=True), "dec"),
+    "c4spn": Kind(F((11, 2, 4), (7, 4, 6), (6, 1, 2), (5, 1, 3)), "dec"),
+    "clw": Kind(F((10, 3, 3), (6, 1, 2), (5, 1, 6)), "dec"),
+    "cld": Kind(F((10, 3, 3), (5, 2, 6)), "dec"),
+    "clwsp": Kind(F((12, 1, 5), (4, 3, 2), (2, 2, 6)), "dec"),
+    "cldsp": Kind(F((12, 1, 5), (5, 2, 3), (2, 3, 6)), "dec"),
+    "cswsp": Kind(F((9, 4, 2), (7, 2, 6)), "dec"),
+    "csdsp": Kind(F((10, 3, 3), (7, 3, 6)), "dec"),
+    "cj": Kind(F((12, 1, 11), (11, 1, 4), (9, 2, 8), (8, 1, 10), (7, 1, 6), (6, 1, 7), (3, 3, 1),
+                 (2, 1, 5), signed=True), "pcrel"),
+    "cb": Kind(F((12, 1, 8), (10, 2, 3), (5, 2, 6), (3, 2, 1), (2, 1, 5), signed=True), "pcrel"),
+}
+IMM_STYLES = {"dec", "hex20", "pcrel", "csr"}
+
+# === Instruction table ===
+@dataclass(frozen=True)
+class Op:
+    name: str
+    match: int
+    mask: int
+    args: Tuple[str, ...]
+    ext: str
+    size: int = 4
+    nonzero: Tuple[str, ...] = ()  # operands whose encoding 0 is reserved
+    rm_default: int = 7            # rm omitted from text when equal (dyn)
+
+    @property
+    def key(self) -> Tuple[int, int]:
+        return (self.match & 0x7F, 0) if self.size == 4 else (self.match & 0x3, self.match >> 13 & 0x7)
+
+OPCODES: List[Op] = []
+
+def _op(name, match, mask, args, ext, **kw):
+    OPCODES.append(Op(name, match, mask, tuple(a for a in args.split(",") if a), ext, **kw))
+
+M_F3 = 0x0000707F
+M_R = 0xFE00707F
+M_ALL = 0xFFFFFFFF
+
+def _rv64gc():
+    # RV64I
+    _op("lui", 0x37, 0x7F, "rd,u20", "I")
+    _op("auipc", 0x17, 0x7F, "rd,u20", "I")
+    _op("jal", 0x6F, 0x7F, "rd,j21", "I")
+    _op("jalr", 0x67, M_F3, "rd,i12,(rs1)", "I")
+    for f3, n in ((0, "beq"), (1, "bne"), (4, "blt"), (5, "bge"), (6, "bltu"), (7, "bgeu")):
+        _op(n, 0x63 | f3 << 12, M_F3, "rs1,rs2,b13", "I")
+    for f3, n in enumerate(("lb", "lh", "lw", "ld", "lbu", "lhu", "lwu")):
+        _op(n, 0x03 | f3 << 12, M_F3, "rd,i12,(rs1)", "I")
+    for f3, n in enumerate(("sb", "sh", "sw", "sd")):
+        _op(n, 0x23 | f3 << 12, M_F3, "rs2,s12,(rs1)", "I")
+    for f3, n in ((0, "addi"), (2, "slti"), (3, "sltiu"), (4, "xori"), (6, "ori"), (7, "andi")):
+        _op(n, 0x13 | f3 << 12, M_F3, "rd,rs1,i12", "I")
+    _op("slli", 0x1013, 0xFC00707F, "rd,rs1,sh6", "I")
+    _op("srli", 0x5013, 0xFC00707F, "rd,rs1,sh6", "I")
+    _op("srai", 0x40005013, 0xFC00707F, "rd,rs1,sh6", "I")
+    _op("addiw", 0x1B, M_F3, "rd,rs1,i12", "I")
+    _op("slliw", 0x101B, M_R, "rd,rs1,sh5", "I")
+    _op("srliw", 0x501B, M_R, "rd,rs1,sh5", "I")
+    _op("sraiw", 0x4000501B, M_R, "rd,rs1,sh5", "I")
+    for f7, f3, n in ((0, 0, "add"), (0x20, 0, "sub"), (0, 1, "sll"), (0, 2, "slt"), (0, 3, "sltu"),
+                      (0, 4, "xor"), (0, 5, "srl"), (0x20, 5, "sra"), (0, 6, "or"), (0, 7, "and")):
+        _op(n, 0x33 | f3 << 12 | f7 << 25, M_R, "rd,rs1,rs2", "I")
+    for f7, f3, n in ((0, 0, "addw"), (0x20, 0, "subw"), (0, 1, "sllw"), (0, 5, "srlw"), (0x20, 5, "sraw")):
+        _op(n, 0x3B | f3 << 12 | f7 << 25, M_R, "rd,rs1,rs2", "I")
+    _op("fence.tso", 0x8330000F, M_ALL, "", "I")
+    _op("fence", 0x0F, 0xF00FFFFF, "pred,succ", "I")
+    _op("ecall", 0x73, M_ALL, "", "I")
+    _op("ebreak", 0x00100073, M_ALL, "", "I")
+    # Privileged instructions spike/RTL tests use
+    _op("sret", 0x10200073, M_ALL, "", "I")
+    _op("mret", 0x30200073, M_ALL, "", "I")
+    _op("wfi", 0x10500073, M_ALL, "", "I")
+    _op("sfence.vma", 0x12000073, 0xFE007FFF, "rs1,rs2", "I")
+    # Zifencei / Zicsr
+    _op("fence.i", 0x100F, M_ALL, "", "Zifencei")
+    for f3, n in ((1, "csrrw"), (2, "csrrs"), (3, "csrrc")):
+        _op(n, 0x73 | f3 << 12, M_F3, "rd,csr,rs1", "Zicsr")
+    for f3, n in ((5, "csrrwi"), (6, "csrrsi"), (7, "csrrci")):
+        _op(n, 0x73 | f3 << 12, M_F3, "rd,csr,zimm", "Zicsr")
+    # M
+    for f3, n in enumerate(("mul", "mulh", "mulhsu", "mulhu", "div", "divu", "rem", "remu")):
+        _op(n, 0x33 | f3 << 12 | 1 << 25, M_R, "rd,rs1,rs2", "M")
+    for f3, n in ((0, "mulw"), (4, "divw"), (5, "divuw"), (6, "remw"), (7, "remuw")):
+        _op(n, 0x3B | f3 << 12 | 1 << 25, M_R, "rd,rs1,rs2", "M")
+    # A
+    for width, f3 in (("w", 2), ("d", 3)):
+        for order, aqrl in (("", 0), (".aq", 2), (".rl", 1), (".aqrl", 3)):
+            base = 0x2F | f3 << 12 | aqrl << 25
+            _op(f"lr.{width}{order}", base | 0x02 << 27, 0xFFF0707F, "rd,(rs1)", "A")
+            for f5, n in ((0x03, "sc"), (0x01, "amoswap"), (0x00, "amoadd"), (0x04, "amoxor"),
+                          (0x0C, "amoand"), (0x08, "amoor"), (0x10, "amomin"), (0x14, "amomax"),
+                          (0x18, "amominu"), (0x1C, "amomaxu")):
+                _op(f"{n}.{width}{order}", base | f5 << 27, 0xFE00707F, "rd,rs2,(rs1)", "A")
+    # F / D
+    for fmt, sfx, ext in ((0, "s", "F"), (1, "d", "D")):
+        _op(f"fl{'w' if fmt == 0 else 'd'}", 0x07 | (2 + fmt) << 12, M_F3, "frd,i12,(rs1)", ext)
+        _op(f"fs{'w' if fmt == 0 else 'd'}", 0x27 | (2 + fmt) << 12, M_F3, "frs2,s12,(rs1)", ext)
+        for opc, n in ((0x43, "fmadd"), (0x47, "fmsub"), (0x4B, "fnmsub"), (0x4F, "fnmadd")):
+            _op(f"{n}.{sfx}", opc | fmt << 25, 0x0600007F, "frd,frs1,frs2,frs3,rm", ext)
+        for f5, n in ((0x00, "fadd"), (0x01, "fsub"), (0x02, "fmul"), (0x03, "fdiv")):
+            _op(f"{n}.{sfx}", 0x53 | (f5 << 2 | fmt) << 25, 0xFE00007F, "frd,frs1,frs2,rm", ext)
+        _op(f"fsqrt.{sfx}", 0x53 | (0x0B << 2 | fmt) << 25, 0xFFF0007F, "frd,frs1,rm", ext)
+        for f3, n in ((0, "fsgnj"), (1, "fsgnjn"), (2, "fsgnjx")):
+            _op(f"{n}.{sfx}", 0x53 | f3 << 12 | (0x04 << 2 | fmt) << 25, M_R, "frd,frs1,frs2", ext)
+        for f3, n in ((0, "fmin"), (1, "fmax")):
+            _op(f"{n}.{sfx}", 0x53 | f3 << 12 | (0x05 << 2 | fmt) << 25, M_R, "frd,frs1,frs2", ext)
+        for f3, n in ((2, "feq"), (1, "flt"), (0, "fle")):
+            _op(f"{n}.{sfx}", 0x53 | f3 << 12 | (0x14 << 2 | fmt) << 25, M_R, "rd,frs1,frs2", ext)
+        _op(f"fclass.{sfx}", 0x53 | 1 << 12 | (0x1C << 2 | fmt) << 25, 0xFFF0707F, "rd,frs1", ext)
+        _op(f"fmv.x.{'w' if fmt == 0 else 'd'}", 0x53 | (0x1C << 2 | fmt) << 25, 0xFFF0707F, "rd,frs1", ext)
+        _op(f"fmv.{'w' if fmt == 0 else 'd'}.x", 0x53 | (0x1E << 2 | fmt) << 25, 0xFFF0707F, "frd,rs1", ext)
+        for rs2, t in ((0, "w"), (1, "wu"), (2, "l"), (3, "lu")):
+            _op(f"fcvt.{t}.{sfx}", 0x53 | rs2 << 20 | (0x18 << 2 | fmt) << 25, 0xFFF0007F, "rd,frs1,rm", ext)
+            exact = fmt == 1 and t in ("w", "wu")  # int32 → double never rounds
+            _op(f"fcvt.{sfx}.{t}", 0x53 | rs2 << 20 | (0x1A << 2 | fmt) << 25, 0xFFF0007F, "frd,rs1,rm",
+                ext, rm_default=0 if exact else 7)
+    _op("fcvt.s.d", 0x53 | 1 << 20 | 0x20 << 25, 0xFFF0007F, "frd,frs1,rm", "D")
+    _op("fcvt.d.s", 0x53 | 0x21 << 25, 0xFFF0007F, "frd,frs1,rm", "D", rm_default=0)
+    # C (RV64)
+    c = lambda name, match, mask, args, **kw: _op(name, match, mask, args, "C", size=2, **kw)
+    c("c.addi4spn", 0x0000, 0xE003, "crd',sp,c4spn", nonzero=("c4spn",))
+    c("c.fld", 0x2000, 0xE003, "cfrd',cld,(crs1')")
+    c("c.lw", 0x4000, 0xE003, "crd',clw,(crs1')")
+    c("c.ld", 0x6000, 0xE003, "crd',cld,(crs1')")
+    c("c.fsd", 0xA000, 0xE003, "cfrs2',cld,(crs1')")
+    c("c.sw", 0xC000, 0xE003, "crs2',clw,(crs1')")
+    c("c.sd", 0xE000, 0xE003, "crs2',cld,(crs1')")
+    c("c.nop", 0x0001, 0xFFFF, "")
+    c("c.addi", 0x0001, 0xE003, "crd,ci6")
+    c("c.addiw", 0x2001, 0xE003, "crd,ci6", nonzero=("crd",))
+    c("c.li", 0x4001, 0xE003, "crd,ci6")
+    c("c.addi16sp", 0x6101, 0xEF83, "sp,c16sp", nonzero=("c16sp",))
+    c("c.lui", 0x6001, 0xE003, "crd,clui", nonzero=("clui",))
+    c("c.srli", 0x8001, 0xEC03, "crs1',cshamt")
+    c("c.srai", 0x8401, 0xEC03, "crs1',cshamt")
+    c("c.andi", 0x8801, 0xEC03, "crs1',ci6")
+    for bit12, f2, n in ((0, 0, "c.sub"), (0, 1, "c.xor"), (0, 2, "c.or"), (0, 3, "c.and"),
+                         (1, 0, "c.subw"), (1, 1, "c.addw")):
+        c(n, 0x8C01 | bit12 << 12 | f2 << 5, 0xFC63, "crs1',crs2'")
+    c("c.j", 0xA001, 0xE003, "cj")
+    c("c.beqz", 0xC001, 0xE003, "crs1',cb")
+    c("c.bnez", 0xE001, 0xE003, "crs1',cb")
+    c("c.slli", 0x0002, 0xE003, "crd,cshamt")
+    c("c.fldsp", 0x2002, 0xE003, "cfrd,cldsp,(sp)")
+    c("c.lwsp", 0x4002, 0xE003, "crd,clwsp,(sp)", nonzero=("crd",))
+    c("c.ldsp", 0x6002, 0xE003, "crd,cldsp,(sp)", nonzero=("crd",))
+    c("c.jr", 0x8002, 0xF07F, "crd", nonzero=("crd",))
+    c("c.mv", 0x8002, 0xF003, "crd,crs2", nonzero=("crs2",))
+    c("c.ebreak", 0x9002, 0xFFFF, "")
+    c("c.jalr", 0x9002, 0xF07F, "crd", nonzero=("crd",))
+    c("c.add", 0x9002, 0xF003, "crd,crs2", nonzero=("crs2",))
+    c("c.fsdsp", 0xA002, 0xE003, "cfrs2,csdsp,(sp)")
+    c("c.swsp", 0xC002, 0xE003, "crs2,cswsp,(sp)")
+    c("c.sdsp", 0xE002, 0xE003, "crs2,csdsp,(sp)")
+
+_rv64gc()
+BY_NAME: Dict[str, Op] = {op.name: op for op in OPCODES}
+BY_KEY: Dict[Tuple[int, int], List[Op]] = {}
+for _o in OPCODES:
+    BY_KEY.setdefault(_o.key, []).append(_o)
+
+# === Names ===
+ABI = ["zero", "ra", "sp", "gp", "tp", "t0", "t1", "t2", "s0", "s1"] + [f"a{i}" for i in range(8)] \
+    + [f"s{i}" for i in range(2, 12)] + [f"t{i}" for i in range(3, 7)]
+FABI = [f"ft{i}" for i in range(8)] + ["fs0", "fs1"] + [f"fa{i}" for i in range(8)] \
+    + [f"fs{i}" for i in range(2, 12)] + [f"ft{i}" for i in range(8, 12)]
+XREG = {**{f"x{i}": i for i in range(32)}, **{n: i for i, n in enumerate(ABI)}, "fp": 8}
+FREG = {**{f"f{i}": i for i in range(32)}, **{n: i for i, n in enumerate(FABI)}}
+CSR_NAMES = {
+    0x001: "fflags", 0x002: "frm", 0x003: "fcsr",
+    0x100: "sstatus", 0x104: "sie", 0x105: "stvec", 0x106: "scounteren", 0x140: "sscratch",
+    0x141: "sepc", 0x142: "scause", 0x143: "stval", 0x144: "sip", 0x180: "satp",
+    0x300: "mstatus", 0x301: "misa", 0x302: "medeleg", 0x303: "mideleg", 0x304: "mie",
+    0x305: "mtvec", 0x306: "mcounteren", 0x340: "mscratch", 0x341: "mepc", 0x342: "mcause",
+    0x343: "mtval", 0x344: "mip", 0x3A0: "pmpcfg0", 0x3B0: "pmpaddr0",
+    0xB00: "mcycle", 0xB02: "minstret", 0xC00: "cycle", 0xC01: "time", 0xC02: "instret",
+    0xF11: "mvendorid", 0xF12: "marchid", 0xF13: "mimpid", 0xF14: "mhartid",
+}
+CSR_NUM = {n: v for v, n in CSR_NAMES.items()}
+RM_NAMES = ["rne", "rtz", "rdn", "rup", "rmm", None, None, "dyn"]
+FENCE_BITS = "iorw"
+
+# === Decoding ===
+@dataclass
+class Insn:
+    op: Op
+    word: int
+    values: Tuple[Optional[int], ...]
+    pc: int = 0
+
+    @property
+    def name(self) -> str:
+        return self.op.name
+
+    @property
+    def size(self) -> int:
+        return self.op.size
+
+    def get(self, kind: str) -> Optional[int]:
+        return self.values[self.op.args.index(kind)] if kind in self.op.args else None
+
+    def operands(self) -> List[str]:
+        toks: List[str] = []
+        prev_imm = False
+        for kind_name, v in zip(self.op.args, self.values):
+            kind = KINDS[kind_name]
+            if kind.style == "rm" and v == self.op.rm_default:
+                continue
+            tok = _fmt(kind, v, self.pc)
+            if kind.paren:
+                tok = f"({tok})"
+                if prev_imm:
+                    toks[-1] += tok
+                    prev_imm = False
+                    continue
+            toks.append(tok)
+            prev_imm = kind.style in IMM_STYLES
+        return toks
+
+    def text(self) -> str:
+        ops = ",".join(self.operands())
+        return f"{self.name} {ops}" if ops else self.name
+
+    __str__ = text
+
+def _fmt(kind: Kind, v: Optional[int], pc: int) -> str:
+    s = kind.style
+    if s == "lit":
+        return f"x{kind.literal}"
+    if s == "x":
+        return f"x{v}"
+    if s == "f":
+        return f"f{v}"
+    if s == "x'":
+        return f"x{v + 8}"
+    if s == "f'":
+        return f"f{v + 8}"
+    if s == "hex20":
+        return f"0x{(v >> 12) & 0xFFFFF:x}"
+    if s == "pcrel":
+        return f"0x{(pc + v) & (1 << 64) - 1:x}"
+    if s == "csr":
+        return CSR_NAMES.get(v, f"0x{v:x}")
+    if s == "rm":
+        return RM_NAMES[v] or str(v)
+    if s == "fence":
+        return "".join(b for i, b in enumerate(FENCE_BITS) if v >> (3 - i) & 1) or "0"
+    return str(v)
+
+def _check(op: Op, word: int) -> Optional[Tuple[Optional[int], ...]]:
+    values = tuple(KINDS[a].field.get(word) if KINDS[a].field else None for a in op.args)
+    for a, v in zip(op.args, values):
+        if a == "rm" and RM_NAMES[v] is None and op.rm_default == 7:  # exact conversions ignore rm
+            return None
+        if a in op.nonzero and not v:
+            return None
+    return values
+
+def decode(word: int, pc: int = 0) -> Optional[Insn]:
+    """One instruction (16-bit if the low two bits are not 0b11); None if illegal."""
+    if word & 0x3 == 0x3:
+        key = (word & 0x7F, 0)
+        word &= 0xFFFFFFFF
+    else:
+        word &= 0xFFFF
+        key = (word & 0x3, word >> 13 & 0x7)
+    for op in BY_KEY.get(key, ()):
+        if word & op.mask == op.match:
+            values = _check(op, word)
+            if values is not None:
+                return Insn(op, word, values, pc)
+    return None
+
+# (mask, match, nonzero field masks, rm checked) per key: legal() skips building an Insn
+_LEGAL = {key: [(op.mask, op.match, tuple(KINDS[a].field.mask for a in op.nonzero),
+                 "rm" in op.args and op.rm_default == 7) for op in ops] for key, ops in BY_KEY.items()}
+
+def legal(word: int) -> bool:
+    """decode(word) is not None, without decoding the operands."""
+    if word & 0x3 == 0x3:
+        key = (word & 0x7F, 0)
+        word &= 0xFFFFFFFF
+    else:
+        word &= 0xFFFF
+        key = (word & 0x3, word >> 13 & 0x7)
+    for mask, match, nz, rm in _LEGAL.get(key, ()):
+        if word & mask == match and all(word & m for m in nz) and not (rm and word >> 12 & 7 in (5, 6)):
+            return True
+    return False
+
+def split_words(blob: bytes) -> List[Tuple[int, int]]:
+    """Raw .text bytes → [(size, word)], 16-bit RVC or 32-bit by the low bits."""
+    out, pos = [], 0
+    while pos + 2 <= len(blob):
+        half = int.from_bytes(blob[pos:pos + 2], "little")
+        if half & 0x3 == 0x3 and pos + 4 <= len(blob):
+            out.append((4, int.from_bytes(blob[pos:pos + 4], "little")))
+            pos += 4
+        else:
+            out.append((2, half))
+            pos += 2
+    return out
+
+def pack(words: Sequence[Tuple[int, int]]) -> bytes:
+    return b"".join(w.to_bytes(size, "little") for size, w in words)
+
+def disassemble(words: Sequence[Tuple[int, int]], pc: int = 0) -> List[Optional[Insn]]:
+    out = []
+    for size, w in words:
+        out.append(decode(w, pc))
+        pc += size
+    return out
+
+# === Batched decoding ===
+def decode_many(words: np.ndarray) -> np.ndarray:
+    """Index into OPCODES per word (-1 = illegal). 32-bit words must have low bits 0b11."""
+    w = np.asarray(words, dtype=np.uint64)
+    out = np.full(len(w), -1, dtype=np.int32)
+    rm = (w >> np.uint64(12)) & np.uint64(7)
+    for i in range(len(OPCODES) - 1, -1, -1):  # earlier entries win, like decode()
+        op = OPCODES[i]
+        hit = (w & np.uint64(op.mask)) == np.uint64(op.match)
+        if op.size == 4:
+            hit &= (w & np.uint64(3)) == np.uint64(3)
+        else:
+            hit &= w <= np.uint64(0xFFFF)
+        if "rm" in op.args and op.rm_default == 7:
+            hit &= (rm != np.uint64(5)) & (rm != np.uint64(6))
+        for m in (KINDS[a].field.mask for a in op.nonzero):
+            hit &= (w & np.uint64(m)) != np.uint64(0)
+        out[hit] = i
+    return out
+
+def legal_mask(words: np.ndarray) -> np.ndarray:
+    return decode_many(words) >= 0
+
+# === Encoding ===
+PSEUDO_BRANCH_Z = {"beqz": ("beq", 0), "bnez": ("bne", 0), "bgez": ("bge", 0), "bltz": ("blt", 0),
+                   "blez": ("bge", 1), "bgtz": ("blt", 1)}
+PSEUDO_BRANCH_SWAP = {"bgt": "blt", "ble": "bge", "bgtu": "bltu", "bleu": "bgeu"}
+
+def split_operands(text: str) -> Tuple[str, List[str]]:
+    """'lw a0, 8(sp)' → ('lw', ['a0', '8', '(sp)'])."""
+    text = text.split("#", 1)[0].strip()
+    if not text:
+        return "", []
+    parts = text.split(None, 1)
+    name = parts[0].lower()
+    if len(parts) == 1:
+        return name, []
+    toks = []
+    for tok in parts[1].replace("(", ",(").split(","):
+        tok = tok.strip()
+        if tok:
+            toks.append(tok)
+    return name, toks
+
+def _int(tok: str) -> int:
+    try:
+        return int(tok, 0)
+    except ValueError:
+        raise AsmError(f"bad immediate {tok!r}") from None
+
+def _value(tok: str, labels: Optional[Dict[str, int]]) -> int:
+    if labels and tok in labels:
+        return labels[tok]
+    m = re.fullmatch(r"%(hi|lo)\((\w+)\)", tok)
+    if m:
+        raise AsmError(f"relocation {tok} not supported")
+    return _int(tok)
+
+def _reg(tok: str, table: Dict[str, int], compressed: bool) -> int:
+    tok = tok.strip("()").lower()
+    if tok not in table:
+        raise AsmError(f"bad register {tok!r}")
+    r = table[tok]
+    if compressed:
+        if not 8 <= r <= 15:
+            raise AsmError(f"{tok} is not a compressed register (x8-x15)")
+        r -= 8
+    return r
+
+def _parse_arg(kind_name: str, tok: str, pc: int, labels) -> Optional[int]:
+    kind = KINDS[kind_name]
+    s = kind.style
+    if s == "lit":
+        if _reg(tok, XREG, False) != kind.literal:
+            raise AsmError(f"expected x{kind.literal}, got {tok}")
+        return None
+    if s in ("x", "x'"):
+        return _reg(tok, XREG, s == "x'")
+    if s in ("f", "f'"):
+        return _reg(tok, FREG, s == "f'")
+    if s == "rm":
+        if tok in ("5", "6"):
+            return int(tok)
+        if tok not in RM_NAMES:
+            raise AsmError(f"bad rounding mode {tok!r}")
+        return RM_NAMES.index(tok)
+    if s == "fence":
+        tok = tok.lower()
+        if tok == "0":
+            return 0
+        if not tok or any(ch not in FENCE_BITS for ch in tok):
+            raise AsmError(f"bad fence set {tok!r}")
+        return sum(1 << (3 - FENCE_BITS.index(ch)) for ch in set(tok))
+    if s == "csr":
+        v = CSR_NUM[tok] if tok in CSR_NUM else _int(tok)
+    elif s == "hex20":
+        n = _value(tok, labels)
+        if not -(1 << 19) <= n < (1 << 20):
+            raise AsmError(f"{tok} out of range for a 20-bit upper immediate")
+        v = (n - (1 << 20) if n >> 19 else n) << 12  # c.lui's 6-bit range is left to fits()
+    elif s == "pcrel":
+        v = _value(tok, labels) - pc
+        v = ((v + (1 << 63)) & ((1 << 64) - 1)) - (1 << 63)
+    else:
+        v = _value(tok, labels)
+    if not kind.field.fits(v):
+        raise AsmError(f"{tok} does not fit {kind_name}")
+    return v
+
+def encode_op(op: Op, toks: List[str], pc: int = 0, labels: Optional[Dict[str, int]] = None) -> int:
+    args = list(op.args)
+    toks = list(toks)
+    if "rm" in args and len(toks) == len(args) - 1:
+        toks.append(RM_NAMES[op.rm_default])
+    # "lw x1,(x2)" → offset 0
+    for i, a in enumerate(args):
+        if KINDS[a].paren and i > 0 and KINDS[args[i - 1]].style in IMM_STYLES \
+                and len(toks) == len(args) - 1 and i - 1 < len(toks) and toks[i - 1].startswith("("):
+            toks.insert(i - 1, "0")
+    if len(toks) != len(args):
+        raise AsmError(f"{op.name} takes {len(args)} operands, got {len(toks)}")
+    word = op.match
+    for a, tok in zip(args, toks):
+        kind = KINDS[a]
+        if kind.paren and not tok.startswith("("):
+            raise AsmError(f"{op.name}: expected ({tok})")
+        v = _parse_arg(a, tok, pc, labels)
+        if v is None:
+            continue
+        if a in op.nonzero and not v:
+            raise AsmError(f"{op.name}: {a} must be nonzero")
+        word |= kind.field.put(v)
+    return word
+
+def _expand(name: str, toks: List[str], labels) -> List[Tuple[str, List[str]]]:
+    """Pseudo-instruction → real instructions."""
+    n = len(toks)
+    if name == "nop" and n == 0:
+        return [("addi", ["x0", "x0", "0"])]
+    if name == "mv" and n == 2:
+        return [("addi", [toks[0], toks[1], "0"])]
+    if name == "li" and n == 2:
+        imm = _value(toks[1], labels)
+        if -2048 <= imm < 2048:
+            return [("addi", [toks[0], "x0", str(imm)])]
+        if -(1 << 31) <= imm < (1 << 31):
+            lo = ((imm & 0xFFF) ^ 0x800) - 0x800
+            hi = ((imm - lo) >> 12) & 0xFFFFF
+            out = [("lui", [toks[0], hex(hi)])]
+            return out + [("addiw", [toks[0], toks[0], str(lo)])] if lo else out
+        raise AsmError("li: 64-bit constants not supported")
+    if name == "not" and n == 2:
+        return [("xori", [toks[0], toks[1], "-1"])]
+    if name in ("neg", "negw") and n == 2:
+        return [("sub" if name == "neg" else "subw", [toks[0], "x0", toks[1]])]
+    if name == "sext.w" and n == 2:
+        return [("addiw", [toks[0], toks[1], "0"])]
+    if name == "seqz" and n == 2:
+        return [("sltiu", [toks[0], toks[1], "1"])]
+    if name == "snez" and n == 2:
+        return [("sltu", [toks[0], "x0", toks[1]])]
+    if name == "sltz" and n == 2:
+        return [("slt", [toks[0], toks[1], "x0"])]
+    if name == "sgtz" and n == 2:
+        return [("slt", [toks[0], "x0", toks[1]])]
+    if name == "j" and n == 1:
+        return [("jal", ["x0", toks[0]])]
+    if name == "jal" and n == 1:
+        return [("jal", ["x1", toks[0]])]
+    if name == "jr" and n == 1:
+        return [("jalr", ["x0", "0", f"({toks[0]})"])]
+    if name == "jalr" and n == 1:
+        return [("jalr", ["x1", "0", f"({toks[0]})"])]
+    if name == "jalr" and n == 3 and not toks[2].startswith("("):
+        return [("jalr", [toks[0], toks[2], f"({toks[1]})"])]
+    if name == "ret" and n == 0:
+        return [("jalr", ["x0", "0", "(x1)"])]
+    if name in PSEUDO_BRANCH_Z and n == 2:
+        real, swap = PSEUDO_BRANCH_Z[name]
+        return [(real, ["x0", toks[0], toks[1]] if swap else [toks[0], "x0", toks[1]])]
+    if name in PSEUDO_BRANCH_SWAP and n == 3:
+        return [(PSEUDO_BRANCH_SWAP[name], [toks[1], toks[0], toks[2]])]
+    if name == "csrr" and n == 2:
+        return [("csrrs", [toks[0], toks[1], "x0"])]
+    if name in ("csrw", "csrs", "csrc") and n == 2:
+        return [("csrr" + name[3], ["x0", toks[0], toks[1]])]
+    if name in ("csrwi", "csrsi", "csrci") and n == 2:
+        return [("csrr" + name[3] + "i", ["x0", toks[0], toks[1]])]
+    if name in ("fmv.s", "fmv.d", "fneg.s", "fneg.d", "fabs.s", "fabs.d") and n == 2:
+        real = {"fmv": "fsgnj", "fneg": "fsgnjn", "fabs": "fsgnjx"}[name[:-2]] + name[-2:]
+        return [(real, [toks[0], toks[1], toks[1]])]
+    if name == "fence" and n == 0:
+        return [("fence", ["iorw", "iorw"])]
+    return [(name, toks)]
+
+def _pcrel_pair(name: str, toks: List[str], pc: int, labels,
+                sizing: bool = False) -> Optional[List[Tuple[str, List[str]]]]:
+    """la / call / tail → auipc + addi/jalr (8 bytes); without labels the target must be a number."""
+    if name not in ("la", "call", "tail"):
+        return None
+    if len(toks) != (2 if name == "la" else 1):
+        raise AsmError(f"{name} takes {2 if name == 'la' else 1} operands, got {len(toks)}")
+    if sizing:
+        return [("auipc", ["x0", "0"]), ("addi", ["x0", "x0", "0"])]
+    rd, sym = (toks[0], toks[1]) if name == "la" else ("x1" if name == "call" else "x6", toks[0])
+    off = _value(sym, labels or {}) - pc
+    lo = ((off & 0xFFF) ^ 0x800) - 0x800
+    hi = ((off - lo) >> 12) & 0xFFFFF
+    second = ("addi", [rd, rd, str(lo)]) if name == "la" else \
+        ("jalr", ["x1" if name == "call" else "x0", str(lo), f"({rd})"])
+    return [("auipc", [rd, hex(hi)]), second]
+
+def encode(line: str, pc: int = 0, labels: Optional[Dict[str, int]] = None) -> List[Tuple[int, int]]:
+    """One source line → [(size, word)] (pseudo-instructions may expand to two)."""
+    name, toks = split_operands(line)
+    if not name:
+        return []
+    insns = _pcrel_pair(name, toks, pc, labels) or _expand(name, toks, labels)
+    out = []
+    for real, real_toks in insns:
+        op = BY_NAME.get(real)
+        if op is None:
+            raise AsmError(f"unknown instruction {real!r}")
+        out.append((op.size, encode_op(op, real_toks, pc, labels if labels is not None else {})))
+        pc += op.size
+    return out
+
+LABEL_RE = re.compile(r"^\s*([A-Za-z_.$][\w.$]*|\d+)\s*:")
+MAX_ALIGN = 12  # .align / .p2align exponent: at most a 4 KiB page of padding
+SKIP_DIRECTIVES = (".global", ".globl", ".text", ".type", ".size", ".option", ".file", ".attribute",
+                   ".local", ".weak", ".ident")
+
+def assemble(code: str, pc: int = 0) -> List[Tuple[int, int]]:
+    """A .text-only program → [(size, word)]. Raises AsmError outside the supported subset."""
+    lines = []
+    for raw in code.splitlines():
+        line = raw.split("#", 1)[0].strip()
+        while (m := LABEL_RE.match(line)):
+            lines.append(("label", m.group(1)))
+            line = line[m.end():].strip()
+        if line:
+            lines.append(("stmt", line))
+
+    def sized(stmt: str, addr: int, labels) -> List[Tuple[int, int]]:
+        name, toks = split_operands(stmt)
+        if name.startswith("."):
+            if name.startswith(SKIP_DIRECTIVES) or (name == ".section" and toks and toks[0].startswith(".text")):
+                return []
+            if name in (".word", ".half", ".dword"):
+                size = {".word": 4, ".half": 2, ".dword": 8}[name]
+                out = []
+                for tok in toks:
+                    v = _value(tok, labels) if labels is not None else 0
+                    if size == 8:
+                        out += [(4, v & 0xFFFFFFFF), (4, v >> 32 & 0xFFFFFFFF)]
+                    else:
+                        out.append((size, v & ((1 << 8 * size) - 1)))
+                return out
+            if name in (".align", ".p2align", ".balign"):
+                if not toks:
+                    raise AsmError(f"{name} needs an alignment")
+                n = _int(toks[0])
+                if name == ".balign" and (n <= 0 or n & (n - 1) or n > 1 << MAX_ALIGN):
+                    raise AsmError(f".balign {n}: not a power of two up to {1 << MAX_ALIGN}")
+                if name != ".balign" and not 0 <= n <= MAX_ALIGN:
+                    raise AsmError(f"{name} {n}: out of range 0..{MAX_ALIGN}")
+                align = n if name == ".balign" else 1 << n
+                pad = -addr % align
+                return [(4, 0x13)] * (pad // 4) + [(2, 0x0001)] * (pad % 4 // 2)
+            if name in (".equ", ".set"):
+                if len(toks) != 2:
+                    raise AsmError(f"{name} takes a name and a value")
+                return []
+            raise AsmError(f"unsupported directive {name}")
+        if labels is None:  # sizing pass: resolve nothing, but the shape must be right
+            name2, toks2 = split_operands(stmt)
+            if name2 == "li" and len(toks2) == 2:
+                try:
+                    imm = _int(toks2[1])
+                except AsmError:
+                    raise AsmError("li with a symbolic value is not supported") from None
+                return [(4, 0)] * (1 if -2048 <= imm < 2048 or imm & 0xFFF == 0 else 2)
+            insns = _pcrel_pair(name2, toks2, addr, None, sizing=True) or _expand(name2, toks2, {})
+            return [(BY_NAME[r].size if r in BY_NAME else 4, 0) for r, _ in insns]
+        return encode(stmt, addr, labels)
+
+    # pass 1: addresses
+    labels: Dict[str, int] = {}
+    addr = pc
+    for kind, item in lines:
+        if kind == "label":
+            labels[item] = addr
+            continue
+        name, toks = split_operands(item)
+        if name in (".equ", ".set") and len(toks) == 2:
+            labels[toks[0]] = _value(toks[1], labels)
+            continue
+        addr += sum(s for s, _ in sized(item, addr, None))
+    # pass 2: encode
+    out: List[Tuple[int, int]] = []
+    addr = pc
+    for kind, item in lines:
+        if kind == "label":
+            continue
+        words = sized(item, addr, labels)
+        out += words
+        addr += sum(s for s, _ in words)
+    return out
+
+def parse(line: str) -> Tuple[str, List[str]]:
+    """(mnemonic, operands) of one line; .word/.half lines decode to the
+    instruction they hold. Labels/directives → ('', [])."""
+    line = line.split("#", 1)[0].strip()
+    while (m := LABEL_RE.match(line)):
+        line = line[m.end():].strip()
+    if not line:
+        return "", []
+    name, toks = split_operands(line)
+    if name in (".word", ".half") and len(toks) == 1:
+        try:
+            insn = decode(int(toks[0], 0))
+        except ValueError:
+            insn = None
+        if insn is not None:
+            return insn.name, insn.operands()
+    if name.startswith("."):
+        return "", []
+    return name, _canonical_tokens(toks)
+
+def _canonical_tokens(toks: List[str]) -> List[str]:
+    out = []
+    for tok in toks:
+        if tok.startswith("("):
+            inner = tok.strip("()").lower()
+            reg = XREG.get(inner)
+            tok = f"(x{reg})" if reg is not None else tok
+            if out and not out[-1].startswith(("x", "f", "(")):
+                out[-1] += tok
+                continue
+            out.append(tok)
+            continue
+        low = tok.lower()
+        if low in XREG:
+            tok = f"x{XREG[low]}"
+        elif low in FREG:
+            tok = f"f{FREG[low]}"
+        out.append(tok)
+    return out
+
+# === Conformance ===
+OBJDUMP_RE = re.compile(r"^\s*([0-9a-f]+):\s+([0-9a-f]{4}(?:[0-9a-f]{4})?)\s+(\S+)\s*(.*?)\s*$")
+
+def _norm(mnemonic: str, operands: str) -> Tuple[str, Tuple]:
+    """Mnemonic + operand values, insensitive to ABI/numeric names and hex/dec spelling."""
+    toks = []
+    for tok in re.split(r"[,\s()]+", operands.split("<", 1)[0]):
+        if not tok:
+            continue
+        low = tok.lower()
+        if low in XREG:
+            toks.append(("x", XREG[low]))
+        elif low in FREG:
+            toks.append(("f", FREG[low]))
+        elif low in CSR_NUM:
+            toks.append(("i", CSR_NUM[low]))
+        else:
+            try:
+                toks.append(("i", int(low, 0)))
+            except ValueError:
+                toks.append(("s", low))
+    return mnemonic.lower(), tuple(toks)
+
+def check_golden(path: Path, verbose: bool = False) -> Tuple[int, int]:
+    """Golden lines: '<addr>: <hex> <mnemonic> <operands>' (objdump -d layout), optionally
+    followed by '\\t# src: <source>'. Checks decode() against the reference text, the
+    re-encoding round trip, and encode(source) when a source is recorded."""
+    ok = bad = 0
+    for raw in path.read_text().splitlines():
+        line, _, src = raw.partition("# src:")
+        m = OBJDUMP_RE.match(line)
+        if not m:
+            continue
+        addr, hexword, mnem, ops = int(m.group(1), 16), int(m.group(2), 16), m.group(3), m.group(4)
+        problems = []
+        insn = decode(hexword, addr)
+        if insn is None:
+            problems.append("decode failed")
+        else:
+            if _norm(mnem, ops) != _norm(insn.name, ",".join(insn.operands())) \
+                    and not any(_encodes_to(ref, addr, insn.size, hexword) for ref in _readings(mnem, ops, addr)):
+                problems.append(f"decoded {insn.text()!r}")
+            try:
+                if encode(insn.text(), addr) != [(insn.size, hexword)]:
+                    problems.append(f"round trip {insn.text()!r} → {encode(insn.text(), addr)}")
+            except AsmError as e:
+                problems.append(f"re-encode: {e}")
+        if src.strip():
+            try:
+                words = encode(src.strip(), addr)
+                if words != [((2 if hexword & 3 != 3 else 4), hexword)]:
+                    problems.append(f"encode({src.strip()!r}) = {[hex(w) for _, w in words]}")
+            except AsmError as e:
+                problems.append(f"encode({src.strip()!r}): {e}")
+        if problems:
+            bad += 1
+            if verbose or bad <= 20:
+                print(f"[RVISA] {m.group(1)}: {m.group(2)} {mnem} {ops}: {'; '.join(problems)}")
+        else:
+            ok += 1
+    return ok, bad
+
+def _readings(mnem: str, ops: str, addr: int) -> List[str]:
+    """The reference text as written (aliases, ABI names), plus, for a trailing
+    pc-relative operand, objdump's bare-hex target or capstone's offset rebased to pc."""
+    ops = ops.split("<", 1)[0].strip()
+    out = [f"{mnem} {ops}"]
+    head, _, last = ops.rpartition(",")
+    last = last.strip()
+    prefix = f"{mnem} {head}," if head else f"{mnem} "
+    if re.fullmatch(r"[0-9a-f]+", last):
+        out.append(prefix + "0x" + last)
+    try:
+        out.append(prefix + hex((addr + int(last, 0)) & (1 << 64) - 1))
+    except ValueError:
+        pass
+    return out
+
+def _encodes_to(text: str, addr: int, size: int, word: int) -> bool:
+    try:
+        return encode(text, addr) == [(size, word)]
+    except AsmError:
+        return False
+
+HINT_FREE = {"c.addi": ("crd", "ci6"), "c.li": ("crd",), "c.lui": ("crd",), "c.slli": ("crd", "cshamt"),
+             "c.mv": ("crd",), "c.add": ("crd",), "c.srli": ("cshamt",), "c.srai": ("cshamt",)}
+
+def _sample_operands(op: Op, rng, index: int, count: int) -> Tuple[List[str], Optional[int]]:
+    """Random legal operands for `op` (hints avoided, so any assembler takes them);
+    pc-relative operands come back as a target instruction index."""
+    toks, target, glue = [], None, False
+    nonzero = set(op.nonzero) | set(HINT_FREE.get(op.name, ()))
+    for a in op.args:
+        kind = KINDS[a]
+        s = kind.style
+        while True:
+            v = kind.field.get(rng.getrandbits(32)) if kind.field else None
+            if a not in nonzero or v:
+                break
+        if s == "lit":
+            tok = "x2"
+        elif s == "rm":
+            v = rng.choice([0, 1, 2, 3, 4, 7]) if op.rm_default == 7 else 0
+            tok = RM_NAMES[v] if v != op.rm_default else ""
+        elif s == "csr":
+            tok = rng.choice(list(CSR_NAMES.values()))
+        elif s == "fence":
+            tok = _fmt(kind, v or 0xF, 0)
+        elif s == "pcrel":
+            lo, hi = max(0, index - 60), min(count - 1, index + 60)
+            target = rng.randint(lo, hi)
+            tok = "{target}"
+        else:
+            tok = _fmt(kind, v, 0)
+        if kind.paren:
+            tok = f"({tok})"
+            if glue:
+                toks[-1] += tok
+                continue
+        if tok:
+            toks.append(tok)
+        glue = s in IMM_STYLES
+    return toks, target
+
+def record(path: Path, per_op: int = 3, seed: int = 0):
+    """Write a golden file: every table entry with random operands, assembled by an
+    independent assembler (LLVM via `python -m ziglang cc`) and disassembled by capstone."""
+    import random
+    import struct
+    import subprocess
+    import tempfile
+    import capstone
+
+    rng = random.Random(seed)
+    ops = [op for op in OPCODES for _ in range(per_op)]
+    addrs, pc = [], 0
+    for op in ops:
+        addrs.append(pc)
+        pc += op.size
+    body, ours = [".option norelax"], []
+    for i, op in enumerate(ops):
+        toks, target = _sample_operands(op, rng, i, len(ops))
+        body.append(".option rvc" if op.size == 2 else ".option norvc")
+        line = f"{op.name} {','.join(toks)}".strip()
+        body.append(f"L{i}: " + line.replace("{target}", f"L{target}"))
+        ours.append(line.replace("{target}", hex(addrs[target]) if target is not None else ""))
+    with tempfile.TemporaryDirectory() as tmp:
+        src, obj = Path(tmp) / "golden.S", Path(tmp) / "golden.o"
+        src.write_text(".text\n" + "\n".join(body) + "\n")
+        subprocess.run([sys.executable, "-m", "ziglang", "cc", "--target=riscv64-linux-musl",
+                        "-mcpu=baseline_rv64", "-c", str(src), "-o", str(obj)], check=True)
+        elf = obj.read_bytes()
+    shoff, = struct.unpack_from("<Q", elf, 0x28)
+    shentsize, shnum, shstrndx = struct.unpack_from("<HHH", elf, 0x3A)
+    sections = [struct.unpack_from("<IIQQQQIIQQ", elf, shoff + i * shentsize) for i in range(shnum)]
+    strtab = sections[shstrndx]
+    names = lambda off: elf[strtab[4] + off:elf.index(b"\0", strtab[4] + off)].decode()
+    text = next(elf[s[4]:s[4] + s[5]] for s in sections if names(s[0]) == ".text")
+
+    md = capstone.Cs(capstone.CS_ARCH_RISCV, capstone.CS_MODE_RISCV64 | capstone.CS_MODE_RISCVC)
+    out = [f"# RV64GC golden file: {len(ops)} instructions, LLVM assembler + capstone {capstone.__version__}",
+           "# regenerate with: python -m utils.rvisa record utils/rvisa_golden.dump"]
+    insns = list(md.disasm(text, 0))
+    if len(insns) != len(ops):
+        raise RuntimeError(f"capstone decoded {len(insns)} of {len(ops)} instructions")
+    for insn, src_line in zip(insns, ours):
+        hexw = insn.bytes[::-1].hex()
+        out.append(f"{insn.address:8x}:\t{hexw:<8}\t{insn.mnemonic}\t{insn.op_str}\t# src: {src_line}")
+    path.write_text("\n".join(out) + "\n")
+    print(f"[RVISA] recorded {len(ops)} instructions to {path}")
+
+def main():
+    ap = argparse.ArgumentParser(description="LiFU RV64GC encoder/decoder")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    dis = sub.add_parser("dis", help="decode instruction words")
+    dis.add_argument("words", nargs="+")
+    dis.add_argument("--pc", type=lambda s: int(s, 0), default=0)
+    asm = sub.add_parser("asm", help="assemble a .S file to .word/.half lines")
+    asm.add_argument("path", type=Path)
+    chk = sub.add_parser("check", help="conformance against an objdump-style golden file")
+    chk.add_argument("path", type=Path)
+    chk.add_argument("-v", "--verbose", action="store_true")
+    rec = sub.add_parser("record", help="regenerate the golden file (needs ziglang + capstone)")
+    rec.add_argument("path", type=Path)
+    rec.add_argument("--per-op", type=int, default=3)
+    args = ap.parse_args()
+
+    if args.cmd == "dis":
+        pc = args.pc
+        for tok in args.words:
+            w = int(tok, 16 if not tok.startswith("0x") else 0)
+            insn = decode(w, pc)
+            hexw = f"{w:08x}" if w & 3 == 3 else f"{w:04x}    "
+            print(f"{pc:8x}: {hexw}  {insn.text() if insn else '<illegal>'}")
+            pc += insn.size if insn else (2 if w & 3 != 3 else 4)
+    elif args.cmd == "asm":
+        for size, w in assemble(args.path.read_text()):
+            print(f"    .word 0x{w:08x}" if size == 4 else f"    .half 0x{w:04x}")
+    elif args.cmd == "record":
+        record(args.path, args.per_op)
+    else:
+        ok, bad = check_golden(args.path, args.verbose)
+        print(f"[RVISA] {ok} ok, {bad} mismatched")
+        sys.exit(1 if bad else 0)
+
+if __name__ == "__main__":
+    main()
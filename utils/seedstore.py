@@ -0,0 +1,202 @@
+# utils/seedstore.py
+"""
+Content-addressed seed store + SQLite index
+- index.sqlite holds each distinct code once in blobs(id, code) (id =
+  sha256[:12], as Testcase.from_file), the index seeds(id, source, parent,
+  size, weight, added) and the files seen by the last scan
+  (path, mtime_ns, inode, size)
+- scan() stats every seed file and re-hashes only those whose (mtime,
+  inode, size) changed; a directory's mtime does not move when a file in
+  it is edited in place, so it is no shortcut
+- a seed whose file was removed or replaced is dropped from the index
+  (with its blob), unless another file still holds the same code
+- select() is two indexed queries (top weights + random rowids); only the
+  chosen blobs are read
+- Testcases handed out have path=<root>/<id>.s (not written unless saved)
+"""
+import os
+import random
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .models import Testcase
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    id   TEXT PRIMARY KEY,
+    code TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS seeds (
+    id      TEXT PRIMARY KEY,
+    source  TEXT NOT NULL,
+    parent  TEXT,
+    size    INTEGER NOT NULL,
+    weight  REAL NOT NULL DEFAULT 0,
+    added   REAL NOT NULL DEFAULT (julianday('now'))
+);
+CREATE INDEX IF NOT EXISTS seeds_weight ON seeds (weight DESC);
+CREATE INDEX IF NOT EXISTS seeds_parent ON seeds (parent);
+CREATE INDEX IF NOT EXISTS seeds_added ON seeds (added DESC);
+CREATE TABLE IF NOT EXISTS files (
+    path     TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    inode    INTEGER NOT NULL,
+    size     INTEGER NOT NULL,
+    id       TEXT NOT NULL
+);
+"""
+
+class SeedStore:
+    def __init__(self, root: Path, rng: Optional[random.Random] = None):
+        self.root = root
+        self.rng = rng or random.Random()  # sample(); utils.lineage.derive_rng for reproducible runs
+        root.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(root / "index.sqlite")
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+
+    def __len__(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM seeds").fetchone()[0]
+
+    def __contains__(self, tc_id: str) -> bool:
+        return self.db.execute("SELECT 1 FROM seeds WHERE id = ?", (tc_id,)).fetchone() is not None
+
+    def close(self):
+        self.db.close()
+
+    # === Blobs ===
+    def _put_blob(self, tc_id: str, code: str):
+        self.db.execute("INSERT OR IGNORE INTO blobs VALUES (?, ?)", (tc_id, code))
+
+    def get(self, tc_id: str) -> Optional[Testcase]:
+        row = self.db.execute(
+            "SELECT s.source, s.parent, b.code FROM seeds s JOIN blobs b USING (id) WHERE s.id = ?",
+            (tc_id,)).fetchone()
+        if row is None:
+            return None
+        tc = Testcase(id=tc_id, code=row[2], source=row[0], path=self.root / f"{tc_id}.s")
+        if row[1]:
+            tc.metadata["parent"] = row[1]
+        return tc
+
+    # === Writes ===
+    def add(self, tc: Testcase, parent: Optional[str] = None, weight: float = 0.0) -> str:
+        """Store `tc` (no-op for known content); returns its id."""
+        with self.db:
+            self._put_blob(tc.id, tc.code)
+            self.db.execute(
+                "INSERT OR IGNORE INTO seeds (id, source, parent, size, weight) VALUES (?, ?, ?, ?, ?)",
+                (tc.id, tc.source, parent or tc.metadata.get("parent"), len(tc.code), weight))
+        return tc.id
+
+    def set_weights(self, weights: Iterable[Tuple[str, float]]):
+        with self.db:
+            self.db.executemany("UPDATE seeds SET weight = ? WHERE id = ?",
+                                ((w, tid) for tid, w in weights))
+
+    def drop(self, ids: Iterable[str]) -> int:
+        """Forget seeds (e.g. minimised away). File-backed seeds are kept."""
+        ids = list(ids)
+        with self.db:
+            cur = self.db.executemany(
+                "DELETE FROM seeds WHERE id = ? AND NOT EXISTS (SELECT 1 FROM files WHERE files.id = seeds.id)",
+                ((i,) for i in ids))
+        return cur.rowcount
+
+    # === Scanning ===
+    def scan(self, seed_sources: List[str], base: Path, full: bool = False) -> int:
+        """Index new/changed *.S files under each source dir (full: re-hash all); returns #files re-hashed."""
+        rehashed = 0
+        for src_path in seed_sources:
+            src = base / src_path
+            if not src.exists():
+                print(f"[WARN] Source not found: {src}")
+                continue
+            rehashed += self._scan_dir(src, src_path, full)
+        return rehashed
+
+    def _scan_dir(self, src: Path, source: str, full: bool = False) -> int:
+        prefix = str(src) + os.sep
+        rows = list(self.db.execute(
+            "SELECT path, mtime_ns, inode, size, id FROM files WHERE path LIKE ? || '%'", (prefix,)))
+        known = {p: (m, i, s) for p, m, i, s, _ in rows}
+        old_id = {p: tc_id for p, _, _, _, tc_id in rows}
+        seen, changed = set(), []
+        with os.scandir(src) as it:
+            for entry in it:
+                if not entry.name.endswith(".S") or not entry.is_file():
+                    continue
+                st = entry.stat()
+                seen.add(entry.path)
+                if full or known.get(entry.path) != (st.st_mtime_ns, st.st_ino, st.st_size):
+                    changed.append((entry.path, st))
+        with self.db:
+            for path, st in changed:
+                try:
+                    tc = Testcase.from_file(Path(path), source=source)
+                except Exception as e:
+                    print(f"  [SKIP] {path}: {e}")
+                    continue
+                self._put_blob(tc.id, tc.code)
+                self.db.execute(
+                    "INSERT OR IGNORE INTO seeds (id, source, size) VALUES (?, ?, ?)",
+                    (tc.id, source, len(tc.code)))
+                self.db.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)",
+                                (path, st.st_mtime_ns, st.st_ino, st.st_size, tc.id))
+            gone = [(p,) for p in known if p not in seen]
+            self.db.executemany("DELETE FROM files WHERE path = ?", gone)
+            # seeds of removed / replaced files, unless another file still holds that code
+            stale = {(old_id[p],) for p, _ in changed if p in old_id} | {(old_id[p],) for p, in gone}
+            self.db.executemany(
+                "DELETE FROM seeds WHERE id = ? AND NOT EXISTS (SELECT 1 FROM files WHERE files.id = seeds.id)",
+                stale)
+            self.db.executemany(
+                "DELETE FROM blobs WHERE id = ? AND NOT EXISTS (SELECT 1 FROM seeds WHERE seeds.id = blobs.id)",
+                stale)
+        if changed or gone:
+            print(f"[LOAD] {src}: {len(changed)} new/changed, {len(gone)} removed")
+        return len(changed)
+
+    # === Selection ===
+    def top(self, k: int) -> List[str]:
+        return [r[0] for r in self.db.execute(
+            "SELECT id FROM seeds WHERE weight > 0 ORDER BY weight DESC LIMIT ?", (k,))]
+
+    def recent(self, k: int) -> List[str]:
+        return [r[0] for r in self.db.execute("SELECT id FROM seeds ORDER BY added DESC LIMIT ?", (k,))]
+
+    def sample(self, k: int, exclude: Iterable[str] = ()) -> List[str]:
+        """k random ids by probing rowids (no full-table ORDER BY random())."""
+        exclude = set(exclude)
+        lo, hi = self.db.execute("SELECT MIN(rowid), MAX(rowid) FROM seeds").fetchone()
+        if lo is None:
+            return []
+        want = min(k, len(self) - len(exclude))
+        picked: Dict[str, None] = {}
+        for _ in range(8):  # rowid gaps from drop(): a few rounds of over-sampling
+            probes = self.rng.sample(range(lo, hi + 1), min(hi - lo + 1, 2 * want + 8))
+            marks = ",".join("?" * len(probes))
+            for (tc_id,) in self.db.execute(f"SELECT id FROM seeds WHERE rowid IN ({marks})", probes):
+                if tc_id not in exclude:
+                    picked[tc_id] = None
+            if len(picked) >= want:
+                break
+        ids = list(picked)
+        self.rng.shuffle(ids)
+        return ids[:k]
+
+    def candidates(self, k: int) -> Dict[str, float]:
+        """~k ids for a scheduler to rank: half top-weighted, a quarter newest, rest random."""
+        ids = dict.fromkeys(self.top(k // 2) + self.recent(k // 4))
+        ids.update(dict.fromkeys(self.sample(k - len(ids), exclude=ids)))
+        marks = ",".join("?" * len(ids))
+        return dict(self.db.execute(f"SELECT id, weight FROM seeds WHERE id IN ({marks})", list(ids)))
+
+    def select(self, batch_size: int) -> List[Testcase]:
+        """Top-weighted seeds, topped up with random ones (same policy as select_seeds)."""
+        ids = self.top(batch_size)
+        if len(ids) < batch_size:
+            ids += self.sample(batch_size - len(ids), exclude=ids)
+        return [tc for tc in map(self.get, ids) if tc is not None]
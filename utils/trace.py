@@ -0,0 +1,83 @@
+# utils/trace.py
+"""
+Columnar trace: one row per retired instruction
+- Column space: pc, insn, x0..x31, f0..f31, CSRs (see COLUMNS)
+- A TraceArray only stores the columns that occur in its trace
+- values: uint64 matrix, valid: bool matrix (field present in that record)
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
+
+XREGS = [f"x{i}" for i in range(32)]
+FREGS = [f"f{i}" for i in range(32)]
+CSRS = [
+    "mstatus", "misa", "medeleg", "mideleg", "mie", "mtvec", "mscratch",
+    "mepc", "mcause", "mtval", "mip",
+    "sstatus", "sie", "stvec", "sscratch", "sepc", "scause", "stval", "sip", "satp",
+    "fflags", "frm", "fcsr",
+    "priv",  # privilege level from the commit log; not a CSR but compared like one
+]
+COLUMNS = ["pc", "insn"] + XREGS + FREGS + CSRS
+COL_INDEX: Dict[str, int] = {name: i for i, name in enumerate(COLUMNS)}
+MASK64 = (1 << 64) - 1
+
+# Mismatch type reported for each column
+COL_KIND: Dict[str, str] = {
+    "pc": "pc", "insn": "insn",
+    **{r: "reg" for r in XREGS}, **{r: "freg" for r in FREGS}, **{c: "csr" for c in CSRS},
+}
+
+@dataclass
+class TraceArray:
+    names: List[str]    # present columns, in COLUMNS order
+    values: np.ndarray  # (n, len(names)) uint64
+    valid: np.ndarray   # (n, len(names)) bool
+    index: Dict[str, int] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.index = {name: i for i, name in enumerate(self.names)}
+
+    def __len__(self) -> int:
+        return self.values.shape[0]
+
+    @classmethod
+    def from_records(cls, records: List[dict]) -> "TraceArray":
+        """Build from commit-log dicts; keys outside COLUMNS are ignored."""
+        seen = set()
+        for rec in records:
+            seen.update(rec.keys())
+        names = [c for c in COLUMNS if c in seen]
+        n = len(records)
+        values = np.zeros((n, len(names)), dtype=np.uint64)
+        valid = np.zeros((n, len(names)), dtype=bool)
+        for col, name in enumerate(names):
+            raw = [rec.get(name) for rec in records]
+            valid[:, col] = np.fromiter((v is not None for v in raw), dtype=bool, count=n)
+            values[:, col] = np.fromiter((v & MASK64 if v is not None else 0 for v in raw),
+                                         dtype=np.uint64, count=n)
+        return cls(names, values, valid)
+
+    def to_records(self) -> List[dict]:
+        return [
+            {self.names[c]: int(self.values[row, c]) for c in np.flatnonzero(self.valid[row])}
+            for row in range(len(self))
+        ]
+
+    def column(self, name: str) -> np.ndarray:
+        """Values of one column (zeros if the trace never carries it)."""
+        if name not in self.index:
+            return np.zeros(len(self), dtype=np.uint64)
+        return self.values[:, self.index[name]]
+
+    def select(self, names: Sequence[str], start: int, stop: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Rows [start, stop) projected onto `names`; absent columns read as invalid."""
+        n = max(0, min(stop, len(self)) - start)
+        values = np.zeros((n, len(names)), dtype=np.uint64)
+        valid = np.zeros((n, len(names)), dtype=bool)
+        dst = [i for i, name in enumerate(names) if name in self.index]
+        src = [self.index[names[i]] for i in dst]
+        if dst and n:
+            values[:, dst] = self.values[start:start + n, src]
+            valid[:, dst] = self.valid[start:start + n, src]
+        return values, valid
@@ -0,0 +1,204 @@
+# utils/tracefile.py
+"""
+Binary trace file (.trc): fixed-width columnar rows in compressed chunks
+
+    header  : magic "LIFUTRC1" | version u16 | codec u16 | ncols u32 | nrows u64
+              | chunk_rows u32 | meta_len u32 | column ids u16[ncols] | meta (JSON)
+    chunks  : per chunk, compressed( values u64[ncols][rows] column-major
+                                     | packbits(valid bool[ncols][rows]) )
+    index   : (offset u64, length u32)[nchunks] | index_offset u64 | magic "LIFUIDX1"
+
+Readers mmap the file and only decompress the chunks covering the requested
+cycle range. Column ids are positions in utils.trace.COLUMNS.
+
+    python -m utils.tracefile convert logs/            # *.json → *.trc
+    python -m utils.tracefile export logs/iss/<id>.trc # *.trc → *.json
+"""
+import json
+import mmap
+import zlib
+import struct
+import argparse
+from pathlib import Path
+from typing import Iterable, Optional
+import numpy as np
+
+try:
+    import zstandard as zstd
+except ImportError:  # zlib fallback keeps traces readable without the wheel
+    zstd = None
+
+from .trace import TraceArray, COLUMNS, COL_INDEX
+
+MAGIC = b"LIFUTRC1"
+INDEX_MAGIC = b"LIFUIDX1"
+VERSION = 1
+CODEC_RAW, CODEC_ZLIB, CODEC_ZSTD = 0, 1, 2
+HEADER = struct.Struct("<8sHHIQII")
+INDEX_ENTRY = struct.Struct("<QI")
+FOOTER = struct.Struct("<Q8s")
+CHUNK_ROWS = 65536
+
+def _compress(codec: int, data: bytes) -> bytes:
+    if codec == CODEC_ZSTD:
+        return zstd.ZstdCompressor(level=3).compress(data)
+    if codec == CODEC_ZLIB:
+        return zlib.compress(data, 6)
+    return data
+
+def _decompress(codec: int, data: bytes) -> bytes:
+    if codec == CODEC_ZSTD:
+        if zstd is None:
+            raise RuntimeError("trace is zstd-compressed but zstandard is not installed")
+        return zstd.ZstdDecompressor().decompress(data)
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(data)
+    return data
+
+def write_trace(path: Path, trace: TraceArray, meta: Optional[dict] = None,
+                chunk_rows: int = CHUNK_ROWS, codec: Optional[int] = None):
+    """Write `trace` (+ small JSON `meta`, e.g. cycles/exit) to `path`."""
+    codec = codec if codec is not None else (CODEC_ZSTD if zstd else CODEC_ZLIB)
+    meta_bytes = json.dumps(meta or {}).encode()
+    ncols, nrows = len(trace.names), len(trace)
+    ids = np.array([COL_INDEX[n] for n in trace.names], dtype="<u2")
+
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, codec, ncols, nrows, chunk_rows, len(meta_bytes)))
+        f.write(ids.tobytes())
+        f.write(meta_bytes)
+
+        index = []
+        for start in range(0, nrows, chunk_rows):
+            values = np.ascontiguousarray(trace.values[start:start + chunk_rows].T, dtype="<u8")
+            valid = np.packbits(trace.valid[start:start + chunk_rows].T)
+            blob = _compress(codec, values.tobytes() + valid.tobytes())
+            index.append((f.tell(), len(blob)))
+            f.write(blob)
+
+        index_offset = f.tell()
+        for entry in index:
+            f.write(INDEX_ENTRY.pack(*entry))
+        f.write(FOOTER.pack(index_offset, INDEX_MAGIC))
+    tmp.replace(path)
+
+class TraceFile:
+    """mmap-backed reader; decodes only the chunks a cycle range touches."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._f = open(path, "rb")
+        self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.codec, ncols, self.nrows, self.chunk_rows, meta_len = \
+            HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: not a v{VERSION} LiFU trace")
+        pos = HEADER.size
+        ids = np.frombuffer(self._mm, dtype="<u2", count=ncols, offset=pos)
+        self.names = [COLUMNS[i] for i in ids]
+        pos += 2 * ncols
+        self.meta = json.loads(bytes(self._mm[pos:pos + meta_len]))
+
+        index_offset, idx_magic = FOOTER.unpack_from(self._mm, len(self._mm) - FOOTER.size)
+        if idx_magic != INDEX_MAGIC:
+            raise ValueError(f"{path}: truncated trace (no chunk index)")
+        nchunks = (len(self._mm) - FOOTER.size - index_offset) // INDEX_ENTRY.size
+        self.index = [INDEX_ENTRY.unpack_from(self._mm, index_offset + i * INDEX_ENTRY.size)
+                      for i in range(nchunks)]
+
+    def __len__(self) -> int:
+        return self.nrows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._mm.close()
+        self._f.close()
+
+    def _chunk(self, k: int):
+        offset, length = self.index[k]
+        raw = _decompress(self.codec, self._mm[offset:offset + length])
+        rows = min(self.chunk_rows, self.nrows - k * self.chunk_rows)
+        ncols = len(self.names)
+        values = np.frombuffer(raw, dtype="<u8", count=ncols * rows).reshape(ncols, rows).T
+        bits = np.frombuffer(raw, dtype=np.uint8, offset=8 * ncols * rows)
+        valid = np.unpackbits(bits, count=ncols * rows).astype(bool).reshape(ncols, rows).T
+        return values, valid
+
+    def read(self, start: int = 0, stop: Optional[int] = None) -> TraceArray:
+        """Rows [start, stop) as a TraceArray."""
+        stop = self.nrows if stop is None else min(stop, self.nrows)
+        start = max(0, min(start, stop))
+        first, last = start // self.chunk_rows, (stop - 1) // self.chunk_rows
+        parts_v, parts_m = [], []
+        for k in range(first, last + 1) if stop > start else []:
+            values, valid = self._chunk(k)
+            base = k * self.chunk_rows
+            lo, hi = max(start - base, 0), min(stop - base, len(values))
+            parts_v.append(values[lo:hi])
+            parts_m.append(valid[lo:hi])
+        ncols = len(self.names)
+        values = np.concatenate(parts_v) if parts_v else np.zeros((0, ncols), dtype=np.uint64)
+        valid = np.concatenate(parts_m) if parts_m else np.zeros((0, ncols), dtype=bool)
+        return TraceArray(list(self.names), values.astype(np.uint64), valid)
+
+def read_trace(path: Path) -> TraceArray:
+    with TraceFile(path) as tf:
+        return tf.read()
+
+def export_json(path: Path) -> dict:
+    """The legacy {"trace": [...], ...meta} document, for debugging."""
+    with TraceFile(path) as tf:
+        return {"trace": tf.read().to_records(), **tf.meta}
+
+def convert_json(json_path: Path) -> Path:
+    """logs/**/<x>.json → <x>.trc next to it."""
+    data = json.loads(json_path.read_text())
+    trace = TraceArray.from_records(data.pop("trace", []))
+    out = json_path.with_suffix(".trc")
+    write_trace(out, trace, meta=data)
+    return out
+
+def _iter_json(paths: Iterable[Path]):
+    for p in paths:
+        if p.is_dir():
+            yield from sorted(p.rglob("*.json"))
+        elif p.suffix == ".json":
+            yield p
+
+def main():
+    ap = argparse.ArgumentParser(description="LiFU binary trace tools")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    conv = sub.add_parser("convert", help="convert JSON trace logs to .trc")
+    conv.add_argument("paths", nargs="+", type=Path)
+    conv.add_argument("--delete", action="store_true", help="remove the JSON after converting")
+    exp = sub.add_parser("export", help="dump a .trc as JSON")
+    exp.add_argument("path", type=Path)
+    exp.add_argument("-o", "--out", type=Path)
+    exp.add_argument("--start", type=int, default=0)
+    exp.add_argument("--stop", type=int)
+    args = ap.parse_args()
+
+    if args.cmd == "convert":
+        for p in _iter_json(args.paths):
+            out = convert_json(p)
+            print(f"[TRACE] {p} → {out.name} ({p.stat().st_size} → {out.stat().st_size} bytes)")
+            if args.delete:
+                p.unlink()
+    else:
+        with TraceFile(args.path) as tf:
+            doc = {"trace": tf.read(args.start, args.stop).to_records(), **tf.meta}
+        text = json.dumps(doc)
+        if args.out:
+            args.out.write_text(text)
+        else:
+            print(text)
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,38 @@
 # utils/wcache.py
+"""
+W$: per-testcase weights + scoring history
+- wcache.json          snapshot ({"entries", "history"}, unchanged format)
+- wcache.json.journal  append-only JSON lines of updates since the snapshot
+- Updates are buffered; flush() appends them with a single fsync and folds the
+  journal into the snapshot every `compact_every` records
+- load() truncates a torn journal tail (crash mid-append) to the last
+  complete line, so later appends start on a clean line
+- `with wcache:` batches every update inside the block into one flush
+- top_k reads a sorted index instead of sorting all entries
+- novelty comes from a MinHash/LSH index persisted next to the snapshot
+  (wcache.novelty, see utils/novelty.py)
+"""
+import os
 import json
+from bisect import bisect_left, insort
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List, Tuple
 from .models import Testcase
+from .novelty import NoveltyIndex
 
 class WeightCache:
     def __init__(self, path: Path, config: dict):
         self.path = path
+        self.journal_path = path.with_name(path.name + ".journal")
         self.config = config
+        self.compact_every = config.get("compact_every", 1000)
         self.entries: Dict[str, float] = {}
         self.history: Dict[str, dict] = {}
+        self._index: List[Tuple[float, str]] = []  # (-w, id), ascending
+        self._pending: List[str] = []
+        self._journal_len = 0
+        self._batch_depth = 0
+        self.novelty = NoveltyIndex(path.with_suffix(".novelty"))
         self.load()
 
     def load(self):
@@ -17,13 +40,74 @@ class WeightCache:
             data = json.loads(self.path.read_text())
             self.entries = data.get("entries", {})
             self.history = data.get("history", {})
+        if self.journal_path.exists():
+            raw = self.journal_path.read_bytes()
+            good = 0  # bytes up to the last complete, parseable line
+            for line in raw.splitlines(keepends=True):
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("no newline")
+                    rec = json.loads(line)
+                except ValueError:
+                    break  # torn tail from a crash mid-append
+                self.entries[rec["id"]] = rec["h"]["w"]
+                self.history[rec["id"]] = rec["h"]
+                self._journal_len += 1
+                good += len(line)
+            if good < len(raw):
+                # cut the torn tail, or the next flush() would append onto it
+                with open(self.journal_path, "r+b") as f:
+                    f.truncate(good)
+                    f.flush()
+                    os.fsync(f.fileno())
+        self._index = sorted((-w, tid) for tid, w in self.entries.items())
 
     def save(self):
+        """Write a full snapshot and truncate the journal."""
+        self._pending.clear()
         data = {"entries": self.entries, "history": self.history}
-        self.path.write_text(json.dumps(data, indent=2))
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        tmp.replace(self.path)
+        self.journal_path.unlink(missing_ok=True)
+        self._journal_len = 0
+
+    def flush(self):
+        """Persist buffered updates: one append + one fsync."""
+        self.novelty.flush()
+        if not self._pending:
+            return
+        with open(self.journal_path, "a") as f:
+            f.write("".join(self._pending))
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_len += len(self._pending)
+        self._pending.clear()
+        if self._journal_len >= self.compact_every:
+            self.save()
+
+    def __enter__(self):
+        self._batch_depth += 1
+        return self
+
+    def __exit__(self, *exc):
+        self._batch_depth -= 1
+        if self._batch_depth == 0:
+            self.flush()
+
+    def _reindex(self, tc_id: str, w: float):
+        old = self.entries.get(tc_id)
+        if old is not None:
+            pos = bisect_left(self._index, (-old, tc_id))
+            if pos < len(self._index) and self._index[pos] == (-old, tc_id):
+                del self._index[pos]
+        insort(self._index, (-w, tc_id))
 
     def update(self, testcase: Testcase, delta_cov: float, bug_score: float, cycles: int):
-        novelty = 1.0  # TODO: edit distance
+        novelty = self.novelty.add(testcase.id, testcase.code) if testcase.code else 1.0
         efficiency = (delta_cov + bug_score) / max(cycles, 1)
         w = (
             self.config["alpha"] * delta_cov +
@@ -31,15 +115,20 @@ class WeightCache:
             self.config["gamma"] * novelty +
             self.config["delta"] * efficiency
         )
+        self._reindex(testcase.id, w)
         self.entries[testcase.id] = w
         self.history[testcase.id] = {
             "cov_gain": delta_cov,
             "bug_score": bug_score,
             "w": w,
-            "cycles": cycles
+            "cycles": cycles,
+            "novelty": novelty,
+            "parent": testcase.metadata.get("parent"),  # credits the seed scheduler
         }
         print(f"[W$] {testcase.id} → w={w:.4f}")
-        self.save()
+        self._pending.append(json.dumps({"id": testcase.id, "h": self.history[testcase.id]}) + "\n")
+        if self._batch_depth == 0:
+            self.flush()
 
     def top_k(self, k: int):
-        return sorted(self.entries.items(), key=lambda x: x[1], reverse=True)[:k]
\ No newline at end of file
+        return [(tid, -neg_w) for neg_w, tid in self._index[:k]]